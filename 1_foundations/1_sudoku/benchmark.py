@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+# Author: github.com/madhavajay
+"""
+Benchmark the sudoku engines over graded corpora of easy, hard, diagonal
+and 16x16 puzzles and flag regressions against stored baseline results
+
+    python benchmark.py
+    python benchmark.py --engines trail dlx --corpora hard
+    python benchmark.py --save-baseline
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from sudoku.board import Board, BoardState
+from sudoku.bitboard import BitBoard, CellTrail, Cells
+from sudoku.dlx import DancingLinks
+from sudoku.stream import read_puzzles
+from sudoku.vector import VectorBoard
+
+BENCHMARK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             'benchmarks')
+
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, 'baseline.json')
+
+# corpus name to the puzzle file, whether it is diagonal sudoku and the
+# board size
+CORPORA = {
+    'easy': ('easy.txt', False, 9),
+    'hard': ('hard.txt', False, 9),
+    'diagonal': ('diagonal.txt', True, 9),
+    'sixteen': ('sixteen.txt', False, 16)
+}
+
+# type alias for the metrics of one engine on one corpus
+Result = Dict[str, Any]
+
+# type alias for results keyed by corpus then engine
+Results = Dict[str, Dict[str, Result]]
+
+
+class CountingBoard(Board):
+    """Board which counts every call of the recursive search as a node"""
+
+    def __init__(self, diagonal_mode: bool=False, incremental: bool=False,
+                 size: int=9) -> None:
+        super().__init__(diagonal_mode=diagonal_mode, incremental=incremental,
+                         size=size)
+        self.nodes = 0
+
+    def search(self, board_dict: BoardState) -> BoardState:
+        self.nodes += 1
+        return super().search(board_dict)
+
+    def solve(self, board_string: str) -> Optional[BoardState]:
+        """Search the puzzle string"""
+        return self.search(self.grid_values(board_string))
+
+
+class CountingBitBoard(BitBoard):
+    """
+    BitBoard which counts search calls as nodes, or the propagation after
+    each guess when the trail search is used
+    """
+
+    def __init__(self, diagonal_mode: bool=False, trail: bool=False,
+                 size: int=9) -> None:
+        super().__init__(diagonal_mode=diagonal_mode, trail=trail, size=size)
+        self.nodes = 0
+
+    def search_cells(self, cells: Cells) -> Optional[Cells]:
+        if not self._trail:
+            self.nodes += 1
+        return super().search_cells(cells)
+
+    def propagate_cells(self, cells: Cells, trail: CellTrail=None,
+                        changed: List[int]=None) -> Optional[Cells]:
+        if self._trail:
+            self.nodes += 1
+        return super().propagate_cells(cells, trail, changed)
+
+    def solve(self, board_string: str) -> Optional[BoardState]:
+        """Search the puzzle string on bitmasks"""
+        cells = self.search_cells(self.grid_cells(board_string))
+        if cells is None:
+            return None
+        return self.to_board_state(cells)
+
+
+class CountingDancingLinks(DancingLinks):
+    """DancingLinks which counts every row chosen by the search as a node"""
+
+    def __init__(self, diagonal_mode: bool=False, size: int=9) -> None:
+        super().__init__(diagonal_mode=diagonal_mode, size=size)
+        self.nodes = 0
+
+    def _select(self, node: int) -> None:
+        self.nodes += 1
+        super()._select(node)
+
+    def solve(self, board_string: str) -> Optional[BoardState]:
+        # the givens are selected too but are not search nodes
+        self.nodes -= len([value for value in board_string
+                           if value in self._digits])
+        return super().solve(board_string)
+
+
+class CountingVectorBoard(VectorBoard):
+    """
+    VectorBoard which solves each puzzle as a batch of one, so its latency
+    is comparable with the other engines, and counts the numpy propagation
+    of each board and the propagations of the trail search of the boards
+    it leaves unsolved as nodes
+    """
+
+    def __init__(self, diagonal_mode: bool=False, size: int=9) -> None:
+        super().__init__(diagonal_mode=diagonal_mode, size=size)
+        self._board = CountingBitBoard(diagonal_mode, trail=True, size=size)
+        self.propagated = 0
+
+    @property
+    def nodes(self) -> int:
+        """Return the batch and scalar propagations"""
+        return self.propagated + self._board.nodes
+
+    def propagate_array(self, cells: np.ndarray) -> np.ndarray:
+        self.propagated += len(cells)
+        return super().propagate_array(cells)
+
+    def solve(self, board_string: str) -> Optional[BoardState]:
+        """Solve one puzzle as a batch"""
+        return self.solve_batch([board_string])[0]
+
+
+ENGINES = {
+    'board': lambda diagonal, size: CountingBoard(diagonal, size=size),
+    'incremental': lambda diagonal, size: CountingBoard(
+        diagonal, incremental=True, size=size),
+    'bitboard': lambda diagonal, size: CountingBitBoard(diagonal, size=size),
+    'trail': lambda diagonal, size: CountingBitBoard(diagonal, trail=True,
+                                                     size=size),
+    'dlx': lambda diagonal, size: CountingDancingLinks(diagonal, size=size),
+    'vector': lambda diagonal, size: CountingVectorBoard(diagonal, size=size)
+}
+
+
+def load_corpus(name: str) -> List[str]:
+    """Read every puzzle of a named corpus"""
+    filename, _, _ = CORPORA[name]
+    return list(read_puzzles(os.path.join(BENCHMARK_DIR, filename)))
+
+
+def percentile(latencies: Sequence[float], fraction: float) -> float:
+    """Return the nearest rank percentile of the latencies"""
+    ordered = sorted(latencies)
+    rank = max(int(round(fraction * len(ordered))) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def run_engine(engine: str, puzzles: Sequence[str], diagonal_mode: bool,
+               measure_memory: bool=True, repeat: int=3,
+               size: int=9) -> Result:
+    """
+    Solve every puzzle with one engine and return throughput, latency
+    percentiles in milliseconds, search nodes and peak traced memory in
+    KiB, each puzzle keeps its best time of repeat runs to damp scheduler
+    noise and memory is measured in a separate pass so tracing does not
+    slow the timed passes
+    """
+    latencies = [float('inf')] * len(puzzles)
+    solved = 0
+    nodes = 0
+    for run in range(max(repeat, 1)):
+        solver = ENGINES[engine](diagonal_mode, size)
+        for index, puzzle in enumerate(puzzles):
+            start = time.perf_counter()
+            result = solver.solve(puzzle)
+            latencies[index] = min(latencies[index],
+                                   time.perf_counter() - start)
+            if run == 0 and result is not None:
+                solved += 1
+        nodes = solver.nodes
+    total = sum(latencies)
+
+    peak = None  # type: Optional[float]
+    if measure_memory:
+        traced = ENGINES[engine](diagonal_mode, size)
+        tracemalloc.start()
+        try:
+            for puzzle in puzzles:
+                traced.solve(puzzle)
+            peak = tracemalloc.get_traced_memory()[1] / 1024
+        finally:
+            tracemalloc.stop()
+
+    return {
+        'puzzles': len(puzzles),
+        'solved': solved,
+        'puzzles_per_sec': len(puzzles) / total if total else 0.0,
+        'p50_ms': percentile(latencies, 0.5) * 1000 if latencies else 0.0,
+        'p99_ms': percentile(latencies, 0.99) * 1000 if latencies else 0.0,
+        'nodes': nodes,
+        'peak_kib': peak
+    }
+
+
+def run_benchmarks(engines: Sequence[str], corpora: Sequence[str],
+                   measure_memory: bool=True, repeat: int=3) -> Results:
+    """Run every engine over every corpus"""
+    results = {}  # type: Results
+    for corpus in corpora:
+        puzzles = load_corpus(corpus)
+        _, diagonal_mode, size = CORPORA[corpus]
+        results[corpus] = {}
+        for engine in engines:
+            results[corpus][engine] = run_engine(engine, puzzles,
+                                                 diagonal_mode,
+                                                 measure_memory, repeat, size)
+    return results
+
+
+def compare(results: Results, baseline: Results,
+            tolerance: float=0.25) -> List[str]:
+    """
+    Return a message for every metric which is worse than the baseline,
+    throughput, latency and memory may drift by the tolerance fraction but
+    solved puzzles and search nodes are deterministic and must not regress
+    """
+    regressions = []  # type: List[str]
+    for corpus, engines in sorted(results.items()):
+        for engine, result in sorted(engines.items()):
+            base = baseline.get(corpus, {}).get(engine)
+            if base is None:
+                continue
+            name = '{}/{}'.format(corpus, engine)
+            if result['solved'] < base['solved']:
+                regressions.append('{} solved {} < {}'.format(
+                    name, result['solved'], base['solved']))
+            if result['nodes'] > base['nodes']:
+                regressions.append('{} nodes {} > {}'.format(
+                    name, result['nodes'], base['nodes']))
+            if result['puzzles_per_sec'] < \
+                    base['puzzles_per_sec'] * (1 - tolerance):
+                regressions.append('{} puzzles/sec {:.1f} < {:.1f}'.format(
+                    name, result['puzzles_per_sec'], base['puzzles_per_sec']))
+            for metric in ['p50_ms', 'p99_ms', 'peak_kib']:
+                if result[metric] is None or base.get(metric) is None:
+                    continue
+                if result[metric] > base[metric] * (1 + tolerance):
+                    regressions.append('{} {} {:.2f} > {:.2f}'.format(
+                        name, metric, result[metric], base[metric]))
+    return regressions
+
+
+def report(results: Results) -> str:
+    """Format the results as a plain text table"""
+    lines = ['{:<10} {:<12} {:>7} {:>11} {:>9} {:>9} {:>9} {:>10}'.format(
+        'corpus', 'engine', 'solved', 'puzzles/s', 'p50 ms', 'p99 ms',
+        'nodes', 'peak KiB')]
+    for corpus, engines in results.items():
+        for engine, result in engines.items():
+            peak = result['peak_kib']
+            lines.append(
+                '{:<10} {:<12} {:>7} {:>11.1f} {:>9.3f} {:>9.3f} {:>9} '
+                '{:>10}'.format(corpus, engine, result['solved'],
+                                result['puzzles_per_sec'], result['p50_ms'],
+                                result['p99_ms'], result['nodes'],
+                                '-' if peak is None else
+                                '{:.1f}'.format(peak)))
+    return '\n'.join(lines)
+
+
+def main(argv: Sequence[str]=None) -> int:
+    """Run the benchmarks and return 1 if any regression was flagged"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--engines', nargs='+', choices=sorted(ENGINES),
+                        default=sorted(ENGINES))
+    parser.add_argument('--corpora', nargs='+', choices=sorted(CORPORA),
+                        default=['easy', 'hard', 'diagonal'])
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-memory', action='store_true')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.engines, args.corpora,
+                             measure_memory=not args.no_memory,
+                             repeat=args.repeat)
+    print(report(results))
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump(results, baseline_file, indent=2, sort_keys=True)
+        print('Saved baseline to {}'.format(args.baseline))
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print('No baseline at {}'.format(args.baseline))
+        return 0
+    with open(args.baseline) as baseline_file:
+        regressions = compare(results, json.load(baseline_file),
+                              args.tolerance)
+    for regression in regressions:
+        print('REGRESSION {}'.format(regression))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,13 +5,34 @@ This file is a solution.py proxy to connect the original udacity
 solution_test.py test with my project code base
 """
 
+import os
+import threading
+from multiprocessing import Pool
+from typing import Iterable, Iterator, Optional
+
 from sudoku.board import Board as SB
 from sudoku.board import BoardState
+from sudoku.bitboard import BitBoard
+from sudoku.dlx import DancingLinks
+from sudoku.stream import PackedWriter, read_puzzles
+
+# one board per pool worker so the unit and peer caches are only built once
+_WORKER_BOARD = None  # type: BitBoard
 
 
-def solve(board_string: str) -> BoardState:
-    """Call search with diagonal_mode True in board.py"""
-    sbrd = SB(diagonal_mode=True)
+def solve(board_string: str, engine: str='board') -> BoardState:
+    """
+    Call search with diagonal_mode True in board.py, engine can be board,
+    bitboard or dlx to pick the string, bitmask or dancing links solver
+    """
+    if engine == 'dlx':
+        return DancingLinks(diagonal_mode=True).solve(board_string)
+    if engine == 'bitboard':
+        sbrd = BitBoard(diagonal_mode=True)  # type: SB
+    elif engine == 'board':
+        sbrd = SB(diagonal_mode=True)
+    else:
+        raise ValueError('Unknown engine {}'.format(engine))
     board = sbrd.grid_values(board_string)
     return sbrd.search(board)
 
@@ -20,3 +41,86 @@ def naked_twins(board_dict: BoardState) -> BoardState:
     """Call naked_twins in board.py"""
     sbrd = SB()
     return sbrd.naked_twins(board_dict)
+
+
+def _init_worker(diagonal_mode: bool, size: int) -> None:
+    """Build the board a worker process reuses for every puzzle"""
+    global _WORKER_BOARD  # pylint: disable=global-statement
+    _WORKER_BOARD = BitBoard(diagonal_mode=diagonal_mode, trail=True,
+                             size=size)
+
+
+def _solve_in_worker(board_string: str) -> Optional[BoardState]:
+    """Solve a single puzzle string with the board of the current worker"""
+    cells = _WORKER_BOARD.search_cells(_WORKER_BOARD.grid_cells(board_string))
+    if cells is None:
+        return None
+    return _WORKER_BOARD.to_board_state(cells)
+
+
+def _puzzle_lines(puzzles: Iterable[str], pending: threading.Semaphore,
+                  closed: threading.Event) -> Iterator[str]:
+    """
+    Strip line endings so file objects can be passed straight in, skip blank
+    lines and block once too many puzzles are waiting on the pool
+    """
+    for line in puzzles:
+        board_string = line.strip()
+        if board_string:
+            pending.acquire()
+            if closed.is_set():
+                return
+            yield board_string
+
+
+def solve_many(puzzles: Iterable[str], workers: Optional[int]=None,
+               chunksize: int=64, diagonal_mode: bool=True,
+               size: int=9) -> Iterator[Optional[BoardState]]:
+    """
+    Lazily solve a stream of puzzle strings with one character per box,
+    such as an open file or a generator, across a pool of worker processes
+    and yield each solution or None in the same order as the input
+
+    workers=None uses one process per cpu and workers=1 solves in process,
+    only a bounded number of chunks are read ahead of the caller so inputs
+    larger than memory can be streamed
+    """
+    if workers == 1:
+        _init_worker(diagonal_mode, size)
+        for line in puzzles:
+            board_string = line.strip()
+            if board_string:
+                yield _solve_in_worker(board_string)
+        return
+
+    processes = workers or os.cpu_count() or 1
+    pending = threading.Semaphore(processes * chunksize * 4)
+    closed = threading.Event()
+    with Pool(processes=processes, initializer=_init_worker,
+              initargs=(diagonal_mode, size)) as pool:
+        lines = _puzzle_lines(puzzles, pending, closed)
+        try:
+            for result in pool.imap(_solve_in_worker, lines, chunksize):
+                pending.release()
+                yield result
+        finally:
+            # unblock the pool feeder thread if the caller stopped early
+            closed.set()
+            pending.release()
+
+
+def solve_file(puzzle_path: str, solution_path: str,
+               workers: Optional[int]=None, diagonal_mode: bool=True,
+               size: int=9) -> int:
+    """
+    Stream a line delimited puzzle file through solve_many into a packed
+    solution file one record at a time and return the number of puzzles
+    """
+    count = 0
+    with open(solution_path, 'wb') as solution_file:
+        writer = PackedWriter(solution_file, size=size)
+        for solution in solve_many(read_puzzles(puzzle_path), workers=workers,
+                                   diagonal_mode=diagonal_mode, size=size):
+            writer.write(solution)
+            count += 1
+    return count
@@ -0,0 +1,506 @@
+# -*- coding: utf-8 -*-
+# Author: github.com/madhavajay
+"""nd889 AIND Project 1 - Sudoku bitmask engine"""
+
+from itertools import combinations
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sudoku.board import Board, BoardState
+
+# type alias for the flat list of candidate bitmasks in boxes() order
+Cells = List[int]
+
+# type alias for a unit or peer group of box indexes
+IndexUnit = Tuple[int, ...]
+
+# type alias for the undo trail of (box index, previous mask) pairs
+CellTrail = List[Tuple[int, int]]
+
+# largest board size whose mask tables are built up front, 2 ** 9 entries
+MAX_TABLE_SIZE = 9
+
+
+class _MaskStrings(Dict[int, str]):
+    """Candidate string for each mask, filled on demand for large boards"""
+
+    def __init__(self, values: str) -> None:
+        super().__init__()
+        self._values = values
+
+    def __missing__(self, mask: int) -> str:
+        string = ''.join(digit for i, digit in enumerate(self._values)
+                         if mask >> i & 1)
+        self[mask] = string
+        return string
+
+
+class _MaskLengths(Dict[int, int]):
+    """Number of candidates in each mask, filled on demand for large boards"""
+
+    def __missing__(self, mask: int) -> int:
+        length = bin(mask).count('1')
+        self[mask] = length
+        return length
+
+
+class BitBoard(Board):
+    """
+    Sudoku Board which stores the candidates of each box as a bitmask in a
+    flat list, digit '1' is bit 0 and digit '9' is bit 8, with units and peers
+    precomputed as tuples of box indexes
+
+    Masks have one bit per value so 16x16 and 25x25 boards stay as compact
+    integers, the mask to string and mask to length lookups are tuples for
+    9x9 boards and memo dictionaries for larger ones
+
+    The BoardState methods inherited from Board keep their signatures and
+    convert to and from cells at the edges, the *_cells methods work on the
+    flat list directly and are what batch callers should use
+    """
+
+    def __init__(self, diagonal_mode: bool=False, incremental: bool=False,
+                 trail: bool=False, size: int=9) -> None:
+        super().__init__(diagonal_mode=diagonal_mode, incremental=incremental,
+                         trail=trail, size=size)
+        boxes = self.boxes()
+        index = dict((box, i) for i, box in enumerate(boxes))
+        self._boxes = boxes
+
+        self._index_units = tuple(
+            tuple(index[box] for box in unit)
+            for unit in self.all_units())  # type: Tuple[IndexUnit, ...]
+        self._index_peers = tuple(
+            tuple(sorted(index[peer] for peer in self.peers(box)))
+            for box in boxes)  # type: Tuple[IndexUnit, ...]
+        self._box_units = tuple(
+            tuple(unit for unit in self._index_units if i in unit)
+            for i in range(len(boxes)))  # type: Tuple[Tuple[IndexUnit, ...], ...]
+        self._box_unit_indexes = tuple(
+            tuple(self.unit_indexes(box))
+            for box in boxes)  # type: Tuple[IndexUnit, ...]
+
+        num_masks = 1 << size
+        self._all_values = num_masks - 1
+        self._digit_bits = dict(
+            (digit, 1 << i) for i, digit in enumerate(self._values))
+        self._mask_str = _MaskStrings(self._values)
+        self._mask_len = _MaskLengths()
+        if size <= MAX_TABLE_SIZE:
+            self._mask_str = tuple(self._mask_str[mask]
+                                   for mask in range(num_masks))
+            self._mask_len = tuple(len(string) for string in self._mask_str)
+
+    def to_cells(self, board_dict: BoardState) -> Cells:
+        """Convert a board state dictionary into a flat list of bitmasks"""
+        digit_bits = self._digit_bits
+        cells = []
+        for box in self._boxes:
+            mask = 0
+            for digit in board_dict[box]:
+                mask |= digit_bits[digit]
+            cells.append(mask)
+        return cells
+
+    def to_board_state(self, cells: Cells) -> BoardState:
+        """Convert a flat list of bitmasks into a board state dictionary"""
+        mask_str = self._mask_str
+        return dict((box, mask_str[mask])
+                    for box, mask in zip(self._boxes, cells))
+
+    def grid_cells(self, board_string: str) -> Cells:
+        """Convert unsolved board string straight into a list of bitmasks"""
+        if len(board_string) != self.num_boxes():
+            raise ValueError('Board string length must be {} characters'
+                             .format(self.num_boxes()))
+
+        digit_bits = self._digit_bits
+        all_values = self._all_values
+        return [digit_bits.get(value, all_values) for value in board_string]
+
+    def cells_to_grid(self, cells: Cells) -> str:
+        """
+        Convert a list of bitmasks back into a one character per box string
+        with '.' for every box which is not solved yet
+        """
+        mask_str = self._mask_str
+        mask_len = self._mask_len
+        return ''.join(mask_str[mask] if mask_len[mask] == 1 else '.'
+                       for mask in cells)
+
+    def num_solved_cells(self, cells: Cells) -> int:
+        """Calculate number of solved boxes in the list of bitmasks"""
+        mask_len = self._mask_len
+        return len([mask for mask in cells if mask_len[mask] == 1])
+
+    @staticmethod
+    def _write_back(board_dict: BoardState, state: BoardState) -> BoardState:
+        """Update the callers dictionary in place like Board strategies do"""
+        board_dict.update(state)
+        return board_dict
+
+    def eliminate_cells(self, cells: Cells) -> Cells:
+        """Remove the value of every solved box from the masks of its peers"""
+        mask_len = self._mask_len
+        peers = self._index_peers
+        solved = [i for i, mask in enumerate(cells) if mask_len[mask] == 1]
+        for i in solved:
+            clear = ~cells[i]
+            for peer in peers[i]:
+                cells[peer] &= clear
+        return cells
+
+    def only_choice_cells(self, cells: Cells) -> Cells:
+        """
+        Set every box which holds the only copy of a digit in a unit to that
+        digit, the digits seen exactly once are found by folding the unit
+        into seen once and seen twice masks
+        """
+        for unit in self._index_units:
+            once = 0
+            twice = 0
+            for i in unit:
+                mask = cells[i]
+                twice |= once & mask
+                once |= mask
+            unique = once & ~twice
+            if unique:
+                for i in unit:
+                    mask = cells[i] & unique
+                    if mask:
+                        cells[i] = mask & -mask
+        return cells
+
+    def naked_twins_cells(self, cells: Cells) -> Cells:
+        """Apply the naked twins strategy on the list of bitmasks"""
+        mask_len = self._mask_len
+        box_units = self._box_units
+        two_value_boxes = [i for i, mask in enumerate(cells)
+                           if mask_len[mask] == 2]
+
+        for i in two_value_boxes:
+            options = cells[i]
+            for unit in box_units[i]:
+                twins = [box for box in unit if cells[box] == options]
+                if len(twins) == 2:
+                    clear = ~options
+                    for box in unit:
+                        mask = cells[box]
+                        if mask & clear and box not in twins:
+                            cells[box] = mask & clear
+        return cells
+
+    def subsets_cells(self, cells: Cells, limit: int=4) -> bool:
+        """
+        Apply naked and hidden pairs, triples and quads up to limit boxes in
+        a single pass over each unit, returning True if any mask changed
+
+        Within a unit the unsolved boxes are indexed by mask so only boxes
+        with at most k candidates are combined for a naked subset of k, and
+        each digit is indexed by the bitmask of unit positions it can take
+        so only digits with at most k positions are combined for a hidden one
+        """
+        mask_len = self._mask_len
+        changed = False
+        for unit in self._index_units:
+            for size in range(2, limit + 1):
+                # naked subset, k boxes whose candidates union to k digits
+                open_boxes = [i for i in unit if mask_len[cells[i]] > 1]
+                if len(open_boxes) <= size:
+                    break
+                members = [i for i in open_boxes
+                           if mask_len[cells[i]] <= size]
+                for group in combinations(members, size):
+                    union = 0
+                    for i in group:
+                        union |= cells[i]
+                    if mask_len[union] != size:
+                        continue
+                    for i in open_boxes:
+                        mask = cells[i]
+                        if mask & union and i not in group:
+                            cells[i] = mask & ~union
+                            changed = True
+
+                # hidden subset, k digits which only fit in the same k boxes
+                # digits already placed in the unit are left to eliminate
+                placed = 0
+                for i in unit:
+                    if mask_len[cells[i]] == 1:
+                        placed |= cells[i]
+                positions = {}  # type: Dict[int, int]
+                for position, i in enumerate(unit):
+                    mask = cells[i] & ~placed
+                    if mask_len[cells[i]] > 1:
+                        while mask:
+                            bit = mask & -mask
+                            mask ^= bit
+                            positions[bit] = positions.get(bit, 0) | \
+                                1 << position
+                digits = [bit for bit, where in positions.items()
+                          if 1 < bin(where).count('1') <= size]
+                for group in combinations(digits, size):
+                    where = 0
+                    keep = 0
+                    for bit in group:
+                        where |= positions[bit]
+                        keep |= bit
+                    if bin(where).count('1') != size:
+                        continue
+                    for position, i in enumerate(unit):
+                        mask = cells[i]
+                        if where >> position & 1 and mask & ~keep:
+                            cells[i] = mask & keep
+                            changed = True
+        return changed
+
+    def reduce_cells(self, cells: Cells) -> Optional[Cells]:
+        """
+        Apply eliminate and only choice until no change, returning None as
+        soon as any box has no candidates left
+        """
+        if self._incremental:
+            return self.propagate_cells(cells)
+
+        stalled = False
+        while not stalled:
+            solved_values_before = self.num_solved_cells(cells)
+
+            cells = self.eliminate_cells(cells)
+            cells = self.only_choice_cells(cells)
+
+            if 0 in cells:
+                return None
+
+            solved_values_after = self.num_solved_cells(cells)
+            stalled = solved_values_before == solved_values_after
+
+            if solved_values_after == 0:
+                return None
+        return cells
+
+    def propagate_cells(self, cells: Cells, trail: CellTrail=None,
+                        changed: List[int]=None) -> Optional[Cells]:
+        """
+        Apply eliminate and only choice on bitmasks from a worklist of newly
+        solved boxes and changed units, returning None as soon as a box or a
+        digit in a unit has no options left
+
+        Every overwritten mask is pushed onto trail when one is supplied and
+        changed limits the starting worklist to boxes which were just solved
+        """
+        mask_len = self._mask_len
+        peers = self._index_peers
+        units = self._index_units
+        box_unit_indexes = self._box_unit_indexes
+        all_values = self._all_values
+        if changed is None:
+            solved = [i for i, mask in enumerate(cells)
+                      if mask_len[mask] == 1]
+            dirty_units = set(range(len(units)))
+        else:
+            solved = list(changed)
+            dirty_units = set(index for i in changed
+                              for index in box_unit_indexes[i])
+
+        while solved or dirty_units:
+            # Eliminate the digit of each newly solved box from its peers
+            while solved:
+                i = solved.pop()
+                bit = cells[i]
+                for peer in peers[i]:
+                    mask = cells[peer]
+                    if mask & bit:
+                        if trail is not None:
+                            trail.append((peer, mask))
+                        mask ^= bit
+                        if not mask:
+                            return None
+                        cells[peer] = mask
+                        if mask_len[mask] == 1:
+                            solved.append(peer)
+                        dirty_units.update(box_unit_indexes[peer])
+
+            # Apply only choice to one of the units which have changed
+            if dirty_units:
+                unit = units[dirty_units.pop()]
+                once = 0
+                twice = 0
+                for i in unit:
+                    mask = cells[i]
+                    twice |= once & mask
+                    once |= mask
+                if once != all_values:
+                    return None
+                unique = once & ~twice
+                if unique:
+                    for i in unit:
+                        mask = cells[i]
+                        hit = mask & unique
+                        if hit and hit != mask:
+                            # two digits which only fit in the same box
+                            if hit & (hit - 1):
+                                return None
+                            if trail is not None:
+                                trail.append((i, mask))
+                            cells[i] = hit
+                            solved.append(i)
+                            dirty_units.update(box_unit_indexes[i])
+
+        if changed is None and self.num_solved_cells(cells) == 0:
+            return None
+        return cells
+
+    def validate_cells(self, cells: Cells) -> bool:
+        """Check every unit holds every digit exactly once"""
+        mask_len = self._mask_len
+        if any(mask_len[mask] != 1 for mask in cells):
+            return False
+        for unit in self._index_units:
+            seen = 0
+            for i in unit:
+                seen |= cells[i]
+            if seen != self._all_values:
+                return False
+        return True
+
+    def search_cells(self, cells: Cells) -> Optional[Cells]:
+        """
+        Using depth-first search recursively reduce the list of bitmasks
+        until the first leaf is solved or there are no solutions
+        """
+        if self._trail:
+            return next(self.trail_search_cells(cells), None)
+
+        reduced = self.reduce_cells(cells)
+        if reduced is None:
+            return None
+
+        # Choose one of the unfilled boxes with the fewest possibilities
+        smallest_box = self.fewest_possibilities_cell(reduced)
+        if smallest_box == -1:
+            return reduced if self.validate_cells(reduced) else None
+
+        choices = reduced[smallest_box]
+        while choices:
+            choice = choices & -choices
+            choices ^= choice
+            board_copy = reduced[:]
+            board_copy[smallest_box] = choice
+            result = self.search_cells(board_copy)
+            if result is not None:
+                return result
+
+        return None
+
+    def fewest_possibilities_cell(self, cells: Cells) -> int:
+        """Return the first unsolved box index with the fewest possibilities"""
+        mask_len = self._mask_len
+        smallest_box = -1
+        fewest = self._size + 1
+        for i, mask in enumerate(cells):
+            length = mask_len[mask]
+            if 1 < length < fewest:
+                smallest_box = i
+                fewest = length
+        return smallest_box
+
+    def trail_search_cells(self, cells: Cells) -> Iterator[Cells]:
+        """
+        Iterative depth-first search on bitmasks which records every change
+        on an undo trail and restores it on backtrack instead of copying the
+        list, yielding a copy of each solution in search order
+        """
+        trail = []  # type: CellTrail
+        # propagate also gives None for cells with nothing solved, which is
+        # no contradiction so the search branches on them instead
+        if self.propagate_cells(cells, trail) is None and \
+                self.num_solved_cells(cells) > 0:
+            return
+
+        smallest_box = self.fewest_possibilities_cell(cells)
+        if smallest_box == -1:
+            if self.validate_cells(cells):
+                yield cells[:]
+            return
+
+        # each frame is [box to branch on, choices left, trail length]
+        stack = [[smallest_box, cells[smallest_box], len(trail)]]
+        while stack:
+            frame = stack[-1]
+            box, choices, mark = frame
+            while len(trail) > mark:
+                i, mask = trail.pop()
+                cells[i] = mask
+            if not choices:
+                stack.pop()
+                continue
+            choice = choices & -choices
+            frame[1] = choices ^ choice
+
+            trail.append((box, cells[box]))
+            cells[box] = choice
+            if self.propagate_cells(cells, trail, [box]) is None:
+                continue
+
+            smallest_box = self.fewest_possibilities_cell(cells)
+            if smallest_box == -1:
+                if self.validate_cells(cells):
+                    yield cells[:]
+                continue
+            stack.append([smallest_box, cells[smallest_box], len(trail)])
+
+    def count_solutions_cells(self, cells: Cells,
+                              limit: Optional[int]=2) -> int:
+        """Count the solutions of the bitmasks stopping early at limit"""
+        count = 0
+        for _ in self.trail_search_cells(cells[:]):
+            count += 1
+            if count == limit:
+                break
+        return count
+
+    def eliminate(self, board_dict: BoardState) -> BoardState:
+        """Apply the eliminate strategy on the supplied board and return it"""
+        cells = self.eliminate_cells(self.to_cells(board_dict))
+        return self._write_back(board_dict, self.to_board_state(cells))
+
+    def only_choice(self, board_dict: BoardState) -> BoardState:
+        """Apply only choice strategy on the supplied board and return it"""
+        cells = self.only_choice_cells(self.to_cells(board_dict))
+        return self._write_back(board_dict, self.to_board_state(cells))
+
+    def naked_twins(self, board_dict: BoardState) -> BoardState:
+        """Apply the naked twins strategy on the supplied board and return it"""
+        cells = self.naked_twins_cells(self.to_cells(board_dict))
+        return self._write_back(board_dict, self.to_board_state(cells))
+
+    def subsets(self, board_dict: BoardState, limit: int=4) -> BoardState:
+        """Apply naked and hidden subsets up to limit and return the board"""
+        cells = self.to_cells(board_dict)
+        if not self.subsets_cells(cells, limit):
+            return board_dict
+        return self._write_back(board_dict, self.to_board_state(cells))
+
+    def reduce_puzzle(self, board_dict: BoardState) -> BoardState:
+        """Apply eliminate and only choice on bitmasks until no change"""
+        cells = self.reduce_cells(self.to_cells(board_dict))
+        if cells is None:
+            return None
+        return self._write_back(board_dict, self.to_board_state(cells))
+
+    def search(self, board_dict: BoardState) -> BoardState:
+        """Search on bitmasks and return the solved board state or None"""
+        cells = self.search_cells(self.to_cells(board_dict))
+        if cells is None:
+            return None
+        return self.to_board_state(cells)
+
+    def count_solutions(self, board_dict: BoardState,
+                        limit: Optional[int]=2) -> int:
+        """Count solutions on bitmasks without building each board state"""
+        return self.count_solutions_cells(self.to_cells(board_dict), limit)
+
+    def trail_search(self, board_dict: BoardState) -> Iterator[BoardState]:
+        """Run the trail search on bitmasks yielding solved board states"""
+        for cells in self.trail_search_cells(self.to_cells(board_dict)):
+            yield self.to_board_state(cells)
@@ -2,7 +2,8 @@
 # Author: github.com/madhavajay
 """nd889 AIND Project 1 - Sudoku"""
 
-from typing import List, Dict, Set
+from typing import (Any, Callable, Dict, Iterator, List, Optional, Sequence,
+                    Set, Tuple)
 
 # type alias for the board state
 BoardState = Dict[str, str]
@@ -10,62 +11,122 @@ BoardState = Dict[str, str]
 # type alias for unit
 Unit = List[str]
 
+# type alias for the undo trail of (box, previous value) pairs
+Trail = List[Tuple[str, str]]
+
+# characters used for the values of boards up to 36x36, '1' to '9' then 'A'
+DIGITS = '123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+# characters used to name the rows of boards up to 36x36
+ROW_NAMES = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghij'
+
+# default board used when a sized method is called on the class itself
+_DEFAULT_BOARDS = {}  # type: Dict[type, Any]
+
+
+class sized_method():  # pylint: disable=invalid-name
+    """
+    Decorator for methods which depend on the size of the board, they are
+    bound to the board when called on an instance and to a cached default
+    9x9 board when called on the class so Board.boxes() keeps working
+    """
+
+    def __init__(self, func: Callable) -> None:
+        self._func = func
+        self.__doc__ = func.__doc__
+
+    def __get__(self, instance: Any, owner: type) -> Callable:
+        if instance is None:
+            if owner not in _DEFAULT_BOARDS:
+                _DEFAULT_BOARDS[owner] = owner()
+            instance = _DEFAULT_BOARDS[owner]
+        return self._func.__get__(instance, owner)
+
 
 class Board():
     """
     Sudoku Board which implements various strategies to solve sudoku puzzles
+
+    The board is size x size boxes split into squares of sqrt(size) x
+    sqrt(size), so size=16 and size=25 give 16x16 and 25x25 puzzles whose
+    values continue from '9' with 'A', 'B' and so on
     """
     _values = '123456789'
     _rows = 'ABCDEFGHI'
     _row_squares = ['ABC', 'DEF', 'GHI']
-    _cols = '123456789'
-    _col_squares = ['123', '456', '789']
+    _cols = '123456789'  # type: Sequence[str]
+    _col_squares = ['123', '456', '789']  # type: List[Sequence[str]]
+
+    def __init__(self, diagonal_mode: bool=False, incremental: bool=False,
+                 trail: bool=False, size: int=9) -> None:
+        square_size = int(round(size ** 0.5))
+        if square_size < 1 or square_size ** 2 != size or size > len(DIGITS):
+            raise ValueError('Board size must be a square number from 1 to '
+                             '{}'.format(len(DIGITS)))
+        self._size = size
+        self._square_size = square_size
+        if size != 9:
+            self._values = DIGITS[:size]
+            self._rows = ROW_NAMES[:size]
+            self._cols = [str(col) for col in range(1, size + 1)]
+            self._row_squares = [self._rows[i:i + square_size]
+                                 for i in range(0, size, square_size)]
+            self._col_squares = [self._cols[i:i + square_size]
+                                 for i in range(0, size, square_size)]
+        self._boxes = Board.cross(self._rows, self._cols)
 
-    def __init__(self, diagonal_mode: bool=False) -> None:
         self._diagonal_mode = diagonal_mode
+        self._incremental = incremental
+        self._trail = trail
         self._peers = None  # type: Dict[str, Set[str]]
         self._all_units = None  # type: List[Unit]
         self._units = None  # type: Dict[str, List[Unit]]
+        self._unit_indexes = None  # type: Dict[str, List[int]]
+
+    @property
+    def size(self) -> int:
+        """Return the number of values, rows and columns on the board"""
+        return self._size
 
     @staticmethod
-    def cross(x_axis: str, y_axis: str) -> List[str]:
+    def cross(x_axis: Sequence[str], y_axis: Sequence[str]) -> List[str]:
         """Zip characters from two strings into a list of 2 character keys"""
         return [x_val + y_val for x_val in x_axis for y_val in y_axis]
 
-    @staticmethod
-    def boxes() -> List[str]:
+    @sized_method
+    def boxes(self) -> List[str]:
         """Generate all possible box location keys on the board"""
-        return Board.cross(Board._rows, Board._cols)
+        return self._boxes
 
-    @staticmethod
-    def num_boxes() -> int:
+    @sized_method
+    def num_boxes(self) -> int:
         """Return the number of boxes in the board"""
-        return len(Board._rows) * len(Board._cols)
+        return len(self._rows) * len(self._cols)
 
-    @staticmethod
-    def _row_units() -> List[Unit]:
+    @sized_method
+    def _row_units(self) -> List[Unit]:
         """Generate all row units for the board"""
-        return [Board.cross(r, Board._cols) for r in Board._rows]
+        return [Board.cross(r, self._cols) for r in self._rows]
 
-    @staticmethod
-    def _column_units() -> List[Unit]:
+    @sized_method
+    def _column_units(self) -> List[Unit]:
         """Generate all column units for the board"""
-        return [Board.cross(Board._rows, c) for c in Board._cols]
+        return [Board.cross(self._rows, [c]) for c in self._cols]
 
-    @staticmethod
-    def _diagonal_units() -> List[Unit]:
+    @sized_method
+    def _diagonal_units(self) -> List[Unit]:
         """Generate both diagonal units for the board"""
-        unit_1 = [Board._rows[int(vl) - 1] + vl for vl in Board._values]
-        unit_2 = [Board._rows[::-1][int(vl) - 1] + vl for vl in Board._values]
+        unit_1 = [row + col for row, col in zip(self._rows, self._cols)]
+        unit_2 = [row + col for row, col in zip(self._rows[::-1], self._cols)]
 
         return [unit_1, unit_2]
 
-    @staticmethod
-    def _square_units() -> List[Unit]:
+    @sized_method
+    def _square_units(self) -> List[Unit]:
         """Generate all quadrant units for the board"""
         return [Board.cross(rs, cs)
-                for rs in Board._row_squares
-                for cs in Board._col_squares]
+                for rs in self._row_squares
+                for cs in self._col_squares]
 
     def all_units(self) -> List[Unit]:
         """
@@ -73,16 +134,16 @@ class Board():
         diagonal units if self._diagonal_mode is True
         """
         if self._all_units is None:
-            self._all_units = (Board._row_units() +
-                               Board._column_units() +
-                               Board._square_units())
+            self._all_units = (self._row_units() +
+                               self._column_units() +
+                               self._square_units())
             if self._diagonal_mode:
-                self._all_units = self._all_units + Board._diagonal_units()
+                self._all_units = self._all_units + self._diagonal_units()
         return self._all_units
 
     def generate_units(self) -> Dict[str, List[Unit]]:
         """Generate all units once and cache them"""
-        boxes = Board.boxes()
+        boxes = self.boxes()
 
         # add all combinations of units together
         all_u = self.all_units()
@@ -98,9 +159,21 @@ class Board():
             self._units = self.generate_units()
         return self._units[box]
 
+    def generate_unit_indexes(self) -> Dict[str, List[int]]:
+        """Generate the positions in all_units of the units for every box"""
+        all_u = self.all_units()
+        return dict((box, [index for index, unit in enumerate(all_u)
+                           if box in unit]) for box in self.boxes())
+
+    def unit_indexes(self, box: str) -> List[int]:
+        """Return the positions in all_units of the units for a given box"""
+        if self._unit_indexes is None:
+            self._unit_indexes = self.generate_unit_indexes()
+        return self._unit_indexes[box]
+
     def generate_peers(self) -> Dict[str, Set[str]]:
         """Generate all peers for every possible box key"""
-        boxes = Board.boxes()
+        boxes = self.boxes()
 
         peers = dict(
             (bx, set(sum(self.units(bx), [])) - set([bx])) for bx in boxes)
@@ -113,28 +186,29 @@ class Board():
             self._peers = self.generate_peers()
         return self._peers[box]
 
-    @staticmethod
-    def grid_values(board_string: str) -> BoardState:
+    @sized_method
+    def grid_values(self, board_string: str) -> BoardState:
         """Convert unsolved board string into a board state dictionary"""
-        if len(board_string) != Board.num_boxes():
-            raise ValueError('Board string length must be 81 characters')
+        if len(board_string) != self.num_boxes():
+            raise ValueError('Board string length must be {} characters'
+                             .format(self.num_boxes()))
 
         board_dict = {}
-        boxes = Board.boxes()
+        boxes = self.boxes()
         for index, value in enumerate(board_string):
             if value == '.':
-                value = Board._values
+                value = self._values
             board_dict[boxes[index]] = value
         return board_dict
 
-    @staticmethod
-    def board_to_str(board_dict: BoardState) -> str:
+    @sized_method
+    def board_to_str(self, board_dict: BoardState) -> str:
         """
         Convert a board dictionary into a comma separated string of values
         in order of the original boxes array for easy comparison during tests
         """
         string = ''
-        for key in Board.boxes():
+        for key in self.boxes():
             string += board_dict[key] + ','
         return string[:-1]
 
@@ -152,11 +226,11 @@ class Board():
         """Apply only choice strategy on the supplied board and return it"""
         all_units = self.all_units()
         for unit in all_units:
-            for number in range(1, 10):
+            for digit in self._values:
                 possible_boxes = [box for box in unit
-                                  if str(number) in board_dict[box]]
+                                  if digit in board_dict[box]]
                 if len(possible_boxes) == 1:
-                    board_dict[possible_boxes[0]] = str(number)
+                    board_dict[possible_boxes[0]] = digit
         return board_dict
 
     @staticmethod
@@ -174,6 +248,9 @@ class Board():
 
     def reduce_puzzle(self, board_dict: BoardState) -> BoardState:
         """Recursively apply eliminate and only choice until no change"""
+        if self._incremental:
+            return self.propagate(board_dict)
+
         stalled = False
         while not stalled:
             # Check how many boxes have a determined value
@@ -196,11 +273,69 @@ class Board():
                 return None
         return board_dict
 
+    def propagate(self, board_dict: BoardState, trail: Trail=None,
+                  changed: List[str]=None) -> BoardState:
+        """
+        Apply eliminate and only choice from a worklist so only the peers of
+        newly solved boxes and the units they touch are revisited, returning
+        None as soon as a box or a digit in a unit has no options left
+
+        Every overwritten value is pushed onto trail when one is supplied and
+        changed limits the starting worklist to boxes which were just solved
+        """
+        all_units = self.all_units()
+        if changed is None:
+            solved = [box for box in board_dict.keys()
+                      if len(board_dict[box]) == 1]
+            dirty_units = set(range(len(all_units)))
+        else:
+            solved = list(changed)
+            dirty_units = set(index for box in changed
+                              for index in self.unit_indexes(box))
+
+        while solved or dirty_units:
+            # Eliminate the digit of each newly solved box from its peers
+            while solved:
+                box = solved.pop()
+                digit = board_dict[box]
+                for peer in self.peers(box):
+                    if digit in board_dict[peer]:
+                        if trail is not None:
+                            trail.append((peer, board_dict[peer]))
+                        value = board_dict[peer].replace(digit, '')
+                        board_dict[peer] = value
+                        if not value:
+                            return None
+                        if len(value) == 1:
+                            solved.append(peer)
+                        dirty_units.update(self.unit_indexes(peer))
+
+            # Apply only choice to one of the units which have changed
+            if dirty_units:
+                unit = all_units[dirty_units.pop()]
+                for digit in self._values:
+                    possible_boxes = [box for box in unit
+                                      if digit in board_dict[box]]
+                    if not possible_boxes:
+                        return None
+                    box = possible_boxes[0]
+                    if len(possible_boxes) == 1 and board_dict[box] != digit:
+                        if trail is not None:
+                            trail.append((box, board_dict[box]))
+                        board_dict[box] = digit
+                        solved.append(box)
+                        dirty_units.update(self.unit_indexes(box))
+
+        # If no values at all terminate and return None
+        if changed is None and Board.num_solved_boxes(board_dict) == 0:
+            return None
+        return board_dict
+
     def validate(self, board_dict: BoardState) -> bool:
-        """Check every unit on the board contains the set 1-9"""
+        """Check every unit on the board holds each digit of its size once"""
         valid = True
         all_units = self.all_units()
-        complete_unit = set(Board._values)
+        complete_unit = set(self._values)
         for unit in all_units:
             unit_values = [board_dict[box] for box in unit]
             unit_set = set(unit_values)
@@ -214,12 +349,15 @@ class Board():
         Using depth-first search recursively reduce the board state
         until the first leaf is solved or there are no solutions
         """
+        if self._trail:
+            return next(self.trail_search(board_dict), None)
+
         # First, reduce the puzzle using the previous function
         reduced = self.reduce_puzzle(board_dict)
         if reduced is None:
             return reduced
 
-        if Board.num_solved_boxes(reduced) == Board.num_boxes():
+        if Board.num_solved_boxes(reduced) == self.num_boxes():
             if self.validate(reduced):
                 return reduced
             else:
@@ -240,6 +378,85 @@ class Board():
 
         return None
 
+    @staticmethod
+    def fewest_possibilities_box(board_dict: BoardState) -> Optional[str]:
+        """Return the first unsolved box with the fewest possibilities"""
+        smallest_box = None
+        fewest = 0
+        for box, value in board_dict.items():
+            if len(value) > 1 and (smallest_box is None or len(value) < fewest):
+                smallest_box = box
+                fewest = len(value)
+        return smallest_box
+
+    @staticmethod
+    def undo(board_dict: BoardState, trail: Trail, mark: int) -> None:
+        """Pop the trail back to mark restoring every overwritten value"""
+        while len(trail) > mark:
+            box, value = trail.pop()
+            board_dict[box] = value
+
+    def trail_search(self, board_dict: BoardState) -> Iterator[BoardState]:
+        """
+        Iterative depth-first search which records every change on an undo
+        trail and restores it on backtrack instead of copying the board,
+        yielding a copy of each solution in the same order search finds them
+        """
+        trail = []  # type: Trail
+        # propagate also gives None for a board with nothing solved, which
+        # is no contradiction so the search branches on it instead
+        if self.propagate(board_dict, trail) is None and \
+                Board.num_solved_boxes(board_dict) > 0:
+            return
+
+        smallest_box = Board.fewest_possibilities_box(board_dict)
+        if smallest_box is None:
+            if self.validate(board_dict):
+                yield dict(board_dict)
+            return
+
+        # each frame is [box to branch on, next choice, trail length]
+        stack = [[smallest_box, 0, len(trail)]]
+        while stack:
+            frame = stack[-1]
+            box, choice, mark = frame
+            Board.undo(board_dict, trail, mark)
+            options = board_dict[box]
+            if choice == len(options):
+                stack.pop()
+                continue
+            frame[1] = choice + 1
+
+            trail.append((box, options))
+            board_dict[box] = options[choice]
+            if self.propagate(board_dict, trail, [box]) is None:
+                continue
+
+            smallest_box = Board.fewest_possibilities_box(board_dict)
+            if smallest_box is None:
+                if self.validate(board_dict):
+                    yield dict(board_dict)
+                continue
+            stack.append([smallest_box, 0, len(trail)])
+
+    def count_solutions(self, board_dict: BoardState,
+                        limit: Optional[int]=2) -> int:
+        """
+        Continue the trail search past the first solution and count them,
+        stopping once limit solutions are found or exhausting the search
+        when limit is None, the supplied board is left unchanged
+        """
+        count = 0
+        for _ in self.trail_search(dict(board_dict)):
+            count += 1
+            if count == limit:
+                break
+        return count
+
+    def is_unique(self, board_dict: BoardState) -> bool:
+        """Check the board has exactly one solution"""
+        return self.count_solutions(board_dict, limit=2) == 1
+
     def naked_twins(self, board_dict: BoardState) -> BoardState:
         """
         Search for pairs of unsolved boxes with 2 matching values in each unit
@@ -313,14 +530,18 @@ class Board():
                     board_dict[box] = new_set
         return board_dict
 
-    @staticmethod
-    def display(values: BoardState) -> None:
+    @sized_method
+    def display(self, values: BoardState) -> None:
         """Print ascii board representation of board dictionary"""
-        width = 1 + max(len(values[s]) for s in Board.boxes())
-        line = '+'.join(['-' * (width * 3)] * 3)
-        for row in Board._rows:
+        square = self._square_size
+        width = 1 + max(len(values[s]) for s in self.boxes())
+        line = '+'.join(['-' * (width * square)] * square)
+        last = self._size - 1
+        for row_index, row in enumerate(self._rows):
             print(''.join(
                 values[row + col].center(width) +
-                ('|' if col in '36' else '') for col in Board._cols))
-            if row in 'CF':
+                ('|' if index % square == square - 1 and index != last
+                 else '')
+                for index, col in enumerate(self._cols)))
+            if row_index % square == square - 1 and row_index != last:
                 print(line)
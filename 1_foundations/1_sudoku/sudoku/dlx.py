@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+# Author: github.com/madhavajay
+"""nd889 AIND Project 1 - Sudoku exact cover with dancing links"""
+
+from typing import Iterator, List, Optional
+
+from sudoku.board import DIGITS, Board, BoardState
+
+
+class DancingLinks():
+    """
+    Exact cover solver for sudoku using Knuth's Algorithm X with dancing
+    links stored in flat lists instead of node objects
+
+    Each candidate row places one digit in one box and covers the column for
+    that box plus a column for the digit in every unit of the box, so the
+    diagonal units of diagonal_mode are just two more exact cover constraints
+    """
+
+    def __init__(self, diagonal_mode: bool=False, size: int=9) -> None:
+        self._board = Board(diagonal_mode=diagonal_mode, size=size)
+        self._digits = DIGITS[:size]
+        num_boxes = self._board.num_boxes()
+        all_units = self._board.all_units()
+        box_index = dict((box, i) for i, box in enumerate(self._board.boxes()))
+        box_units = [[] for _ in range(num_boxes)]  # type: List[List[int]]
+        for unit_index, unit in enumerate(all_units):
+            for box in unit:
+                box_units[box_index[box]].append(unit_index)
+
+        # node 0 is the root, nodes 1 to num_columns are column headers with
+        # box columns first then one column per (unit, digit) pair
+        num_columns = num_boxes + len(all_units) * size
+        self._left = [i - 1 for i in range(num_columns + 1)]
+        self._right = [i + 1 for i in range(num_columns + 1)]
+        self._left[0] = num_columns
+        self._right[num_columns] = 0
+        self._up = list(range(num_columns + 1))
+        self._down = list(range(num_columns + 1))
+        self._column = list(range(num_columns + 1))
+        self._sizes = [0] * (num_columns + 1)
+        self._row_of = [-1] * (num_columns + 1)
+
+        # first node of each candidate row, row = box * size + digit
+        self._row_start = []  # type: List[int]
+        for box in range(num_boxes):
+            for digit in range(size):
+                columns = [1 + box] + [1 + num_boxes + unit * size + digit
+                                       for unit in box_units[box]]
+                self._row_start.append(
+                    self._add_row(box * size + digit, columns))
+
+    def _add_row(self, row: int, columns: List[int]) -> int:
+        """Append a candidate row covering columns and return its first node"""
+        first = len(self._column)
+        for offset, column in enumerate(columns):
+            node = first + offset
+            self._left.append(node - 1 if offset else first + len(columns) - 1)
+            self._right.append(node + 1 if offset < len(columns) - 1
+                               else first)
+            self._up.append(self._up[column])
+            self._down.append(column)
+            self._down[self._up[column]] = node
+            self._up[column] = node
+            self._column.append(column)
+            self._row_of.append(row)
+            self._sizes[column] += 1
+        return first
+
+    def _cover(self, column: int) -> None:
+        """Unlink a column header and every row which uses that column"""
+        left, right, up, down = self._left, self._right, self._up, self._down
+        col, sizes = self._column, self._sizes
+        right[left[column]] = right[column]
+        left[right[column]] = left[column]
+        i = down[column]
+        while i != column:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                sizes[col[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def _uncover(self, column: int) -> None:
+        """Relink a column in exactly the reverse order of _cover"""
+        left, right, up, down = self._left, self._right, self._up, self._down
+        col, sizes = self._column, self._sizes
+        i = up[column]
+        while i != column:
+            j = left[i]
+            while j != i:
+                sizes[col[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[column]] = column
+        left[right[column]] = column
+
+    def _select(self, node: int) -> None:
+        """Cover the other columns of the row containing node"""
+        j = self._right[node]
+        while j != node:
+            self._cover(self._column[j])
+            j = self._right[j]
+
+    def _deselect(self, node: int) -> None:
+        """Uncover the other columns of the row containing node"""
+        j = self._left[node]
+        while j != node:
+            self._uncover(self._column[j])
+            j = self._left[j]
+
+    def _rows(self, board_string: str) -> Iterator[List[int]]:
+        """
+        Yield the candidate rows of every exact cover of the puzzle, the
+        links are always restored when the generator finishes or is closed
+        """
+        size = len(self._digits)
+        if len(board_string) != len(self._row_start) // size:
+            raise ValueError('Board string length must be {} characters'
+                             .format(len(self._row_start) // size))
+
+        right, down, col, sizes = self._right, self._down, self._column, \
+            self._sizes
+        digit_index = dict((digit, i) for i, digit in enumerate(self._digits))
+        givens = []  # type: List[int]
+        chosen = []  # type: List[int]
+        try:
+            # place the givens first, two givens sharing a column clash
+            covered = set()
+            for box, value in enumerate(board_string):
+                if value not in digit_index:
+                    continue
+                node = self._row_start[box * size + digit_index[value]]
+                row_columns = [col[node]]
+                j = right[node]
+                while j != node:
+                    row_columns.append(col[j])
+                    j = right[j]
+                if covered.intersection(row_columns):
+                    return
+                covered.update(row_columns)
+                self._cover(col[node])
+                self._select(node)
+                givens.append(node)
+
+            while True:
+                if right[0] == 0:
+                    yield givens + chosen
+                else:
+                    # choose the column with the fewest rows left
+                    column = right[0]
+                    best = column
+                    while column != 0:
+                        if sizes[column] < sizes[best]:
+                            best = column
+                        column = right[column]
+                    if sizes[best]:
+                        self._cover(best)
+                        chosen.append(down[best])
+                        self._select(chosen[-1])
+                        continue
+
+                # backtrack to the next untried row of the deepest column
+                while chosen:
+                    node = chosen.pop()
+                    self._deselect(node)
+                    column = col[node]
+                    node = down[node]
+                    if node != column:
+                        chosen.append(node)
+                        self._select(node)
+                        break
+                    self._uncover(column)
+                else:
+                    return
+        finally:
+            for node in reversed(givens + chosen):
+                self._deselect(node)
+                self._uncover(col[node])
+
+    def _to_board_state(self, rows: List[int]) -> BoardState:
+        """Convert a list of candidate row nodes into a board state"""
+        size = len(self._digits)
+        boxes = self._board.boxes()
+        board_dict = {}
+        for node in rows:
+            row = self._row_of[node]
+            board_dict[boxes[row // size]] = self._digits[row % size]
+        return board_dict
+
+    def solutions(self, board_string: str) -> Iterator[BoardState]:
+        """Yield every solution of the puzzle as a board state"""
+        for rows in self._rows(board_string):
+            yield self._to_board_state(rows)
+
+    def solve(self, board_string: str) -> Optional[BoardState]:
+        """Return the first solution of the puzzle or None"""
+        rows = self._rows(board_string)
+        try:
+            for solution in rows:
+                return self._to_board_state(solution)
+            return None
+        finally:
+            rows.close()
+
+    def count_solutions(self, board_string: str,
+                        limit: Optional[int]=2) -> int:
+        """
+        Count the solutions of the puzzle, stopping early at limit or
+        exhausting the search when limit is None
+        """
+        count = 0
+        rows = self._rows(board_string)
+        try:
+            for _ in rows:
+                count += 1
+                if count == limit:
+                    break
+        finally:
+            rows.close()
+        return count
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+# Author: github.com/madhavajay
+"""nd889 AIND Project 1 - Sudoku strategy profiler"""
+
+import csv
+import json
+import time
+from typing import Any, Callable, Dict, IO, List, Optional, Sequence
+
+from sudoku.board import Board, BoardState
+from sudoku.bitboard import BitBoard
+
+# strategies a ProfiledBoard can apply in its reduce loop, naked multi
+# strategies are applied with the group size in their name and subsets is
+# the naked and hidden subset engine of BitBoard
+STRATEGIES = ['eliminate', 'only_choice', 'naked_twins', 'naked_triples',
+              'naked_quads', 'subsets']
+
+# the eliminate and only choice loop used by Board.reduce_puzzle
+DEFAULT_STRATEGIES = ['eliminate', 'only_choice']
+
+
+class PuzzleProfile():
+    """Time, candidates removed and search counters for a single puzzle"""
+
+    def __init__(self, puzzle: str, strategies: Sequence[str]) -> None:
+        self.puzzle = puzzle
+        self.solved = False
+        self.time = 0.0
+        self.nodes = 0
+        self.backtracks = 0
+        self.calls = dict((name, 0) for name in strategies)
+        self.times = dict((name, 0.0) for name in strategies)
+        self.removed = dict((name, 0) for name in strategies)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the profile as a flat dictionary of columns"""
+        row = {
+            'puzzle': self.puzzle,
+            'solved': self.solved,
+            'time': self.time,
+            'nodes': self.nodes,
+            'backtracks': self.backtracks
+        }  # type: Dict[str, Any]
+        for name in self.calls:
+            row[name + '_calls'] = self.calls[name]
+            row[name + '_time'] = self.times[name]
+            row[name + '_removed'] = self.removed[name]
+        return row
+
+
+class StrategyProfiler():
+    """Collects a PuzzleProfile for every puzzle in a batch"""
+
+    def __init__(self) -> None:
+        self.profiles = []  # type: List[PuzzleProfile]
+
+    def start(self, puzzle: str, strategies: Sequence[str]) -> PuzzleProfile:
+        """Begin a new profile for the puzzle and return it"""
+        profile = PuzzleProfile(puzzle, strategies)
+        self.profiles.append(profile)
+        return profile
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """Return every profile as a flat dictionary"""
+        return [profile.to_dict() for profile in self.profiles]
+
+    def to_json(self, fp: IO[str]) -> None:
+        """Write the batch to an open file as a json list"""
+        json.dump(self.rows(), fp, indent=2)
+
+    def to_csv(self, fp: IO[str]) -> None:
+        """Write the batch to an open file as csv with a header row"""
+        rows = self.rows()
+        fieldnames = []  # type: List[str]
+        for row in rows:
+            fieldnames.extend(key for key in row if key not in fieldnames)
+        writer = csv.DictWriter(fp, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+class ProfiledBoard(Board):
+    """
+    Board which applies a chosen list of strategies in its reduce loop and
+    records how long each one takes and how many candidates it removes,
+    plus the search nodes and backtracks, into a StrategyProfiler
+
+    Profiling uses the copying search so each reduce step can be timed
+    """
+
+    def __init__(self, diagonal_mode: bool=False,
+                 strategies: Sequence[str]=None,
+                 profiler: StrategyProfiler=None, size: int=9) -> None:
+        super().__init__(diagonal_mode=diagonal_mode, size=size)
+        strategies = list(strategies or DEFAULT_STRATEGIES)
+        for name in strategies:
+            if name not in STRATEGIES:
+                raise ValueError('Unknown strategy {}'.format(name))
+        self._strategies = strategies
+        self._profiler = profiler or StrategyProfiler()
+        self._profile = None  # type: Optional[PuzzleProfile]
+        self._bitboard = BitBoard(diagonal_mode=diagonal_mode, size=size)
+
+    @property
+    def profiler(self) -> StrategyProfiler:
+        """Return the profiler collecting the results of this board"""
+        return self._profiler
+
+    def _strategy(self, name: str) -> Callable[[BoardState], BoardState]:
+        """Return the board method for the strategy name"""
+        if name == 'naked_triples':
+            return lambda board_dict: self.naked_multi(board_dict, 3)
+        if name == 'naked_quads':
+            return lambda board_dict: self.naked_multi(board_dict, 4)
+        if name == 'subsets':
+            return self._bitboard.subsets
+        return getattr(self, name)
+
+    @staticmethod
+    def num_candidates(board_dict: BoardState) -> int:
+        """Count the possible values left across every box"""
+        return sum(len(value) for value in board_dict.values())
+
+    def solve(self, board_string: str) -> Optional[BoardState]:
+        """Search the puzzle string recording a new profile for it"""
+        self._profile = self._profiler.start(board_string, self._strategies)
+        start = time.perf_counter()
+        try:
+            result = self.search(self.grid_values(board_string))
+        finally:
+            self._profile.time = time.perf_counter() - start
+        self._profile.solved = result is not None
+        return result
+
+    def reduce_puzzle(self, board_dict: BoardState) -> BoardState:
+        """Apply every enabled strategy in turn until no candidate changes"""
+        profile = self._profile
+        stalled = False
+        while not stalled:
+            candidates_before = ProfiledBoard.num_candidates(board_dict)
+            for name in self._strategies:
+                before = ProfiledBoard.num_candidates(board_dict)
+                start = time.perf_counter()
+                board_dict = self._strategy(name)(board_dict)
+                if profile is not None:
+                    profile.times[name] += time.perf_counter() - start
+                    profile.calls[name] += 1
+                    profile.removed[name] += \
+                        before - ProfiledBoard.num_candidates(board_dict)
+
+            # If any box has no values left the board is a contradiction
+            if not all(board_dict.values()):
+                return None
+            stalled = (candidates_before ==
+                       ProfiledBoard.num_candidates(board_dict))
+
+        # If no values at all terminate and return None
+        if Board.num_solved_boxes(board_dict) == 0:
+            return None
+        return board_dict
+
+    def search(self, board_dict: BoardState) -> BoardState:
+        """Count each search node and every node which fails to solve"""
+        if self._profile is not None:
+            self._profile.nodes += 1
+        result = super().search(board_dict)
+        if result is None and self._profile is not None:
+            self._profile.backtracks += 1
+        return result
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+# Author: github.com/madhavajay
+"""nd889 AIND Project 1 - Sudoku puzzle file streaming"""
+
+import mmap
+import os
+from operator import or_
+from typing import IO, Iterator, Optional
+
+from sudoku.board import DIGITS, Board, BoardState
+
+# files at least this large are memory mapped instead of read line by line
+MMAP_THRESHOLD = 16 * 1024 * 1024
+
+# packed files start with this magic followed by one byte for the board size
+MAGIC = b'SDKP'
+
+
+def read_puzzles(path: str,
+                 mmap_threshold: int=MMAP_THRESHOLD) -> Iterator[str]:
+    """
+    Lazily yield every puzzle string from a line delimited file, skipping
+    blank lines, large files are memory mapped so only the pages being
+    read are held in memory
+    """
+    with open(path, 'rb') as puzzle_file:
+        if os.fstat(puzzle_file.fileno()).st_size < max(mmap_threshold, 1):
+            for line in puzzle_file:
+                line = line.strip()
+                if line:
+                    yield line.decode('ascii')
+            return
+
+        with mmap.mmap(puzzle_file.fileno(), 0,
+                       access=mmap.ACCESS_READ) as mapped:
+            for line in iter(mapped.readline, b''):
+                line = line.strip()
+                if line:
+                    yield line.decode('ascii')
+
+
+def record_size(size: int) -> int:
+    """
+    Return the bytes used per solution, boards up to 15x15 pack two values
+    per byte and larger boards use one byte per box
+    """
+    num_boxes = size * size
+    if size < 16:
+        return (num_boxes + 1) // 2
+    return num_boxes
+
+
+class PackedWriter():
+    """
+    Write solutions to a binary file as fixed width records so the n-th
+    solution is always at the same offset, each box is stored as the index
+    of its value counting from 1 and a record of zeros marks no solution
+    """
+
+    def __init__(self, fp: IO[bytes], size: int=9) -> None:
+        self._fp = fp
+        self._size = size
+        self._boxes = Board(size=size).boxes()
+        self._record_size = record_size(size)
+        # translate tables from value characters to low and high nibbles
+        low = bytearray(256)
+        for i, digit in enumerate(DIGITS[:size]):
+            low[ord(digit)] = i + 1
+        self._low = bytes(low)
+        self._high = bytes((value << 4) & 255 for value in low)
+        fp.write(MAGIC + bytes([size]))
+
+    def write_string(self, board_string: Optional[str]) -> None:
+        """Pack a solved board string with one character per box"""
+        if board_string is None:
+            self._fp.write(bytes(self._record_size))
+            return
+        raw = board_string.encode('ascii')
+        if self._size >= 16:
+            self._fp.write(raw.translate(self._low))
+            return
+        if len(raw) % 2:
+            raw += b'.'
+        self._fp.write(bytes(map(or_, raw[0::2].translate(self._high),
+                                 raw[1::2].translate(self._low))))
+
+    def write(self, solution: Optional[BoardState]) -> None:
+        """Pack a solved board state or a record of zeros for None"""
+        if solution is None:
+            self.write_string(None)
+            return
+        self.write_string(''.join(solution[box] for box in self._boxes))
+
+
+def read_packed(path: str) -> Iterator[Optional[str]]:
+    """
+    Lazily yield each packed solution as a board string with one character
+    per box, or None where the puzzle had no solution
+    """
+    with open(path, 'rb') as packed_file:
+        header = packed_file.read(len(MAGIC) + 1)
+        if len(header) != len(MAGIC) + 1 or header[:len(MAGIC)] != MAGIC:
+            raise ValueError('{} is not a packed solution file'.format(path))
+        size = header[-1]
+        num_boxes = size * size
+        size_of_record = record_size(size)
+        digits = '.' + DIGITS[:size]
+        nibbles = digits.ljust(16, '.')[:16]
+        pairs = [nibbles[byte >> 4] + nibbles[byte & 15]
+                 for byte in range(256)]
+        while True:
+            record = packed_file.read(size_of_record)
+            if len(record) < size_of_record:
+                return
+            if not any(record):
+                yield None
+            elif size >= 16:
+                yield ''.join(map(digits.__getitem__, record))
+            else:
+                yield ''.join(map(pairs.__getitem__, record))[:num_boxes]
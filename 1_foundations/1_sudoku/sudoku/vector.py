@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+# Author: github.com/madhavajay
+"""nd889 AIND Project 1 - Sudoku batch propagation with numpy"""
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from sudoku.board import BoardState
+from sudoku.bitboard import BitBoard
+
+# largest board whose candidate masks fit in the uint16 batch array
+MAX_VECTOR_SIZE = 16
+
+
+class VectorBoard():
+    """
+    Batch of K sudoku boards held as a (K, boxes) uint16 array of candidate
+    bitmasks in the same bit order as BitBoard, eliminate and only choice
+    are applied to every board at once with numpy gathers and reductions
+
+    Boards which propagation alone cannot finish are handed to the scalar
+    trail search of a BitBoard, starting from their propagated masks
+    """
+
+    def __init__(self, diagonal_mode: bool=False, size: int=9) -> None:
+        if size > MAX_VECTOR_SIZE:
+            raise ValueError('Vector boards support sizes up to {}'
+                             .format(MAX_VECTOR_SIZE))
+        self._board = BitBoard(diagonal_mode=diagonal_mode, trail=True,
+                               size=size)
+        num_boxes = self._board.num_boxes()
+        self._num_boxes = num_boxes
+        self._all_values = (1 << size) - 1
+
+        # peers padded with the index of an extra always empty box
+        peers = self._board._index_peers  # pylint: disable=protected-access
+        width = max(len(peer) for peer in peers)
+        self._peers = np.full((num_boxes, width), num_boxes, dtype=np.intp)
+        for i, peer in enumerate(peers):
+            self._peers[i, :len(peer)] = peer
+
+        # each box points at its (unit, position) slots in the flattened
+        # unit array, padded with an extra slot which never restricts it
+        units = self._board._index_units  # pylint: disable=protected-access
+        self._units = np.array(units, dtype=np.intp)
+        num_slots = self._units.size
+        slots = [[] for _ in range(num_boxes)]  # type: List[List[int]]
+        for slot, i in enumerate(self._units.flat):
+            slots[i].append(slot)
+        width = max(len(slot) for slot in slots)
+        self._slots = np.full((num_boxes, width), num_slots, dtype=np.intp)
+        for i, slot in enumerate(slots):
+            self._slots[i, :len(slot)] = slot
+
+        self._popcount = np.array([bin(mask).count('1')
+                                   for mask in range(1 << size)],
+                                  dtype=np.uint8)
+        self._char_masks = np.full(256, self._all_values, dtype=np.uint16)
+        for digit, bit in self._board._digit_bits.items():  # pylint: disable=protected-access
+            self._char_masks[ord(digit)] = bit
+
+    def to_array(self, board_strings: Sequence[str]) -> np.ndarray:
+        """Convert puzzle strings into a (K, boxes) array of bitmasks"""
+        for board_string in board_strings:
+            if len(board_string) != self._num_boxes:
+                raise ValueError('Board string length must be {} characters'
+                                 .format(self._num_boxes))
+        raw = np.frombuffer(''.join(board_strings).encode('latin-1'),
+                            dtype=np.uint8)
+        return self._char_masks[raw].reshape(len(board_strings),
+                                             self._num_boxes)
+
+    def eliminate_array(self, cells: np.ndarray) -> np.ndarray:
+        """Remove the value of every solved box from the masks of its peers"""
+        solved = np.where(self._popcount[cells] == 1, cells, 0)
+        padded = np.pad(solved, ((0, 0), (0, 1)), 'constant')
+        taken = np.bitwise_or.reduce(padded[:, self._peers], axis=2)
+        return cells & ~taken
+
+    def only_choice_array(self, cells: np.ndarray) -> np.ndarray:
+        """
+        Set every box which holds the only copy of a digit in a unit to that
+        digit, folding each unit into seen once and seen twice masks
+        """
+        unit_cells = cells[:, self._units]
+        once = np.zeros(unit_cells.shape[:2], dtype=cells.dtype)
+        twice = np.zeros_like(once)
+        for position in range(unit_cells.shape[2]):
+            mask = unit_cells[:, :, position]
+            twice |= once & mask
+            once |= mask
+        unique = (once & ~twice)[:, :, np.newaxis]
+        hits = unit_cells & unique
+        keep = np.where(hits != 0, hits, self._all_values).astype(cells.dtype)
+        keep = np.pad(keep.reshape(len(cells), -1), ((0, 0), (0, 1)),
+                      'constant', constant_values=self._all_values)
+        return cells & np.bitwise_and.reduce(keep[:, self._slots], axis=2)
+
+    def propagate_array(self, cells: np.ndarray) -> np.ndarray:
+        """Apply eliminate and only choice to the batch until no change"""
+        while True:
+            reduced = self.only_choice_array(self.eliminate_array(cells))
+            if np.array_equal(reduced, cells):
+                return reduced
+            cells = reduced
+
+    def classify_array(self, cells: np.ndarray) -> Tuple[np.ndarray,
+                                                         np.ndarray]:
+        """
+        Return boolean arrays marking the boards which are solved and the
+        boards which are contradictions, a box with no candidates, a digit
+        with no place in a unit or two equal values in a unit
+        """
+        counts = self._popcount[cells]
+        unit_cells = cells[:, self._units]
+        seen = np.bitwise_or.reduce(unit_cells, axis=2)
+        dead = (counts == 0).any(axis=1) | \
+            (seen != self._all_values).any(axis=1)
+        complete = (counts == 1).all(axis=1)
+        solved = complete & ~dead
+        return solved, dead
+
+    def solve_batch(self,
+                    board_strings: Sequence[str]) -> List[Optional[BoardState]]:
+        """
+        Propagate every puzzle at once and search the ones left unsolved,
+        returning a solution or None for each puzzle in input order
+        """
+        if not board_strings:
+            return []
+        cells = self.propagate_array(self.to_array(board_strings))
+        solved, dead = self.classify_array(cells)
+        board = self._board
+        results = []  # type: List[Optional[BoardState]]
+        for row, is_solved, is_dead in zip(cells.tolist(), solved, dead):
+            if is_dead:
+                results.append(None)
+                continue
+            if not is_solved:
+                row = board.search_cells(row)
+                if row is None:
+                    results.append(None)
+                    continue
+            results.append(board.to_board_state(row))
+        return results
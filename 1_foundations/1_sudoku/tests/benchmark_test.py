@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# Author: github.com/madhavajay
+"""This is a test for the sudoku benchmark harness"""
+
+import json
+
+import benchmark
+
+
+def test_corpora_load() -> None:
+    """Every corpus has full length puzzles of its board size"""
+    for corpus, (_, _, size) in benchmark.CORPORA.items():
+        puzzles = benchmark.load_corpus(corpus)
+        assert puzzles
+        assert all(len(puzzle) == size * size for puzzle in puzzles)
+    assert any(size == 16 for _, _, size in benchmark.CORPORA.values())
+
+
+def test_run_engine_metrics() -> None:
+    """Every engine solves a small sample and reports its metrics"""
+    puzzles = benchmark.load_corpus('diagonal')[:2]
+    for engine in benchmark.ENGINES:
+        result = benchmark.run_engine(engine, puzzles, True, repeat=1)
+        assert result['solved'] == 2
+        assert result['nodes'] >= 2
+        assert result['puzzles_per_sec'] > 0
+        assert result['p50_ms'] <= result['p99_ms']
+        assert result['peak_kib'] > 0
+
+
+def test_run_engine_sixteen() -> None:
+    """Every engine solves 16x16 puzzles of the sized corpus"""
+    puzzles = benchmark.load_corpus('sixteen')[:2]
+    for engine in benchmark.ENGINES:
+        result = benchmark.run_engine(engine, puzzles, False,
+                                      measure_memory=False, repeat=1, size=16)
+        assert result['solved'] == 2
+        assert result['nodes'] >= 2
+
+
+def test_compare_flags_regressions() -> None:
+    """Slower throughput and more nodes are flagged but small drift is not"""
+    base = {'puzzles': 2, 'solved': 2, 'puzzles_per_sec': 100.0,
+            'p50_ms': 1.0, 'p99_ms': 2.0, 'nodes': 10, 'peak_kib': 20.0}
+    baseline = {'easy': {'trail': base}}
+    drift = dict(base, puzzles_per_sec=90.0, p99_ms=2.2)
+    assert benchmark.compare({'easy': {'trail': drift}}, baseline) == []
+    worse = dict(base, puzzles_per_sec=50.0, nodes=11)
+    regressions = benchmark.compare({'easy': {'trail': worse}}, baseline)
+    assert len(regressions) == 2
+    assert benchmark.compare({'hard': {'trail': worse}}, baseline) == []
+
+
+def test_main_saves_and_compares(tmpdir) -> None:
+    """Saving a baseline then rerunning against it round trips"""
+    path = str(tmpdir.join('baseline.json'))
+    argv = ['--engines', 'trail', '--corpora', 'diagonal', '--baseline', path,
+            '--repeat', '1', '--no-memory']
+    assert benchmark.main(argv + ['--save-baseline']) == 0
+    with open(path) as baseline_file:
+        saved = json.load(baseline_file)
+    assert saved['diagonal']['trail']['solved'] == 50
+    assert benchmark.main(argv + ['--tolerance', '100']) == 0
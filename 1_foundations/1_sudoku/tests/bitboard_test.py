@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+# Author: github.com/madhavajay
+"""This is a test for the sudoku bitmask board class"""
+
+from sudoku.board import Board as SB
+from sudoku.bitboard import BitBoard as BB
+
+# pylint: disable=invalid-name
+easy_grid = ('..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8'
+             '..2.3..9..5.1.3..')
+hard_grid = ('4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5'
+             '..2.....1.4......')
+diagonal_grid = ('2.............62....1....7...6..8...3...9...7...6..4...4....8'
+                 '....52.............3')
+
+
+def test_cells_round_trip() -> None:
+    """Board state converts to cells and back without changes"""
+    bbrd = BB()
+    board = SB.grid_values(hard_grid)
+    cells = bbrd.to_cells(board)
+    assert len(cells) == SB.num_boxes()
+    assert cells == bbrd.grid_cells(hard_grid)
+    assert bbrd.to_board_state(cells) == board
+    assert bbrd.cells_to_grid(cells) == hard_grid
+
+
+def test_eliminate_matches_board() -> None:
+    """Eliminate on bitmasks matches the string board"""
+    expected = SB().eliminate(SB.grid_values(easy_grid))
+    board = BB().eliminate(SB.grid_values(easy_grid))
+    assert board == expected
+
+
+def test_reduce_puzzle_matches_board() -> None:
+    """Reduce on bitmasks stalls on the same incomplete board"""
+    expected = SB().reduce_puzzle(SB.grid_values(hard_grid))
+    board = BB().reduce_puzzle(SB.grid_values(hard_grid))
+    assert board == expected
+
+
+def test_reduce_puzzle_contradiction() -> None:
+    """Reduce on bitmasks returns None once a box has no candidates"""
+    bbrd = BB(diagonal_mode=True)
+    assert bbrd.reduce_cells(bbrd.grid_cells(easy_grid)) is None
+
+
+def test_search_matches_board() -> None:
+    """Search on bitmasks returns the same solutions as the string board"""
+    for grid, diagonal in [(hard_grid, False), (diagonal_grid, True)]:
+        expected = SB(diagonal_mode=diagonal).search(SB.grid_values(grid))
+        bbrd = BB(diagonal_mode=diagonal)
+        assert bbrd.search(SB.grid_values(grid)) == expected
+        assert bbrd.validate(expected)
+
+
+def test_naked_twins_matches_board() -> None:
+    """Naked twins on bitmasks matches the string board"""
+    reduced = SB().reduce_puzzle(SB.grid_values(hard_grid))
+    # plant a pair of twins in row A so the other row boxes lose 1 and 6
+    reduced['A2'] = '16'
+    reduced['A3'] = '16'
+    expected = SB().naked_twins(reduced.copy())
+    assert expected['A4'] == '39'
+    assert BB().naked_twins(reduced.copy()) == expected
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+# Author: github.com/madhavajay
+"""This is a test for the sudoku dancing links solver"""
+
+import solution
+from sudoku.board import Board as SB
+from sudoku.bitboard import BitBoard as BB
+from sudoku.dlx import DancingLinks as DL
+
+# pylint: disable=invalid-name
+hard_grid = ('4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5'
+             '..2.....1.4......')
+diagonal_grid = ('2.............62....1....7...6..8...3...9...7...6..4...4....8'
+                 '....52.............3')
+
+
+def test_solve_matches_search() -> None:
+    """Dancing links finds the same unique solutions as search"""
+    for grid, diagonal in [(hard_grid, False), (diagonal_grid, True)]:
+        expected = BB(diagonal_mode=diagonal).search(SB.grid_values(grid))
+        assert DL(diagonal_mode=diagonal).solve(grid) == expected
+
+
+def test_count_solutions() -> None:
+    """Counting stops at the limit and finds unique and clashing puzzles"""
+    dlx = DL()
+    assert dlx.count_solutions(hard_grid) == 1
+    assert dlx.count_solutions('483921657' + '.' * 72, limit=10) == 10
+    assert dlx.count_solutions('33' + '.' * 79) == 0
+    assert DL(diagonal_mode=True).count_solutions(hard_grid) == 0
+
+
+def test_links_restored() -> None:
+    """The same instance can be reused after a search is abandoned"""
+    dlx = DL(diagonal_mode=True)
+    solutions = dlx.solutions('.' * 81)
+    next(solutions)
+    solutions.close()
+    solved = dlx.solve(diagonal_grid)
+    assert SB(diagonal_mode=True).validate(solved)
+    assert dlx.solve(diagonal_grid) == solved
+
+
+def test_solution_engine() -> None:
+    """Every engine in solution.solve returns the same diagonal solution"""
+    expected = solution.solve(diagonal_grid)
+    assert solution.solve(diagonal_grid, engine='dlx') == expected
+    assert solution.solve(diagonal_grid, engine='bitboard') == expected
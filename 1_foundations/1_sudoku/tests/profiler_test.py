@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+# Author: github.com/madhavajay
+"""This is a test for the sudoku strategy profiler"""
+
+import csv
+import io
+import json
+
+import pytest
+
+from sudoku.board import Board as SB
+from sudoku.profiler import ProfiledBoard as PB
+from sudoku.profiler import StrategyProfiler
+
+# pylint: disable=invalid-name
+easy_grid = ('..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8'
+             '..2.3..9..5.1.3..')
+hard_grid = ('4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5'
+             '..2.....1.4......')
+
+
+def test_profile_matches_search() -> None:
+    """Profiling returns the same solution and counts every strategy"""
+    pbrd = PB(strategies=['eliminate', 'only_choice', 'naked_twins'])
+    assert pbrd.solve(hard_grid) == SB().search(SB.grid_values(hard_grid))
+    profile = pbrd.profiler.profiles[0]
+    assert profile.solved
+    assert profile.nodes > 1
+    assert profile.backtracks < profile.nodes
+    assert profile.removed['eliminate'] > 0
+    assert set(profile.calls) == {'eliminate', 'only_choice', 'naked_twins'}
+    assert all(calls > 0 for calls in profile.calls.values())
+
+
+def test_profile_easy_needs_no_search() -> None:
+    """An easy puzzle is solved by reduction in a single node"""
+    pbrd = PB()
+    pbrd.solve(easy_grid)
+    profile = pbrd.profiler.profiles[0]
+    assert profile.nodes == 1
+    assert profile.backtracks == 0
+    assert profile.time > 0
+
+
+def test_profile_subsets_prunes_search() -> None:
+    """The subset engine removes candidates and avoids branching"""
+    pbrd = PB(strategies=['eliminate', 'only_choice', 'subsets'])
+    assert pbrd.solve(hard_grid) == SB().search(SB.grid_values(hard_grid))
+    profile = pbrd.profiler.profiles[0]
+    assert profile.removed['subsets'] > 0
+    assert profile.nodes == 1
+
+
+def test_unknown_strategy() -> None:
+    """Only the supported strategies can be enabled"""
+    with pytest.raises(ValueError):
+        PB(strategies=['x_wing'])
+
+
+def test_export_batch() -> None:
+    """A shared profiler exports one row per puzzle as json and csv"""
+    profiler = StrategyProfiler()
+    pbrd = PB(profiler=profiler)
+    for grid in [easy_grid, hard_grid]:
+        pbrd.solve(grid)
+
+    json_file = io.StringIO()
+    profiler.to_json(json_file)
+    rows = json.loads(json_file.getvalue())
+    assert [row['puzzle'] for row in rows] == [easy_grid, hard_grid]
+    assert 'only_choice_removed' in rows[0]
+
+    csv_file = io.StringIO()
+    profiler.to_csv(csv_file)
+    csv_file.seek(0)
+    rows = list(csv.DictReader(csv_file))
+    assert len(rows) == 2
+    assert int(rows[1]['nodes']) > 1
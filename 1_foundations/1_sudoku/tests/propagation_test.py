@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# Author: github.com/madhavajay
+"""This is a test for incremental constraint propagation"""
+
+from sudoku.board import Board as SB
+from sudoku.bitboard import BitBoard as BB
+
+# pylint: disable=invalid-name
+easy_grid = ('..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8'
+             '..2.3..9..5.1.3..')
+hard_grid = ('4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5'
+             '..2.....1.4......')
+
+
+def test_propagate_matches_reduce() -> None:
+    """Worklist propagation reaches the same board as full passes"""
+    for grid in [easy_grid, hard_grid]:
+        expected = SB().reduce_puzzle(SB.grid_values(grid))
+        sbrd = SB(incremental=True)
+        assert sbrd.reduce_puzzle(SB.grid_values(grid)) == expected
+        bbrd = BB(incremental=True)
+        assert bbrd.reduce_puzzle(SB.grid_values(grid)) == expected
+
+
+def test_propagate_contradiction() -> None:
+    """Worklist propagation stops as soon as a box runs out of options"""
+    board = SB.grid_values(easy_grid)
+    board['A1'] = '3'  # clashes with the 3 given in A3
+    assert SB(incremental=True).reduce_puzzle(board) is None
+
+    bbrd = BB(diagonal_mode=True, incremental=True)
+    assert bbrd.reduce_cells(bbrd.grid_cells(easy_grid)) is None
+
+
+def test_propagate_empty_board() -> None:
+    """Worklist propagation keeps returning None for an empty board"""
+    board = SB.grid_values('.' * SB.num_boxes())
+    assert SB(incremental=True).reduce_puzzle(board) is None
+
+
+def test_search_incremental() -> None:
+    """Search with worklist propagation finds the same solution"""
+    expected = SB().search(SB.grid_values(hard_grid))
+    sbrd = SB(incremental=True)
+    assert sbrd.search(SB.grid_values(hard_grid)) == expected
+    bbrd = BB(incremental=True)
+    assert bbrd.search(SB.grid_values(hard_grid)) == expected
+
+
+def test_unit_indexes() -> None:
+    """Unit indexes point at the units which contain the box"""
+    sbrd = SB(diagonal_mode=True)
+    all_units = sbrd.all_units()
+    units = [all_units[index] for index in sbrd.unit_indexes('E5')]
+    assert units == sbrd.units('E5')
+    assert len(units) == 5
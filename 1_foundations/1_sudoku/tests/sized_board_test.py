@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# Author: github.com/madhavajay
+"""This is a test for boards larger and smaller than 9x9"""
+
+from typing import Any
+import pytest
+from sudoku.board import DIGITS, Board as SB
+from sudoku.bitboard import BitBoard as BB
+import solution
+
+# pylint: disable=invalid-name
+solved_4 = '1234341221434321'
+puzzle_4 = '1..4.4.......3.1'
+solved_16 = ('123456789ABCDEFG56789ABCDEFG12349ABCDEFG12345678DEFG123456789ABC'
+             '23456789ABCDEFG16789ABCDEFG12345ABCDEFG123456789EFG123456789ABCD'
+             '3456789ABCDEFG12789ABCDEFG123456BCDEFG123456789AFG123456789ABCDE'
+             '456789ABCDEFG12389ABCDEFG1234567CDEFG123456789ABG123456789ABCDEF')
+
+
+def puzzle_16() -> str:
+    """Blank every other box in a checkerboard on the solved 16x16 board"""
+    return ''.join('.' if (index + index // 16) % 2 else value
+                   for index, value in enumerate(solved_16))
+
+
+def puzzle_25() -> str:
+    """Blank two boxes in five of a shifted pattern solved 25x25 board"""
+    solved = ''.join(DIGITS[(5 * (row % 5) + row // 5 + col) % 25]
+                     for row in range(25) for col in range(25))
+    return ''.join('.' if (index + index // 25) % 5 < 2 else value
+                   for index, value in enumerate(solved))
+
+
+def keeps_givens(grid: str, puzzle: str) -> bool:
+    """Check a solved grid agrees with every given of the puzzle"""
+    return all(given in ('.', value) for given, value in zip(puzzle, grid))
+
+
+def test_sized_geometry() -> None:
+    """Units and peers scale with the board size"""
+    sbrd = SB(size=16)
+    assert sbrd.num_boxes() == 256
+    assert sbrd.boxes()[15] == 'A16'
+    assert len(sbrd.all_units()) == 48
+    assert len(sbrd.peers('A1')) == 3 * 15 - 2 * 3
+    # pylint: disable=protected-access
+    assert sbrd._square_units()[0] == [row + col for row in 'ABCD'
+                                       for col in ['1', '2', '3', '4']]
+    assert sbrd._diagonal_units()[1][0] == 'P1'
+
+
+def test_class_calls_stay_9x9() -> None:
+    """Sized methods called on the class use the default 9x9 board"""
+    SB(size=16)
+    assert SB.num_boxes() == 81
+    assert len(SB.boxes()) == 81
+    assert len(SB.grid_values('.' * 81)) == 81
+
+
+def test_invalid_size() -> None:
+    """Board sizes have to be square numbers"""
+    with pytest.raises(ValueError):
+        SB(size=10)
+    with pytest.raises(ValueError):
+        SB(size=16).grid_values('.' * 81)
+
+
+def test_solve_4x4() -> None:
+    """Every engine solves a 4x4 board"""
+    for sbrd in [SB(size=4), SB(size=4, trail=True), BB(size=4)]:
+        result = sbrd.search(sbrd.grid_values(puzzle_4))
+        assert ''.join(result[box] for box in sbrd.boxes()) == solved_4
+
+
+def test_solve_16x16() -> None:
+    """Trail search on bitmasks solves a 16x16 board"""
+    bbrd = BB(size=16, trail=True)
+    cells = bbrd.search_cells(bbrd.grid_cells(puzzle_16()))
+    assert keeps_givens(bbrd.cells_to_grid(cells), puzzle_16())
+    assert bbrd.validate(bbrd.to_board_state(cells))
+
+
+def test_solve_25x25() -> None:
+    """Trail search on bitmasks solves a 25x25 board"""
+    bbrd = BB(size=25, trail=True)
+    cells = bbrd.search_cells(bbrd.grid_cells(puzzle_25()))
+    assert keeps_givens(bbrd.cells_to_grid(cells), puzzle_25())
+    assert bbrd.validate(bbrd.to_board_state(cells))
+    assert SB(size=25).validate(bbrd.to_board_state(cells))
+
+
+def test_solve_many_16x16() -> None:
+    """Solve many passes the board size on to the workers"""
+    results = list(solution.solve_many([puzzle_16()], workers=1,
+                                       diagonal_mode=False, size=16))
+    sbrd = SB(size=16)
+    grid = sbrd.board_to_str(results[0]).replace(',', '')
+    assert keeps_givens(grid, puzzle_16())
+    assert sbrd.validate(results[0])
+
+
+def test_display_4x4(capsys: Any) -> None:
+    """Display draws square separators for the board size"""
+    sbrd = SB(size=4)
+    sbrd.display(sbrd.grid_values(solved_4))
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == '1 2 |3 4 '
+    assert lines[2] == '----+----'
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+# Author: github.com/madhavajay
+"""This is a test for the batch solving functionality"""
+
+import io
+from itertools import islice
+import solution
+
+# pylint: disable=invalid-name
+diagonal_grid = ('2.............62....1....7...6..8...3...9...7...6..4...4....8'
+                 '....52.............3')
+unsolvable_grid = ('..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95'
+                   '..8..2.3..9..5.1.3..')
+
+
+def test_solve_many_in_process() -> None:
+    """Solve many with a single worker matches solve"""
+    results = list(solution.solve_many([diagonal_grid, unsolvable_grid],
+                                       workers=1))
+    assert results == [solution.solve(diagonal_grid), None]
+
+
+def test_solve_many_pool_order() -> None:
+    """Solve many over a pool returns results in input order"""
+    puzzles = [diagonal_grid, unsolvable_grid] * 5
+    results = list(solution.solve_many(iter(puzzles), workers=2, chunksize=2))
+    assert results == [solution.solve(diagonal_grid), None] * 5
+
+
+def test_solve_many_file() -> None:
+    """Solve many reads newline terminated puzzles and skips blank lines"""
+    puzzle_file = io.StringIO(diagonal_grid + '\n\n' + diagonal_grid + '\n')
+    results = list(solution.solve_many(puzzle_file, workers=2))
+    assert results == [solution.solve(diagonal_grid)] * 2
+
+
+def test_solve_many_stop_early() -> None:
+    """Closing the result stream early shuts the pool down"""
+    puzzles = (diagonal_grid for _ in range(1000))
+    results = solution.solve_many(puzzles, workers=2, chunksize=1)
+    assert len(list(islice(results, 3))) == 3
+    results.close()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# Author: github.com/madhavajay
+"""This is a test for streaming puzzle files and packed solutions"""
+
+import io
+
+import pytest
+
+import solution
+from sudoku.board import Board as SB
+from sudoku.stream import (MAGIC, PackedWriter, read_packed, read_puzzles,
+                           record_size)
+
+# pylint: disable=invalid-name
+diagonal_grid = ('2.............62....1....7...6..8...3...9...7...6..4...4....8'
+                 '....52.............3')
+unsolvable_grid = ('..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95'
+                   '..8..2.3..9..5.1.3..')
+
+
+def test_read_puzzles(tmpdir) -> None:
+    """Puzzles are read the same way with and without memory mapping"""
+    path = tmpdir.join('puzzles.txt')
+    path.write(diagonal_grid + '\r\n\n' + unsolvable_grid + '\n')
+    expected = [diagonal_grid, unsolvable_grid]
+    assert list(read_puzzles(str(path))) == expected
+    assert list(read_puzzles(str(path), mmap_threshold=0)) == expected
+
+
+def test_packed_round_trip(tmpdir) -> None:
+    """Packed records are fixed width and decode back to the solutions"""
+    solved = solution.solve(diagonal_grid)
+    path = tmpdir.join('solutions.bin')
+    with open(str(path), 'wb') as packed_file:
+        writer = PackedWriter(packed_file)
+        writer.write(solved)
+        writer.write(None)
+    assert path.size() == len(MAGIC) + 1 + 2 * record_size(9)
+    assert record_size(9) == 41
+    assert list(read_packed(str(path))) == [
+        ''.join(solved[box] for box in SB.boxes()), None]
+
+
+def test_packed_large_board() -> None:
+    """Boards from 16x16 store one byte per box"""
+    board_string = ''.join('123456789ABCDEFG'[(i * 5) % 16]
+                           for i in range(256))
+    packed_file = io.BytesIO()
+    PackedWriter(packed_file, size=16).write_string(board_string)
+    assert len(packed_file.getvalue()) == len(MAGIC) + 1 + 256
+
+
+def test_read_packed_bad_file(tmpdir) -> None:
+    """Files without the packed header are refused"""
+    path = tmpdir.join('solutions.bin')
+    path.write_binary(b'not packed')
+    with pytest.raises(ValueError):
+        list(read_packed(str(path)))
+
+
+def test_solve_file(tmpdir) -> None:
+    """Solve file streams puzzles through the pool into packed records"""
+    puzzles = tmpdir.join('puzzles.txt')
+    puzzles.write('\n'.join([diagonal_grid, unsolvable_grid] * 3))
+    output = tmpdir.join('solutions.bin')
+    assert solution.solve_file(str(puzzles), str(output), workers=2) == 6
+    solved = solution.solve(diagonal_grid)
+    expected = ''.join(solved[box] for box in SB.boxes())
+    assert list(read_packed(str(output))) == [expected, None] * 3
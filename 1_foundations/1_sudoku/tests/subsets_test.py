@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+# Author: github.com/madhavajay
+"""This is a test for the naked and hidden subset engine"""
+
+from sudoku.board import BoardState
+from sudoku.bitboard import BitBoard as BB
+from tests.naked_multi_test import (naked_multi_board_1,
+                                    naked_multi_solutions_1)
+
+
+def empty_board() -> BoardState:
+    """Board with every value still possible in every box"""
+    return dict((box, '123456789') for box in BB.boxes())
+
+
+def test_naked_multi_board() -> None:
+    """Subsets clears the naked twins board to one of its solutions"""
+    board = BB().subsets(naked_multi_board_1.copy())
+    assert board in naked_multi_solutions_1
+
+
+def test_naked_triple() -> None:
+    """Three boxes sharing three digits clear them from the rest of the row"""
+    board = empty_board()
+    board['A1'] = '12'
+    board['A2'] = '23'
+    board['A3'] = '13'
+    board = BB().subsets(board, limit=3)
+    assert board['A4'] == '456789'
+    assert board['B1'] == '456789'
+    assert board['A1'] == '12'
+
+
+def test_hidden_pair() -> None:
+    """Two digits which only fit in two boxes of a row clear those boxes"""
+    board = empty_board()
+    for col in range(3, 10):
+        board['A{}'.format(col)] = '3456789'
+    board = BB().subsets(board, limit=2)
+    assert board['A1'] == '12'
+    assert board['A2'] == '12'
+
+
+def test_reports_change() -> None:
+    """Nothing is reported when no subset applies"""
+    bbrd = BB()
+    cells = bbrd.to_cells(empty_board())
+    assert not bbrd.subsets_cells(cells)
+    cells[0] = cells[1] = 0b11
+    assert bbrd.subsets_cells(cells)
+    assert not bbrd.subsets_cells(cells)
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+# Author: github.com/madhavajay
+"""This is a test for undo trail search"""
+
+from itertools import islice
+from sudoku.board import Board as SB
+from sudoku.bitboard import BitBoard as BB
+
+# pylint: disable=invalid-name
+hard_grid = ('4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5'
+             '..2.....1.4......')
+diagonal_grid = ('2.............62....1....7...6..8...3...9...7...6..4...4....8'
+                 '....52.............3')
+# the top row of a solved board, which leaves many solutions to enumerate
+open_grid = '483921657' + '.' * 72
+
+
+def test_trail_search_matches_search() -> None:
+    """Trail search finds the same first solution as recursive search"""
+    for grid, diagonal in [(hard_grid, False), (diagonal_grid, True)]:
+        expected = SB(diagonal_mode=diagonal).search(SB.grid_values(grid))
+        sbrd = SB(diagonal_mode=diagonal, trail=True)
+        assert sbrd.search(SB.grid_values(grid)) == expected
+        bbrd = BB(diagonal_mode=diagonal, trail=True)
+        assert bbrd.search(SB.grid_values(grid)) == expected
+
+
+def test_trail_search_enumerates() -> None:
+    """Trail search keeps yielding distinct valid solutions"""
+    for sbrd in [SB(trail=True), BB(trail=True)]:
+        solutions = list(islice(sbrd.trail_search(SB.grid_values(open_grid)),
+                                5))
+        assert len(solutions) == 5
+        assert len(set(SB.board_to_str(sol) for sol in solutions)) == 5
+        assert all(sbrd.validate(sol) for sol in solutions)
+
+
+def test_trail_search_restores_board() -> None:
+    """Backtracking restores the board to its propagated starting state"""
+    board = SB.grid_values(hard_grid)
+    sbrd = SB(trail=True)
+    solutions = list(sbrd.trail_search(board))
+    assert len(solutions) == 1
+    assert board == SB(incremental=True).reduce_puzzle(
+        SB.grid_values(hard_grid))
+
+
+def test_undo() -> None:
+    """Undo pops the trail back to the mark"""
+    board = {'A1': '1', 'A2': '2'}
+    trail = [('A1', '123'), ('A2', '23')]
+    SB.undo(board, trail, 1)
+    assert board == {'A1': '1', 'A2': '23'}
+    assert trail == [('A1', '123')]
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+# Author: github.com/madhavajay
+"""This is a test for counting solutions and checking uniqueness"""
+
+from sudoku.board import Board as SB
+from sudoku.bitboard import BitBoard as BB
+from sudoku.dlx import DancingLinks as DL
+
+# pylint: disable=invalid-name
+hard_grid = ('4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5'
+             '..2.....1.4......')
+open_grid = '483921657' + '.' * 72
+
+
+def test_count_solutions_limit() -> None:
+    """Counting stops at the limit on a board with many solutions"""
+    for sbrd in [SB(incremental=True), BB()]:
+        assert sbrd.count_solutions(SB.grid_values(open_grid)) == 2
+        assert sbrd.count_solutions(SB.grid_values(open_grid), limit=7) == 7
+
+
+def test_is_unique() -> None:
+    """Only a puzzle with exactly one solution is unique"""
+    for sbrd in [SB(), BB()]:
+        assert sbrd.is_unique(SB.grid_values(hard_grid))
+        assert not sbrd.is_unique(SB.grid_values(open_grid))
+        assert not sbrd.is_unique(SB.grid_values('33' + '.' * 79))
+
+
+def test_empty_grid() -> None:
+    """An empty grid has many solutions rather than none"""
+    empty = '.' * 81
+    for sbrd in [SB(), SB(incremental=True), BB(), BB(trail=True)]:
+        assert sbrd.count_solutions(SB.grid_values(empty)) == 2
+        assert not sbrd.is_unique(SB.grid_values(empty))
+    assert DL().count_solutions(empty) == 2
+    assert SB(size=4).count_solutions(SB(size=4).grid_values('.' * 16),
+                                      limit=None) == 288
+
+
+def test_count_keeps_board() -> None:
+    """Counting leaves the supplied board and cells untouched"""
+    board = SB.grid_values(hard_grid)
+    assert SB().count_solutions(board, limit=None) == 1
+    assert board == SB.grid_values(hard_grid)
+    bbrd = BB()
+    cells = bbrd.grid_cells(hard_grid)
+    assert bbrd.count_solutions_cells(cells, limit=None) == 1
+    assert cells == bbrd.grid_cells(hard_grid)
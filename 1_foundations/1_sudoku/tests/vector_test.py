@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+# Author: github.com/madhavajay
+"""This is a test for the numpy batch propagation board"""
+
+import pytest
+
+from sudoku.board import Board as SB
+from sudoku.bitboard import BitBoard as BB
+from sudoku.vector import VectorBoard as VB
+
+# pylint: disable=invalid-name
+easy_grid = ('..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8'
+             '..2.3..9..5.1.3..')
+hard_grid = ('4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5'
+             '..2.....1.4......')
+diagonal_grid = ('2.............62....1....7...6..8...3...9...7...6..4...4....8'
+                 '....52.............3')
+
+
+def test_eliminate_matches_bitboard() -> None:
+    """Eliminate on the batch array matches eliminate on bitmask lists"""
+    vbrd = VB()
+    bbrd = BB()
+    cells = vbrd.eliminate_array(vbrd.to_array([easy_grid, hard_grid]))
+    assert cells.tolist() == [bbrd.eliminate_cells(bbrd.grid_cells(grid))
+                              for grid in [easy_grid, hard_grid]]
+
+
+def test_propagate_classifies_boards() -> None:
+    """Propagation alone solves the easy board and stalls on the hard one"""
+    vbrd = VB()
+    cells = vbrd.propagate_array(vbrd.to_array([easy_grid, hard_grid,
+                                                '33' + '.' * 79]))
+    solved, dead = vbrd.classify_array(cells)
+    assert solved.tolist() == [True, False, False]
+    assert dead.tolist() == [False, False, True]
+
+
+def test_solve_batch_matches_search() -> None:
+    """Every board in the batch gets the solution scalar search finds"""
+    for grids, diagonal in [([easy_grid, hard_grid], False),
+                            ([diagonal_grid, easy_grid], True)]:
+        bbrd = BB(diagonal_mode=diagonal)
+        expected = [bbrd.search(SB.grid_values(grid)) for grid in grids]
+        assert VB(diagonal_mode=diagonal).solve_batch(grids) == expected
+    assert VB().solve_batch([]) == []
+
+
+def test_solve_batch_sized() -> None:
+    """A batch of 4x4 boards solves and larger boards are refused"""
+    solution = VB(size=4).solve_batch(['1...' '..3.' '.4..' '...2'])[0]
+    assert SB(size=4).validate(solution)
+    with pytest.raises(ValueError):
+        VB(size=25)
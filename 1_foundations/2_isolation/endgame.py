@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# Author: github.com/madhavajay
+"""nd889 AIND Project 2 - Exact endgame of partitioned boards"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+from move_graph import MoveGraph
+
+# called at every solved position, it raises to abandon the solve
+Check = Callable[[], None]
+
+# memoized positions above which the table is cleared, about 10 MB
+MAX_ENTRIES = 1 << 16
+
+
+class EndgameSolver:
+    """
+    Exact longest knight paths of a player alone in a region of the board.
+    Once the players are partitioned each makes as many moves as the longest
+    path of its own region, so the player to move wins when its path is
+    longer than the path of its opponent.
+
+    A position is the cell of the player and the bitmask of blank cells it
+    can still reach, so positions reached by different move orders share a
+    memo entry which is kept across moves of the game.
+    """
+
+    def __init__(self, graph: MoveGraph, max_entries: int=MAX_ENTRIES) -> None:
+        self.graph = graph
+        self.max_entries = max_entries
+        self.memo = {}  # type: Dict[Tuple[int, int], int]
+        # a knight always moves between the two colours of a checkerboard
+        self.colours = [0, 0]
+        for index, (row, col) in enumerate(graph.coords):
+            self.colours[(row + col) % 2] |= 1 << index
+        self.colour_of = [(row + col) % 2 for row, col in graph.coords]
+
+    def region(self, blank: int, location: int) -> int:
+        """Return the blank cells a player at location can ever reach"""
+        return self.graph.reachable(blank, location)
+
+    def bound(self, location: int, region: int) -> int:
+        """
+        Return the most moves a path could make in a region, as it alternates
+        between cells of the other colour and of the colour of location
+        """
+        same = self.colours[self.colour_of[location]] & region
+        other = bin(region ^ same).count('1')
+        same = bin(same).count('1')
+        return 2 * min(same, other) + (other > same)
+
+    def longest_path(self, location: int, region: int,
+                     check: Check=None) -> int:
+        """Return the most moves a player at location can make in a region"""
+        key = (location, region)
+        length = self.memo.get(key)
+        if length is not None:
+            return length
+        if check is not None:
+            check()
+        length = 0
+        bound = self.bound(location, region)
+        children = []  # type: List[Tuple[int, int, int]]
+        for cell in self.graph.cells(self.graph.neighbours[location] &
+                                     region):
+            rest = self.region(region & ~(1 << cell), cell)
+            onward = bin(self.graph.neighbours[cell] & rest).count('1')
+            children.append((onward, cell, rest))
+        # the fewest onward moves first tends to find a full path soonest
+        children.sort()
+        for _, cell, rest in children:
+            if length >= bound:
+                break
+            if 1 + self.bound(cell, rest) > length:
+                length = max(length, 1 + self.longest_path(cell, rest, check))
+        if len(self.memo) >= self.max_entries:
+            self.memo.clear()
+        self.memo[key] = length
+        return length
+
+    def best_move(self, blank: int, location: int,
+                  check: Check=None) -> Tuple[int, Optional[int]]:
+        """
+        Return the longest path of a player at location on the blank cells
+        and the cell of its first move, None when it cannot move
+        """
+        region = self.region(blank, location)
+        best_length, best_cell = 0, None  # type: Tuple[int, Optional[int]]
+        for cell in self.graph.cells(self.graph.neighbours[location] & region):
+            rest = self.region(region & ~(1 << cell), cell)
+            length = 1 + self.longest_path(cell, rest, check)
+            if length > best_length:
+                best_length, best_cell = length, cell
+        return best_length, best_cell
+
@@ -2,13 +2,18 @@
 # Author: github.com/madhavajay
 """nd889 AIND Project 2 - Build a Game-Playing Agent"""
 
+import math
 import random
-import copy
 import logging
+import time
+from collections import OrderedDict
 from functools import reduce
-from typing import Any, Set, Dict, Callable, Tuple, List
+from typing import Any, Set, Dict, Callable, Tuple, List, Optional
 
 from isolation import Board
+from endgame import Check, EndgameSolver
+from move_graph import move_graph
+from telemetry import MoveRecord
 
 # player has no real type so we will use Any
 Player = Any
@@ -23,6 +28,109 @@ class Timeout(Exception):
     pass
 
 
+# Bound types of transposition table scores
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# transposition table entry of key, depth, bound, score, best move and age
+TableEntry = Tuple[int, int, int, float, Move, int]
+
+
+class TranspositionTable:
+    """
+    Fixed size table of searched positions indexed by zobrist hash, storing
+    the depth, bound type, score and best move of each one
+
+    When two positions share a slot the new entry replaces the old one if
+    it was searched at least as deep or the old one is from an earlier move
+    so the table keeps the most expensive results of the current search
+    """
+
+    def __init__(self, size: int=1 << 16) -> None:
+        self.size = size
+        self.slots = [None] * size  # type: List[Optional[TableEntry]]
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+
+    def new_search(self) -> None:
+        """Age every stored entry at the start of a new move"""
+        self.generation += 1
+
+    def lookup(self, key: int) -> Optional[Tuple[int, int, float, Move]]:
+        """Return the depth, bound, score and move stored for key"""
+        self.probes += 1
+        entry = self.slots[key % self.size]
+        if entry is None or entry[0] != key:
+            return None
+        self.hits += 1
+        return entry[1], entry[2], entry[3], entry[4]
+
+    def store(self, key: int, depth: int, bound: int, score: float,
+              move: Move) -> None:
+        """Save a search result using the depth preferred replacement"""
+        index = key % self.size
+        entry = self.slots[index]
+        if (entry is None or entry[0] == key or depth >= entry[1] or
+                entry[5] != self.generation):
+            self.slots[index] = (key, depth, bound, score, move,
+                                 self.generation)
+
+
+class ScoreCache:
+    """
+    Bounded cache of heuristic scores keyed by the zobrist hash of a
+    position from the point of view of the scored player, evicting the
+    least recently used score once it holds size entries
+    """
+
+    def __init__(self, size: int=1 << 16) -> None:
+        self.size = size
+        self.scores = OrderedDict()  # type: OrderedDict
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: int) -> Optional[float]:
+        """Return the score stored for key and mark it as recently used"""
+        score = self.scores.get(key)
+        if score is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.scores.move_to_end(key)
+        return score
+
+    def put(self, key: int, score: float) -> None:
+        """Store a score, evicting the least recently used when full"""
+        self.scores[key] = score
+        self.scores.move_to_end(key)
+        if len(self.scores) > self.size:
+            self.scores.popitem(last=False)
+
+
+def cached(score_fn: Heuristic, size: int=1 << 16) -> Heuristic:
+    """
+    Wrap a heuristic so each position is only scored once while it stays in
+    a ScoreCache, which is available as the cache attribute of the wrapper,
+    the board must keep its zobrist hash which Board.copy does
+    """
+    cache = ScoreCache(size)
+
+    def score(game: Board, player: Player) -> float:
+        """Return the cached score of the position or compute it"""
+        key = game.zobrist_hash(player)
+        value = cache.get(key)
+        if value is None:
+            value = score_fn(game, player)
+            cache.put(key, value)
+        return value
+
+    score.cache = cache  # type: ignore
+    score.__name__ = 'cached_' + getattr(score_fn, '__name__', 'score')
+    return score
+
+
 def custom_score(game: Board, player: Player) -> float:
     """Calculate the heuristic value of a game state from the point of view
     of the given player.
@@ -171,59 +279,71 @@ IN_CORNERS = [{1, 5}] + IN_ONE
 IN_TWO = [{2}, {4}]
 
 
+class EvaluationContext:
+    """
+    Features of one position seen by one player which are computed on first
+    use and then shared by every heuristic of an ensemble, the locations,
+    blank cells and breadth first move layers of both players
+    """
+
+    def __init__(self, game: Board, player: Player) -> None:
+        self.game = game
+        self.player = player
+        self.opponent = game.get_opponent(player)
+        self.location = game.get_player_location(player)
+        self.opp_location = game.get_player_location(self.opponent)
+        self.graph = move_graph(game.width, game.height)
+        self.blank = self.graph.blank_mask(game)
+        self._num_blanks = None  # type: Optional[int]
+        self._layers = {}  # type: Dict[Any, List[int]]
+
+    @property
+    def num_blanks(self) -> int:
+        """Return the number of blank cells"""
+        if self._num_blanks is None:
+            self._num_blanks = bin(self.blank).count('1')
+        return self._num_blanks
+
+    def layers(self, owner: Player) -> List[int]:
+        """Return the scored breadth first move layers of a player"""
+        if owner not in self._layers:
+            graph = self.graph
+            moves = graph.move_mask(self.blank,
+                                    graph.location(self.game, owner))
+            self._layers[owner] = graph.layers(self.blank, moves,
+                                               len(SCORING_VALUES) - 1)
+        return self._layers[owner]
+
+
 # position value
 def board_rank(game: Board, player: Player) -> Dict[Move, int]:
     """
-    Calculate a dictionary of board positions with values for each position
+    Return a dictionary of board positions with values for each position
     starting from the outside and working its way in one square at a time
     """
-    values = {}
-    for x in range(7):
-        for y in range(7):
-            loc = (x, y)
-            if set(loc) in CORNERS:
-                values[loc] = 1
-            elif {loc[0]} in OUTSIDE or {loc[1]} in OUTSIDE:
-                values[loc] = 2
-            elif set(loc) in IN_CORNERS:
-                values[loc] = 3
-            elif {loc[0]} in IN_ONE or {loc[1]} in IN_ONE:
-                values[loc] = 4
-            elif {loc[0]} in IN_TWO or {loc[1]} in IN_TWO:
-                values[loc] = 5
-            else:
-                values[loc] = 6
-    return values
+    return dict(BOARD_VALUE)
 
 
 def board_proximity(game: Board, player: Player) -> MoveLookUp:
     """
-    Calculate a dictionary with board positions as the key and for the value
+    Return a dictionary with board positions as the key and for the value
     a list of the board positions which are 1 move away as a knight
     """
-    values = {}
-    for x in range(7):
-        for y in range(7):
-            loc = (x, y)
-            possible_moves = []
-            for direction in DIRECTIONS:
-                move = (loc[0] + direction[0], loc[1] + direction[1])
-                if move[0] in DIMENSIONS and move[1] in DIMENSIONS:
-                    possible_moves.append(move)
-            values[loc] = possible_moves
-    return values
+    return dict((loc, list(moves)) for loc, moves in BOARD_PROXIMITY.items())
 
 
 def ensemble(game: Board, player: Player) -> float:
     """
-    Combine several different heuristics into one function
+    Combine several different heuristics into one function, sharing one
+    EvaluationContext so the features of the position are found once
     """
+    context = EvaluationContext(game, player)
 
-    plane_walker_score = plane_walker(game, player)
-    build_wall_score = build_wall(game, player)
-    rush_middle_score = rush_middle(game, player)
-    block_move_score = block_move(game, player)
-    clover_leaf_score = clover_leaf(game, player)
+    plane_walker_score = plane_walker(game, player, context)
+    build_wall_score = build_wall(game, player, context)
+    rush_middle_score = rush_middle(game, player, context)
+    block_move_score = block_move(game, player, context)
+    clover_leaf_score = clover_leaf(game, player, context)
 
     return (
         plane_walker_score +
@@ -234,46 +354,33 @@ def ensemble(game: Board, player: Player) -> float:
     )
 
 
-def plane_walker(game: Board, player: Player) -> float:
+def plane_walker(game: Board, player: Player,
+                 context: EvaluationContext=None) -> float:
     """
     Calculate the number of board squares available to the player
     and give each a value decreasing as they are more moves away from the
     current move, then add these up and diff them between players
     """
-    blanks = game.get_blank_spaces()
-
-    moves = game.get_legal_moves(player)
-    distance_map = build_map(moves, blanks)
-    board_value = score_board_distance(distance_map)
-
-    opp_moves = game.get_legal_moves(game.get_opponent(player))
-    opp_distance_map = build_map(opp_moves, blanks)
-    opp_board_value = score_board_distance(opp_distance_map)
-
-    return float(board_value - opp_board_value)
+    context = context or EvaluationContext(game, player)
+    values = []
+    for owner in [player, context.opponent]:
+        values.append(sum(SCORING_VALUES[depth] * bin(layer).count('1')
+                          for depth, layer in enumerate(context.layers(owner),
+                                                        1)))
+    return float(values[0] - values[1])
 
 
 def build_map(moves: List[Move], blanks: List[Move]) -> List[List[int]]:
     """
     Build a map of how many turns each square is away from the current
-    players board position, starting with an empty board and assigning
-    a number on each reachable square
-    """
-    depth = 1
-    board = copy.deepcopy(EMPTY_BOARD)
-    start_moves = set(moves)
-    while len(start_moves) > 0:
-        new_moves = set()  # type: Set[Move]
-        for move in start_moves:
-            if move in blanks and board[move[0]][move[1]] == 0:
-                board[move[0]][move[1]] = depth
-                new_possibles = set([(move[0] + direction[0],
-                                      move[1] + direction[1])
-                                     for direction in DIRECTIONS])
-                new_moves = new_moves | new_possibles
-        start_moves = possible_moves(new_moves)
-        depth = depth + 1
-    return board
+    players board position, assigning a number on each reachable square
+    of the 7x7 board with a breadth first search of the move graph
+    """
+    graph = move_graph(7, 7)
+    blank = sum(1 << (row * 7 + col) for row, col in blanks)
+    start = sum(1 << (row * 7 + col) for row, col in moves)
+    distances = graph.distances(blank, start)
+    return [distances[row * 7:row * 7 + 7] for row in range(7)]
 
 
 def possible_moves(moves: Set[Move]) -> Set[Move]:
@@ -301,21 +408,17 @@ def score_board_distance(distance_map: List[List[int]]) -> int:
     return value
 
 
-def build_wall(game: Board, player: Player) -> float:
+def build_wall(game: Board, player: Player,
+               context: EvaluationContext=None) -> float:
     """
     Encourage the player to go the middle row and column of the board
     to increase the chances of a partition in the later game
     """
-
-    position = game.get_player_location(player)
-    blanks = game.get_blank_spaces()
-    blank_vertical = [loc for loc in blanks
-                      if position[1] == 3]
-    blank_horizontal = [loc for loc in blanks
-                        if position[0] == 3]
-
-    vertical = len(blank_vertical)
-    horizontal = len(blank_horizontal)
+    context = context or EvaluationContext(game, player)
+    position = context.location
+    # every blank counts while the player is on the middle row or column
+    vertical = context.num_blanks if position[1] == 3 else 0
+    horizontal = context.num_blanks if position[0] == 3 else 0
 
     if position == (3, 3):
         return max(vertical, horizontal)
@@ -327,12 +430,16 @@ def build_wall(game: Board, player: Player) -> float:
         return 0
 
 
-def rush_middle(game: Board, player: Player) -> float:
+def rush_middle(game: Board, player: Player,
+                context: EvaluationContext=None) -> float:
     """
     Encourage the player to go to the center of the board giving the middle
     100 bonus points and the squares around the middle 50 bonus points
     """
-    loc = game.get_player_location(player)
+    if context is None:
+        loc = game.get_player_location(player)
+    else:
+        loc = context.location
     center = (3, 3)
     middle = {2, 3, 4}
     if loc == center:
@@ -343,13 +450,15 @@ def rush_middle(game: Board, player: Player) -> float:
         return 0
 
 
-def block_move(game: Board, player: Player) -> float:
+def block_move(game: Board, player: Player,
+               context: EvaluationContext=None) -> float:
     """
     Encourage moves which happen to block one of the possible moves of the
     opponent on their next turn
     """
-    loc = game.get_player_location(player)
-    opp = game.get_player_location(game.get_opponent(player))
+    context = context or EvaluationContext(game, player)
+    loc = context.location
+    opp = context.opp_location
 
     for dir in DIRECTIONS:
         if (loc[0] + dir[0], loc[1] + dir[1]) == opp:
@@ -358,19 +467,27 @@ def block_move(game: Board, player: Player) -> float:
     return 0.
 
 
-def clover_leaf(game: Board, player: Player) -> float:
+def clover_leaf(game: Board, player: Player,
+                context: EvaluationContext=None) -> float:
     """
     Encourage moves which happen to block one of the possible moves of the
     opponent in two turns
     """
-    loc = game.get_player_location(player)
-    opp = game.get_player_location(game.get_opponent(player))
+    context = context or EvaluationContext(game, player)
+    loc = context.location
+    opp = context.opp_location
     for leaf in CLOVER:
         if (opp[0] + leaf[0], opp[1] + leaf[1]) == loc:
             return 1.
     return 0.
 
 
+# with adaptive_clock the clock is read about every CHECK_PERIOD ms of
+# search, and at least every MAX_CHECK_INTERVAL nodes
+CHECK_PERIOD = 1.
+MAX_CHECK_INTERVAL = 4096
+
+
 class CustomPlayer:
     """Game-playing agent that chooses a move using your evaluation function
     and a depth-limited minimax algorithm with alpha-beta pruning. You must
@@ -399,17 +516,90 @@ class CustomPlayer:
         Time remaining (in milliseconds) when search is aborted. Should be a
         positive value large enough to allow the function to return before the
         timer expires.
+
+    in_place : boolean (optional)
+        Flag indicating whether the search applies and undoes moves on the
+        board it was given (True) instead of searching forecast_move copies
+        (False), the board is always restored before get_move returns.
+
+    tt_size : int (optional)
+        Number of slots in the transposition table used by alphabeta, which
+        is kept across iterations and moves; 0 disables the table.
+
+    ordering : boolean (optional)
+        Flag indicating whether alphabeta searches the principal variation
+        of the previous iteration first, then killer moves and then the
+        remaining moves by history score (True) instead of in legal move
+        order (False).
+
+    node_limit : int (optional)
+        Number of nodes each move may search, when set the search stops on
+        the node count instead of the clock so moves are reproducible and
+        independent of machine load; 0 searches until the timeout.
+
+    adaptive_clock : boolean (optional)
+        Flag indicating whether the search reads time_left only every so
+        many nodes, a number measured from the nodes searched per
+        millisecond so it reads about every CHECK_PERIOD ms (True), instead
+        of at every node (False).
+
+    endgame : boolean (optional)
+        Flag indicating whether a position where the players can no longer
+        reach a common cell is solved exactly by the longest path of its
+        region (True), with half of the time left and the rest searched as
+        usual if that is not enough, instead of only searched (False). The
+        solved paths are kept for the rest of the game only, so a node
+        limited solve does not depend on earlier games.
+
+    telemetry : object (optional)
+        Sink whose emit method is given the record of every move searched,
+        such as the json lines and csv sinks of telemetry.py; the records
+        are kept in move_stats either way.
     """
     # pylint: disable=too-many-arguments
     def __init__(self, search_depth: int=3, score_fn: Heuristic=custom_score,
                  iterative: bool=True, method: str='minimax',
-                 timeout: float=10.) -> None:
+                 timeout: float=10., in_place: bool=False,
+                 tt_size: int=0, ordering: bool=False,
+                 node_limit: int=0, adaptive_clock: bool=False,
+                 endgame: bool=False, telemetry: Any=None) -> None:
         self.search_depth = search_depth
         self.iterative = iterative
         self.score = score_fn
         self.method = method
+        self.in_place = in_place
+        self.transposition_table = None  # type: Optional[TranspositionTable]
+        if tt_size:
+            self.transposition_table = TranspositionTable(tt_size)
+        self.ordering = ordering
+        # moves keyed by the move count of the game they were played at
+        self.principal_variation = []  # type: List[Move]
+        self.pv_start = 0
+        self.pv_table = {}  # type: Dict[int, List[Move]]
+        self.killers = {}  # type: Dict[int, List[Move]]
+        self.history = {}  # type: Dict[Tuple[bool, Move], int]
         self.time_left = Timer
         self.timer_threshold = timeout
+        # nodes searched over the life of the player and the count at
+        # which the current move runs out of nodes
+        self.nodes = 0
+        self.node_limit = node_limit
+        self.node_budget = node_limit
+        # node count and time left at the last clock read and the node count
+        # of the next one
+        self.adaptive_clock = adaptive_clock
+        self.clock_nodes = 0
+        self.clock_time = 0.
+        self.check_interval = 1
+        self.next_check = 0
+        self.endgame = endgame
+        self.endgame_solver = None  # type: Optional[EndgameSolver]
+        # interior nodes searched, their legal moves and the beta cutoffs
+        self.expanded = 0
+        self.children = 0
+        self.cutoffs = 0
+        self.telemetry = telemetry
+        self.move_stats = []  # type: List[MoveRecord]
         self.average_depths = []  # type: List[int]
         self.name = "computer"
 
@@ -461,6 +651,24 @@ class CustomPlayer:
 
         best_move = legal_moves[random.randint(0, len(legal_moves) - 1)]
         best_score = float("-inf")
+        self.node_budget = self.nodes + self.node_limit
+        if self.adaptive_clock:
+            self.start_clock()
+        started = self.start_telemetry()
+        depth_reached = 0
+
+        if self.endgame:
+            solution = self.solve_endgame(game)
+            if solution is not None:
+                depth_reached, best_move = solution
+                self.average_depths.append(depth_reached)
+                self.record_move(game, started, depth_reached)
+                return best_move
+
+        if self.transposition_table is not None:
+            self.transposition_table.new_search()
+        if self.ordering:
+            self.start_ordering(game)
 
         max_depth = game.width * game.height - game.move_count
 
@@ -480,16 +688,226 @@ class CustomPlayer:
                     score, move = search(game, current_depth)
                     if (score, move) > (best_score, best_move):
                         best_score, best_move = score, move
+                    depth_reached = current_depth
                     current_depth = current_depth + 1
+                    if self.ordering:
+                        self.principal_variation = self.pv_table.get(
+                            game.move_count, [])
+                    # a win or loss is proven so deeper is no better
+                    if score in (INF, NEGINF):
+                        break
             else:
                 current_depth = self.search_depth
                 best_score, best_move = search(game, self.search_depth)
+                depth_reached = self.search_depth
         except Timeout:
             # Handle any actions required at timeout, if necessary
             pass
         self.average_depths.append(current_depth)
+        self.record_move(game, started, depth_reached)
         return best_move
 
+    def solve_endgame(self, game: Board) -> Optional[Tuple[int, Move]]:
+        """
+        Return the length and first move of the longest path of the player
+        when the players are partitioned, or None when they are not or the
+        solve ran out of its share of the move
+        """
+        graph = move_graph(game.width, game.height)
+        solver = self.endgame_solver
+        if solver is None or solver.graph is not graph:
+            solver = self.endgame_solver = EndgameSolver(graph)
+        if not graph.is_partitioned(game):
+            # a game is partitioned until it ends, so this one is new
+            solver.memo.clear()
+            return None
+        try:
+            length, cell = solver.best_move(
+                graph.blank_mask(game),
+                graph.location(game, game.active_player),
+                self.endgame_check())
+        except Timeout:
+            return None
+        if cell is None:
+            return None
+        return length, divmod(cell, game.width)
+
+    def endgame_check(self) -> Check:
+        """
+        Return a check for the endgame solver which counts nodes and raises
+        Timeout once the solve has used half of the node limit or half of
+        the time left before the timer threshold, reading the clock only as
+        often as the adaptive clock would
+        """
+        if self.node_limit:
+            budget = self.nodes + self.node_limit // 2
+
+            def check() -> None:
+                """Count a node and stop at half of the node limit"""
+                self.nodes += 1
+                if self.nodes > budget:
+                    raise Timeout()
+        else:
+            stop = (self.time_left() + self.timer_threshold) / 2
+            self.start_clock()
+
+            def check() -> None:
+                """Count a node and stop halfway to the threshold"""
+                self.nodes += 1
+                if self.nodes >= self.next_check:
+                    self.check_clock(stop)
+        return check
+
+    def search_counts(self) -> List[int]:
+        """
+        Return the nodes, interior nodes, their legal moves, cutoffs and
+        transposition table probes and hits searched so far
+        """
+        table = self.transposition_table
+        return [self.nodes, self.expanded, self.children, self.cutoffs,
+                table.probes if table is not None else 0,
+                table.hits if table is not None else 0]
+
+    def start_telemetry(self) -> Tuple[float, float, List[int]]:
+        """
+        Return the clock, time budget and search counts at the start of a
+        move for record_move
+        """
+        return time.perf_counter(), self.time_left(), self.search_counts()
+
+    def record_move(self, game: Board,
+                    started: Tuple[float, float, List[int]],
+                    depth: int) -> MoveRecord:
+        """
+        Record the search of a move from the counts at its start, keep it
+        in move_stats, emit it to the telemetry sink and return it
+        """
+        clock, budget, counts = started
+        time_used = (time.perf_counter() - clock) * 1000
+        nodes, expanded, children, cutoffs, probes, hits = [
+            after - before
+            for after, before in zip(self.search_counts(), counts)]
+        record = {
+            'player': self.name,
+            'move_count': game.move_count,
+            'nodes': nodes,
+            'nodes_per_sec': nodes * 1000 / time_used if time_used else 0.,
+            'depth': depth,
+            'time_used': time_used,
+            'time_budget': None if math.isinf(budget) else budget,
+            'branching_factor': children / expanded if expanded else 0.,
+            'cutoff_rate': cutoffs / expanded if expanded else 0.,
+            'tt_hit_rate': hits / probes if probes else 0.,
+            'expanded': expanded,
+            'children': children,
+            'cutoffs': cutoffs,
+            'tt_probes': probes,
+            'tt_hits': hits
+        }  # type: MoveRecord
+        self.move_stats.append(record)
+        if self.telemetry is not None:
+            self.telemetry.emit(record)
+        return record
+
+    def check_budget(self) -> None:
+        """
+        Count a search node and raise Timeout once the move has used its
+        node limit, or without a node limit once the clock is nearly out
+        """
+        self.nodes += 1
+        if self.node_limit:
+            if self.nodes > self.node_budget:
+                raise Timeout()
+        elif self.adaptive_clock:
+            if self.nodes >= self.next_check:
+                self.check_clock()
+        elif self.time_left() < self.timer_threshold:
+            raise Timeout()
+
+    def start_clock(self) -> None:
+        """Read the clock at the next node, for the start of a move"""
+        self.clock_nodes = self.nodes
+        self.clock_time = self.time_left()
+        self.check_interval = 1
+        self.next_check = self.nodes + 1
+
+    def check_clock(self, threshold: float=None) -> None:
+        """
+        Raise Timeout when the clock is nearly out, otherwise set the nodes
+        to search before the next read from the rate since the last one,
+        so it comes after CHECK_PERIOD ms or half of the time left before
+        the threshold, whichever is sooner. The interval at most doubles
+        each read as a rate measured over a few nodes is mostly noise.
+        The threshold defaults to the timer threshold of the player.
+        """
+        if threshold is None:
+            threshold = self.timer_threshold
+        time_left = self.time_left()
+        if time_left < threshold:
+            raise Timeout()
+        interval = self.check_interval * 2
+        elapsed = self.clock_time - time_left
+        if elapsed > 0:
+            rate = (self.nodes - self.clock_nodes) / elapsed
+            period = min(CHECK_PERIOD, (time_left - threshold) / 2)
+            interval = min(interval, int(rate * period))
+        self.check_interval = max(1, min(interval, MAX_CHECK_INTERVAL))
+        self.clock_nodes = self.nodes
+        self.clock_time = time_left
+        self.next_check = self.nodes + self.check_interval
+
+    def start_ordering(self, game: Board) -> None:
+        """
+        Reset the move ordering state for a new move, killers of earlier
+        plies are dropped and history scores are halved so the new position
+        can outweigh them
+        """
+        self.principal_variation = []
+        self.pv_start = game.move_count
+        self.pv_table = {}
+        self.killers = dict((ply, moves) for ply, moves in self.killers.items()
+                            if ply >= game.move_count)
+        self.history = dict((key, value // 2)
+                            for key, value in self.history.items()
+                            if value > 1)
+
+    def order_moves(self, game: Board, moves: List[Move],
+                    maximizing_player: bool,
+                    hash_move: Move=None) -> List[Move]:
+        """
+        Return the moves with the principal variation move first, then the
+        transposition table move, the killer moves of this ply and the rest
+        sorted by history score
+        """
+        ply = game.move_count
+        first = []  # type: List[Move]
+        index = ply - self.pv_start
+        if 0 <= index < len(self.principal_variation):
+            first.append(self.principal_variation[index])
+        if hash_move is not None:
+            first.append(hash_move)
+        first.extend(self.killers.get(ply, []))
+
+        ordered = []  # type: List[Move]
+        for move in first:
+            if move in moves and move not in ordered:
+                ordered.append(move)
+        history = self.history
+        rest = [move for move in moves if move not in ordered]
+        rest.sort(key=lambda move: history.get((maximizing_player, move), 0),
+                  reverse=True)
+        return ordered + rest
+
+    def record_cutoff(self, game: Board, move: Move, depth: int,
+                      maximizing_player: bool) -> None:
+        """Remember a move which caused a cutoff as a killer and in history"""
+        killers = self.killers.setdefault(game.move_count, [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[2:]
+        key = (maximizing_player, move)
+        self.history[key] = self.history.get(key, 0) + depth * depth
+
     def minimax(self, game: Board, depth: int,
                 maximizing_player: bool=True) -> Tuple[float, Move]:
         """Implement the minimax search algorithm as described in the lectures.
@@ -523,8 +941,7 @@ class CustomPlayer:
                 evaluation function directly.
         """
 
-        if self.time_left() < self.timer_threshold:
-            raise Timeout()
+        self.check_budget()
 
         best_move = (-1, -1)
         best_score = float("-inf") if maximizing_player else float("inf")
@@ -533,9 +950,20 @@ class CustomPlayer:
         if depth is 0:
             return self.score(game, self), best_move
 
-        for move in game.get_legal_moves():
-            score, _ = self.minimax(
-                game.forecast_move(move), depth - 1, not maximizing_player)
+        moves = game.get_legal_moves()
+        self.expanded += 1
+        self.children += len(moves)
+        for move in moves:
+            if self.in_place:
+                game.apply_move(move)
+                try:
+                    score, _ = self.minimax(game, depth - 1,
+                                            not maximizing_player)
+                finally:
+                    game.undo_move()
+            else:
+                score, _ = self.minimax(
+                    game.forecast_move(move), depth - 1, not maximizing_player)
             best_score, best_move = comparison(
                 (best_score, best_move), (score, move))
 
@@ -581,29 +1009,84 @@ class CustomPlayer:
                 to pass the project unit tests; you cannot call any other
                 evaluation function directly.
         """
-        if self.time_left() < self.timer_threshold:
-            raise Timeout()
+        self.check_budget()
 
         best_move = (-1, -1)
         best_score = alpha if maximizing_player else beta
+        if self.ordering:
+            self.pv_table[game.move_count] = []
         if depth is 0:
             return self.score(game, self), best_move
 
-        for move in game.get_legal_moves():
-            future_game = game.forecast_move(move)
-            score, _ = self.alphabeta(future_game, depth - 1,
-                                      alpha, beta, not maximizing_player)
+        moves = game.get_legal_moves()
+        hash_move = None
+
+        # reuse a stored result or at least search its best move first
+        table = self.transposition_table
+        if table is not None:
+            key = game.zobrist_hash(self)
+            alpha_start, beta_start = alpha, beta
+            entry = table.lookup(key)
+            if entry is not None:
+                entry_depth, bound, entry_score, hash_move = entry
+                if entry_depth >= depth and (
+                        bound == EXACT or
+                        (bound == LOWER and entry_score >= beta) or
+                        (bound == UPPER and entry_score <= alpha)):
+                    return entry_score, hash_move
+                if hash_move in moves and not self.ordering:
+                    moves.remove(hash_move)
+                    moves.insert(0, hash_move)
+        if self.ordering:
+            moves = self.order_moves(game, moves, maximizing_player,
+                                     hash_move)
+        self.expanded += 1
+        self.children += len(moves)
+
+        for move in moves:
+            if self.in_place:
+                game.apply_move(move)
+                try:
+                    score, _ = self.alphabeta(game, depth - 1, alpha, beta,
+                                              not maximizing_player)
+                finally:
+                    game.undo_move()
+            else:
+                future_game = game.forecast_move(move)
+                score, _ = self.alphabeta(future_game, depth - 1,
+                                          alpha, beta, not maximizing_player)
+            if maximizing_player:
+                improved = score > best_score
+            else:
+                improved = score < best_score
+            if improved:
+                best_score, best_move = score, move
+                if self.ordering:
+                    self.pv_table[game.move_count] = [move] + \
+                        self.pv_table.get(game.move_count + 1, [])
             if maximizing_player:
-                if score > best_score:
-                    best_score, best_move = score, move
                 if best_score >= beta:
-                    return best_score, best_move
+                    self.cutoffs += 1
+                    if self.ordering:
+                        self.record_cutoff(game, move, depth, True)
+                    break
                 alpha = max(alpha, best_score)
             else:
-                if score < best_score:
-                    best_score, best_move = score, move
                 if best_score <= alpha:
-                    return best_score, best_move
+                    self.cutoffs += 1
+                    if self.ordering:
+                        self.record_cutoff(game, move, depth, False)
+                    break
                 beta = min(beta, best_score)
 
+        # scores outside the starting window are only bounds on the value
+        if table is not None:
+            if best_score >= beta_start:
+                bound = LOWER
+            elif best_score <= alpha_start:
+                bound = UPPER
+            else:
+                bound = EXACT
+            table.store(key, depth, bound, best_score, best_move)
+
         return best_score, best_move
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# Author: github.com/madhavajay
+"""This is a test for the heuristic kernels of game_agent"""
+
+from isolation import Board
+from game_agent import (ScoreCache, build_map, build_wall, cached,
+                        clover_leaf, block_move, ensemble, plane_walker,
+                        rush_middle)
+from move_graph import move_graph
+
+
+def open_board(cells) -> Board:
+    """Board with p1 at (0, 0), p2 at (6, 6) and only cells left blank"""
+    game = Board('p1', 'p2')
+    game.apply_move((0, 0))
+    game.apply_move((6, 6))
+    for index in range(49):
+        if divmod(index, 7) not in cells:
+            game.__board_state__[index] = 1
+    return game
+
+
+def test_expand_matches_knight_moves() -> None:
+    """Shifting a single cell reaches exactly its knight moves"""
+    graph = move_graph(5, 6)
+    for index, moves in enumerate(graph.knight_moves):
+        assert graph.cells(graph.expand(1 << index)) == sorted(moves)
+
+
+def test_distances_match_build_map() -> None:
+    """Breadth first layers count moves to every reachable blank cell"""
+    game = Board('p1', 'p2')
+    game.apply_move((3, 3))
+    graph = move_graph(7, 7)
+    blank = graph.blank_mask(game)
+    distances = graph.distances(blank, graph.neighbours[24] & blank)
+    assert distances[24] == 0
+    assert distances[1 * 7 + 2] == 1
+    assert distances[3 * 7 + 4] == 3
+    assert build_map(game.get_legal_moves('p1'),
+                     game.get_blank_spaces())[3][4] == 3
+
+
+def test_plane_walker_is_symmetric() -> None:
+    """Mirrored positions score the same and opposite for each player"""
+    game = Board('p1', 'p2')
+    game.apply_move((0, 0))
+    game.apply_move((6, 6))
+    assert plane_walker(game, 'p1') == 0.
+    game.apply_move((1, 2))
+    assert plane_walker(game, 'p1') == -plane_walker(game, 'p2') > 0
+
+
+def test_partition_detection() -> None:
+    """Players are partitioned only when no blank cell is reachable by both"""
+    graph = move_graph(7, 7)
+    cells = [(1, 2), (2, 1), (4, 5), (5, 4)]
+    assert graph.is_partitioned(open_board(cells))
+    assert not graph.is_partitioned(open_board(cells + [(3, 3)]))
+    assert not graph.is_partitioned(Board('p1', 'p2'))
+
+
+def test_ensemble_shares_context() -> None:
+    """The ensemble equals the sum of its heuristics scored one by one"""
+    game = Board('p1', 'p2')
+    for move in [(3, 3), (0, 0), (1, 2), (2, 2), (3, 4)]:
+        game.apply_move(move)
+    for player in ['p1', 'p2']:
+        assert ensemble(game, player) == sum(
+            heuristic(game, player) for heuristic in
+            [plane_walker, build_wall, rush_middle, block_move, clover_leaf])
+
+
+def test_score_cache_evicts_least_recent() -> None:
+    """The cache drops the least recently used score once it is full"""
+    cache = ScoreCache(2)
+    cache.put(1, 1.)
+    cache.put(2, 2.)
+    assert cache.get(1) == 1.
+    cache.put(3, 3.)
+    assert cache.get(2) is None
+    assert cache.get(1) == 1. and cache.get(3) == 3.
+    assert cache.hits == 3 and cache.misses == 1
+
+
+def test_cached_heuristic() -> None:
+    """A cached heuristic scores each position and player only once"""
+    score = cached(ensemble)
+    game = Board('p1', 'p2')
+    for move in [(3, 3), (0, 0), (1, 2)]:
+        game.apply_move(move)
+    assert score(game, 'p1') == ensemble(game, 'p1')
+    assert score(game, 'p2') == ensemble(game, 'p2')
+    assert score(game.copy(), 'p1') == ensemble(game, 'p1')
+    assert score.cache.misses == 2 and score.cache.hits == 1
@@ -8,15 +8,95 @@ remain compatible with the defaults provided, and none of your changes will
 be available to project reviewers.
 """
 
+import random
 import timeit
 
-from copy import deepcopy
 from copy import copy
 from termcolor import colored
 
 
 TIME_LIMIT_MILLIS = 200
 
+# (row, column) offsets of the L-shaped knight moves, in move generation order
+DIRECTIONS = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
+              (1, -2),  (1, 2), (2, -1),  (2, 1)]
+
+# move tables shared by every board of the same size
+_MOVE_TABLES = {}
+
+
+def move_table(width, height):
+    """
+    Return the tables shared by every board of a given size, built on first
+    use.
+
+    Parameters
+    ----------
+    width : int
+        The number of columns of the board.
+
+    height : int
+        The number of rows of the board.
+
+    Returns
+    ----------
+    (tuple, tuple, tuple)
+        The (row, column) coordinates of each flat cell index, the flat
+        indexes a knight can reach from each cell in DIRECTIONS order, and
+        the flat indexes in the column major order of get_blank_spaces().
+    """
+    key = (width, height)
+    if key not in _MOVE_TABLES:
+        coords = tuple((index // width, index % width)
+                       for index in range(width * height))
+        moves = tuple(tuple((r + dr) * width + c + dc
+                            for dr, dc in DIRECTIONS
+                            if 0 <= r + dr < height and 0 <= c + dc < width)
+                      for r, c in coords)
+        blank_order = tuple(i * width + j for j in range(width)
+                            for i in range(height))
+        _MOVE_TABLES[key] = (coords, moves, blank_order)
+    return _MOVE_TABLES[key]
+
+
+# zobrist keys shared by every board of the same size
+_ZOBRIST_TABLES = {}
+
+
+def zobrist_table(width, height):
+    """
+    Return the random 64 bit keys used to hash positions on a board of a
+    given size. The keys are seeded by the board size so hashes agree
+    between processes.
+
+    Parameters
+    ----------
+    width : int
+        The number of columns of the board.
+
+    height : int
+        The number of rows of the board.
+
+    Returns
+    ----------
+    (tuple, dict, dict)
+        A key per blocked cell, a tuple of keys per cell for the location
+        of each player symbol and a key per player symbol used to mix the
+        perspective of the searching player into a hash.
+    """
+    key = (width, height)
+    if key not in _ZOBRIST_TABLES:
+        rand = random.Random(width * 1000 + height)
+        num_cells = width * height
+        blocked = tuple(rand.getrandbits(64) for _ in range(num_cells))
+        locations = dict((symbol, tuple(rand.getrandbits(64)
+                                        for _ in range(num_cells)))
+                         for symbol in (1, 2))
+        perspectives = dict((symbol, rand.getrandbits(64))
+                            for symbol in (1, 2))
+        _ZOBRIST_TABLES[key] = (blocked, locations, perspectives)
+    return _ZOBRIST_TABLES[key]
+
 
 class Board(object):
     """
@@ -38,6 +118,13 @@ class Board(object):
 
     height : int (optional)
         The number of rows that the board should have.
+
+    Notes
+    -----
+        The cells are stored in a flat bytearray indexed by
+        row * width + column holding the symbol of the player who blocked
+        them, and knight moves are looked up in tables built once per board
+        size, so copying a board is a single bytearray copy.
     """
     BLANK = 0
     NOT_MOVED = None
@@ -50,7 +137,12 @@ class Board(object):
         self.__player_2__ = player_2
         self.__active_player__ = player_1
         self.__inactive_player__ = player_2
-        self.__board_state__ = [[Board.BLANK for i in range(width)] for j in range(height)]
+        self.__board_state__ = bytearray(width * height)
+        self.__coords__, self.__knight_moves__, self.__blank_order__ = \
+            move_table(width, height)
+        self.__undo_stack__ = []
+        self.__zobrist_keys__ = zobrist_table(width, height)
+        self.__zobrist__ = 0
         self.__last_player_move__ = {player_1: Board.NOT_MOVED, player_2: Board.NOT_MOVED}
         self.__player_symbols__ = {Board.BLANK: Board.BLANK, player_1: 1, player_2: 2}
 
@@ -100,7 +192,8 @@ class Board(object):
         new_board.__inactive_player__ = self.__inactive_player__
         new_board.__last_player_move__ = copy(self.__last_player_move__)
         new_board.__player_symbols__ = copy(self.__player_symbols__)
-        new_board.__board_state__ = deepcopy(self.__board_state__)
+        new_board.__board_state__ = self.__board_state__[:]
+        new_board.__zobrist__ = self.__zobrist__
         return new_board
 
     def forecast_move(self, move):
@@ -141,14 +234,16 @@ class Board(object):
         row, col = move
         return 0 <= row < self.height and \
                0 <= col < self.width and \
-               self.__board_state__[row][col] == Board.BLANK
+               self.__board_state__[row * self.width + col] == Board.BLANK
 
     def get_blank_spaces(self):
         """
         Return a list of the locations that are still available on the board.
         """
-        return [(i, j) for j in range(self.width) for i in range(self.height)
-            if self.__board_state__[i][j] == Board.BLANK]
+        state = self.__board_state__
+        coords = self.__coords__
+        return [coords[index] for index in self.__blank_order__
+                if not state[index]]
 
     def get_player_location(self, player):
         """
@@ -201,11 +296,76 @@ class Board(object):
         None
         """
         row, col = move
+        previous = self.__last_player_move__[self.active_player]
+        symbol = self.__player_symbols__[self.active_player]
+        self.__undo_stack__.append((move, previous))
+        self.__zobrist__ ^= self.__move_key__(symbol, move, previous)
         self.__last_player_move__[self.active_player] = move
-        self.__board_state__[row][col] = self.__player_symbols__[self.active_player]
+        self.__board_state__[row * self.width + col] = symbol
         self.__active_player__, self.__inactive_player__ = self.__inactive_player__, self.__active_player__
         self.move_count += 1
 
+    def undo_move(self):
+        """
+        Take back the last move applied to this board object, restoring the
+        blocked cell, the location of the player who made it and the
+        initiative, so a search can apply and undo moves on a single board
+        instead of copying it for every child.
+
+        Only moves applied since this board object was created or copied
+        can be undone.
+
+        Returns
+        ----------
+        (int, int)
+            The move which was taken back.
+        """
+        move, previous = self.__undo_stack__.pop()
+        row, col = move
+        self.__active_player__, self.__inactive_player__ = self.__inactive_player__, self.__active_player__
+        symbol = self.__player_symbols__[self.active_player]
+        self.__zobrist__ ^= self.__move_key__(symbol, move, previous)
+        self.__board_state__[row * self.width + col] = Board.BLANK
+        self.__last_player_move__[self.active_player] = previous
+        self.move_count -= 1
+        return move
+
+    def __move_key__(self, symbol, move, previous):
+        """
+        Return the zobrist keys toggled when the player with the given
+        symbol moves from previous to move, blocking the destination.
+        """
+        blocked, locations, _ = self.__zobrist_keys__
+        keys = locations[symbol]
+        index = move[0] * self.width + move[1]
+        key = blocked[index] ^ keys[index]
+        if previous is not Board.NOT_MOVED:
+            key ^= keys[previous[0] * self.width + previous[1]]
+        return key
+
+    def zobrist_hash(self, player=None):
+        """
+        Return a 64 bit hash of the blocked cells and player locations,
+        which is updated incrementally by apply_move and undo_move.
+
+        Parameters
+        ----------
+        player : object (optional)
+            An object registered as a player in the current game. When
+            given, the hash is mixed with the perspective of that player so
+            scores cached from the point of view of one player are never
+            returned for the other.
+
+        Returns
+        ----------
+        int
+            The hash of the current game state.
+        """
+        if player is None:
+            return self.__zobrist__
+        _, _, perspectives = self.__zobrist_keys__
+        return self.__zobrist__ ^ perspectives[self.__player_symbols__[player]]
+
     def is_winner(self, player):
         """ Test whether the specified player has won the game. """
         return player == self.inactive_player and not self.get_legal_moves(self.active_player)
@@ -258,13 +418,10 @@ class Board(object):
             return self.get_blank_spaces()
 
         r, c = move
-
-        directions = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
-                      (1, -2),  (1, 2), (2, -1),  (2, 1)]
-
-        valid_moves = [(r+dr,c+dc) for dr, dc in directions if self.move_is_legal((r+dr, c+dc))]
-
-        return valid_moves
+        state = self.__board_state__
+        coords = self.__coords__
+        return [coords[index] for index in self.__knight_moves__[r * self.width + c]
+                if not state[index]]
 
     def print_board(self):
         """DEPRECATED - use Board.to_string()"""
@@ -275,9 +432,6 @@ class Board(object):
         the location of each player and indicating which cells have been
         blocked, and which remain open.
         """
-        DIRECTIONS = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
-                      (1, -2),  (1, 2), (2, -1),  (2, 1)]
-
         p1_loc = self.__last_player_move__[self.__player_1__]
         p2_loc = self.__last_player_move__[self.__player_2__]
         p1_range = [(p1_loc[0] + pos[0], p1_loc[1] + pos[1]) for pos in DIRECTIONS]
@@ -291,7 +445,7 @@ class Board(object):
 
             for j in range(self.width):
 
-                if not self.__board_state__[i][j]:
+                if not self.__board_state__[i * self.width + j]:
                     if (i, j) in p1_range and (i, j) in p2_range:
                         out += str(colored(' ', 'white', 'on_blue'))
                     else:
@@ -321,7 +475,9 @@ class Board(object):
         ----------
         time_limit : numeric (optional)
             The maximum number of milliseconds to allow before timeout
-            during each turn.
+            during each turn. None disables the clock for players which
+            limit their own search by nodes or depth, so results do not
+            depend on machine load.
 
         Returns
         ----------
@@ -350,7 +506,10 @@ class Board(object):
                     print("\nMove {}: New state after {}'s turn: \n\n{}".format(move_number, self.__inactive_player__.name, self.to_string()))
 
             move_start = curr_time_millis()
-            time_left = lambda : time_limit - (curr_time_millis() - move_start)
+            if time_limit is None:
+                time_left = lambda : float("inf")
+            else:
+                time_left = lambda : time_limit - (curr_time_millis() - move_start)
             curr_move = self.active_player.get_move(game_copy, legal_player_moves, time_left)
             move_end = time_left()
 
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# Author: github.com/madhavajay
+"""This is a test for the compact isolation board"""
+
+from isolation import Board
+from isolation.isolation import move_table
+
+
+def test_move_table() -> None:
+    """Knight moves are precomputed per cell in flat index order"""
+    coords, moves, blank_order = move_table(7, 7)
+    assert coords[10] == (1, 3)
+    assert [coords[index] for index in moves[0]] == [(1, 2), (2, 1)]
+    assert len(moves[3 * 7 + 3]) == 8
+    assert blank_order[:2] == (0, 7)
+    assert move_table(7, 7)[1] is moves
+
+
+def test_legal_moves_skip_blocked() -> None:
+    """Blocked cells are removed from the knight moves of a player"""
+    game = Board('p1', 'p2')
+    game.apply_move((0, 0))
+    game.apply_move((2, 1))
+    assert game.get_legal_moves('p1') == [(1, 2)]
+    assert len(game.get_blank_spaces()) == 47
+    assert (2, 1) not in game.get_blank_spaces()
+    assert not game.move_is_legal((2, 1))
+    assert not game.move_is_legal((7, 0))
+
+
+def test_copy_is_independent() -> None:
+    """Forecasting a move leaves the original board untouched"""
+    game = Board('p1', 'p2', 5, 9)
+    game.apply_move((4, 2))
+    future = game.forecast_move((0, 0))
+    assert future.get_player_location('p2') == (0, 0)
+    assert game.move_is_legal((0, 0))
+    assert not future.move_is_legal((0, 0))
+    assert future.get_blank_spaces() == [
+        move for move in game.get_blank_spaces() if move != (0, 0)]
+
+
+def test_undo_move() -> None:
+    """Undoing moves restores cells, locations, initiative and move count"""
+    game = Board('p1', 'p2')
+    game.apply_move((3, 3))
+    game.apply_move((0, 0))
+    before = game.to_string()
+    game.apply_move((1, 2))
+    game.apply_move((2, 2))
+    assert game.undo_move() == (2, 2)
+    assert game.undo_move() == (1, 2)
+    assert game.to_string() == before
+    assert game.move_count == 2
+    assert game.active_player == 'p1'
+    assert game.get_player_location('p1') == (3, 3)
+    assert game.undo_move() == (0, 0)
+    assert game.get_player_location('p2') is Board.NOT_MOVED
+
+
+def test_zobrist_hash() -> None:
+    """The hash follows moves, is restored by undo and agrees with copies"""
+    game = Board('p1', 'p2')
+    empty = game.zobrist_hash()
+    game.apply_move((3, 3))
+    game.apply_move((0, 0))
+    before = game.zobrist_hash()
+    assert before != empty
+    future = game.forecast_move((1, 2))
+    game.apply_move((1, 2))
+    assert game.zobrist_hash() == future.zobrist_hash()
+    assert game.zobrist_hash() != before
+    game.undo_move()
+    assert game.zobrist_hash() == before
+    assert game.zobrist_hash('p1') != game.zobrist_hash('p2')
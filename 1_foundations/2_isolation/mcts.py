@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+# Author: github.com/madhavajay
+"""nd889 AIND Project 2 - Monte Carlo Tree Search player"""
+
+import logging
+import math
+import random
+from typing import List, Optional, Tuple
+
+from isolation import Board
+from game_agent import Move, Timer
+
+# exploration constant of UCT
+EXPLORATION = math.sqrt(2)
+
+# the arena is compacted to the reused subtree once it grows past this
+MAX_NODES = 1 << 18
+
+
+class MCTSPlayer:
+    """
+    Anytime player which runs Monte Carlo Tree Search with UCT selection
+    until the time left drops to the timer threshold and plays the most
+    visited move.
+
+    Nodes live in an arena of flat lists indexed by node number, each node
+    holds the cell moved to, the index and count of its children, which are
+    allocated side by side on expansion, its visits and the wins of the
+    player who moved into it. Playouts run on a bytearray of blocked cells
+    with the knight move tables of the board, and the subtree of the
+    position reached after the opponent replies is kept for the next move.
+
+    Parameters
+    ----------
+    exploration : float (optional)
+        Weight of the exploration term of UCT.
+
+    timeout : float (optional)
+        Time remaining (in milliseconds) when search is stopped.
+
+    max_nodes : int (optional)
+        Arena size above which it is compacted to the reused subtree.
+
+    seed : int (optional)
+        Seed of the playout random generator, for repeatable games.
+
+    playout_limit : int (optional)
+        Number of playouts each move runs, when set the clock is ignored so
+        a seeded player makes the same moves on any machine; 0 searches
+        until the timeout.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, exploration: float=EXPLORATION, timeout: float=10.,
+                 max_nodes: int=MAX_NODES, seed: Optional[int]=None,
+                 playout_limit: int=0) -> None:
+        self.exploration = exploration
+        self.playout_limit = playout_limit
+        self.timer_threshold = timeout
+        self.max_nodes = max_nodes
+        self.random = random.Random(seed)
+        self.time_left = None  # type: Optional[Timer]
+        self.average_depths = []  # type: List[int]
+        self.playouts = []  # type: List[int]
+        self.name = "mcts"
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop the search tree"""
+        self.moves = [-1]  # type: List[int]
+        self.first_child = [-1]  # type: List[int]
+        self.num_children = [0]  # type: List[int]
+        self.visits = [0]  # type: List[int]
+        self.wins = [0.]  # type: List[float]
+        self.root = 0
+        # blocked cells expected when the opponent has replied to our move
+        self.expected = None  # type: Optional[bytes]
+
+    def new_node(self, move: int) -> int:
+        """Append an unexpanded node to the arena and return its index"""
+        self.moves.append(move)
+        self.first_child.append(-1)
+        self.num_children.append(0)
+        self.visits.append(0)
+        self.wins.append(0.)
+        return len(self.moves) - 1
+
+    def compact(self) -> None:
+        """Copy the subtree of the root into a new arena"""
+        moves, first_child = self.moves, self.first_child
+        num_children, visits, wins = self.num_children, self.visits, self.wins
+        root, expected = self.root, self.expected
+        self.reset()
+        self.expected = expected
+        self.moves[0] = moves[root]
+        self.visits[0] = visits[root]
+        self.wins[0] = wins[root]
+        stack = [(root, 0)]
+        while stack:
+            old, new = stack.pop()
+            if first_child[old] < 0:
+                continue
+            self.first_child[new] = len(self.moves)
+            self.num_children[new] = num_children[old]
+            for child in range(first_child[old],
+                               first_child[old] + num_children[old]):
+                node = self.new_node(moves[child])
+                self.visits[node] = visits[child]
+                self.wins[node] = wins[child]
+                stack.append((child, node))
+
+    def reuse_tree(self, game: Board) -> None:
+        """
+        Move the root to the child of the opponent reply when the game
+        continues from our last move, otherwise start a new tree
+        """
+        cells = game.__board_state__
+        opponent = game.get_player_location(game.inactive_player)
+        root = -1
+        if self.expected is not None and opponent is not None:
+            index = opponent[0] * game.width + opponent[1]
+            expected = bytearray(self.expected)
+            expected[index] = cells[index]
+            if bytes(expected) == bytes(cells) and \
+                    self.first_child[self.root] >= 0:
+                first = self.first_child[self.root]
+                for child in range(first, first + self.num_children[self.root]):
+                    if self.moves[child] == index:
+                        root = child
+        if root < 0:
+            self.reset()
+            return
+        self.root = root
+        if len(self.moves) > self.max_nodes:
+            self.compact()
+
+    def expand(self, node: int, cells: bytearray, location: int,
+               knight_moves: Tuple[Tuple[int, ...], ...]) -> None:
+        """Allocate a child for every legal move from the node"""
+        if location < 0:
+            options = [i for i, cell in enumerate(cells) if not cell]
+        else:
+            options = [i for i in knight_moves[location] if not cells[i]]
+        self.first_child[node] = len(self.moves)
+        self.num_children[node] = len(options)
+        for move in options:
+            self.new_node(move)
+
+    def select(self, node: int) -> int:
+        """Return the child of the node with the highest UCT value"""
+        first = self.first_child[node]
+        visits, wins = self.visits, self.wins
+        log_visits = math.log(visits[node] or 1)
+        best, best_value = first, -1.
+        for child in range(first, first + self.num_children[node]):
+            if not visits[child]:
+                return child
+            value = wins[child] / visits[child] + self.exploration * \
+                math.sqrt(log_visits / visits[child])
+            if value > best_value:
+                best, best_value = child, value
+        return best
+
+    def playout(self, cells: bytearray, locations: List[int], side: int,
+                knight_moves: Tuple[Tuple[int, ...], ...]) -> int:
+        """Play random moves until a side cannot move and return the winner"""
+        choice = self.random.choice
+        while True:
+            location = locations[side]
+            if location < 0:
+                options = [i for i, cell in enumerate(cells) if not cell]
+            else:
+                options = [i for i in knight_moves[location] if not cells[i]]
+            if not options:
+                return 1 - side
+            move = choice(options)
+            cells[move] = 1
+            locations[side] = move
+            side ^= 1
+
+    def iterate(self, cells: bytes, locations: List[int],
+                knight_moves: Tuple[Tuple[int, ...], ...]) -> int:
+        """
+        Run one selection, expansion, playout and backup from the root and
+        return the depth of the tree it reached, side 0 is the player to
+        move at the root and side 1 the opponent
+        """
+        board = bytearray(cells)
+        locations = locations[:]
+        path = [self.root]
+        node = self.root
+        side = 0
+        while self.first_child[node] >= 0 and self.num_children[node]:
+            node = self.select(node)
+            move = self.moves[node]
+            board[move] = 1
+            locations[side] = move
+            side ^= 1
+            path.append(node)
+
+        if self.first_child[node] < 0 and \
+                (self.visits[node] or node == self.root) and \
+                len(self.moves) < 2 * self.max_nodes:
+            self.expand(node, board, locations[side], knight_moves)
+            if self.num_children[node]:
+                node = self.select(node)
+                move = self.moves[node]
+                board[move] = 1
+                locations[side] = move
+                side ^= 1
+                path.append(node)
+
+        winner = self.playout(board, locations, side, knight_moves)
+        # the player who moved into a node at depth d is side (d - 1) % 2
+        for depth, node in enumerate(path):
+            self.visits[node] += 1
+            if depth and (depth - 1) % 2 == winner:
+                self.wins[node] += 1
+        return len(path) - 1
+
+    def get_move(self, game: Board, legal_moves: List[Move],
+                 time_left: Timer) -> Move:
+        """
+        Search until the time left drops to the timer threshold, or for the
+        playout limit, and return the most visited legal move, or (-1, -1)
+        if there are none
+        """
+        self.time_left = time_left
+        if not legal_moves:
+            logging.info('MCTS Player has no more legal moves')
+            return (-1, -1)
+
+        self.reuse_tree(game)
+        width = game.width
+        cells = bytes(game.__board_state__)
+        locations = []  # type: List[int]
+        for player in [game.active_player, game.inactive_player]:
+            location = game.get_player_location(player)
+            locations.append(-1 if location is None else
+                             location[0] * width + location[1])
+        knight_moves = game.__knight_moves__
+
+        playouts = 0
+        depth = 0
+        while playouts == 0 or (
+                playouts < self.playout_limit if self.playout_limit else
+                time_left() > self.timer_threshold):
+            depth = max(depth, self.iterate(cells, locations, knight_moves))
+            playouts += 1
+        self.playouts.append(playouts)
+        self.average_depths.append(depth)
+
+        first = self.first_child[self.root]
+        child = max(range(first, first + self.num_children[self.root]),
+                    key=self.visits.__getitem__)
+        move = self.moves[child]
+        self.root = child
+        expected = bytearray(cells)
+        expected[move] = game.__player_symbols__[game.active_player]
+        self.expected = bytes(expected)
+        return move // width, move % width
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+# Author: github.com/madhavajay
+"""nd889 AIND Project 2 - Knight move graph on bitboards"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from isolation import Board
+from isolation.isolation import DIRECTIONS, move_table
+
+# translates board cells to ascii binary digits, 1 for blank and 0 blocked
+BLANK_DIGITS = b'1' + b'0' * 255
+
+
+class MoveGraph:
+    """
+    Knight move graph of one board size with cells as bits of an int, bit
+    row * width + column, so a breadth first layer of every reachable cell
+    is eight masked shifts however many cells the frontier holds
+    """
+
+    def __init__(self, width: int, height: int) -> None:
+        self.width = width
+        self.height = height
+        self.num_cells = width * height
+        self.full = (1 << self.num_cells) - 1
+        self.coords, self.knight_moves, _ = move_table(width, height)
+        # the cells each direction can move from and the shift it applies
+        self.steps = []  # type: List[Tuple[int, int]]
+        for row_step, col_step in DIRECTIONS:
+            sources = 0
+            for index, (row, col) in enumerate(self.coords):
+                if 0 <= row + row_step < height and \
+                        0 <= col + col_step < width:
+                    sources |= 1 << index
+            self.steps.append((sources, row_step * width + col_step))
+        self.neighbours = [sum(1 << move for move in moves)
+                           for moves in self.knight_moves]
+
+    def expand(self, mask: int) -> int:
+        """Return every cell one knight move from a cell of the mask"""
+        reached = 0
+        for sources, shift in self.steps:
+            if shift > 0:
+                reached |= (mask & sources) << shift
+            else:
+                reached |= (mask & sources) >> -shift
+        return reached
+
+    def blank_mask(self, game: Board) -> int:
+        """Return the blank cells of a board"""
+        digits = game.__board_state__.translate(BLANK_DIGITS)
+        return int(digits[::-1], 2)
+
+    def location(self, game: Board, player: Any) -> Optional[int]:
+        """Return the cell of a player or None if it has not moved"""
+        move = game.__last_player_move__[player]
+        if move is Board.NOT_MOVED:
+            return None
+        return move[0] * self.width + move[1]
+
+    def move_mask(self, blank: int, location: Optional[int]) -> int:
+        """Return the legal moves from a location, any blank if unplaced"""
+        if location is None:
+            return blank
+        return self.neighbours[location] & blank
+
+    def layers(self, blank: int, start: int, limit: int=0) -> List[int]:
+        """
+        Return the breadth first layers of blank cells reached from the
+        start cells, which are layer one, stopping after limit layers
+        when it is not 0
+        """
+        layer = start & blank
+        seen = layer
+        layers = []  # type: List[int]
+        while layer and (not limit or len(layers) < limit):
+            layers.append(layer)
+            layer = self.expand(layer) & blank & ~seen
+            seen |= layer
+        return layers
+
+    def reachable(self, blank: int, location: Optional[int]) -> int:
+        """Return every blank cell a player can ever reach"""
+        reached = 0
+        for layer in self.layers(blank, self.move_mask(blank, location)):
+            reached |= layer
+        return reached
+
+    def distances(self, blank: int, start: int) -> List[int]:
+        """
+        Return the number of moves to each cell from the start cells, one
+        for a start cell and zero where a cell cannot be reached
+        """
+        distances = [0] * self.num_cells
+        for depth, layer in enumerate(self.layers(blank, start), 1):
+            while layer:
+                low = layer & -layer
+                distances[low.bit_length() - 1] = depth
+                layer ^= low
+        return distances
+
+    def cells(self, mask: int) -> List[int]:
+        """Return the cell indexes of the bits of a mask in order"""
+        indexes = []  # type: List[int]
+        while mask:
+            low = mask & -mask
+            indexes.append(low.bit_length() - 1)
+            mask ^= low
+        return indexes
+
+    def is_partitioned(self, game: Board) -> bool:
+        """
+        Return True when the players can no longer reach a common cell, so
+        each plays out the longest path of its own region
+        """
+        blank = self.blank_mask(game)
+        own = self.location(game, game.active_player)
+        opp = self.location(game, game.inactive_player)
+        if own is None or opp is None:
+            return False
+        return not self.reachable(blank, own) & self.reachable(blank, opp)
+
+
+# move graphs shared by every board of the same size
+_MOVE_GRAPHS = {}  # type: Dict[Tuple[int, int], MoveGraph]
+
+
+def move_graph(width: int, height: int) -> MoveGraph:
+    """Return the move graph of a board size, built on first use"""
+    key = (width, height)
+    if key not in _MOVE_GRAPHS:
+        _MOVE_GRAPHS[key] = MoveGraph(width, height)
+    return _MOVE_GRAPHS[key]
@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+# Author: github.com/madhavajay
+"""nd889 AIND Project 2 - Parallel root split alpha-beta search"""
+
+import logging
+import multiprocessing
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from isolation import Board
+import game_agent
+from game_agent import CustomPlayer, Heuristic, Move, Timer, custom_score
+
+# serialised board of width, height, cells, searching player symbol, player
+# locations by symbol, move count and zobrist hash
+Snapshot = Tuple[int, int, bytes, int, Dict[int, Optional[Move]], int, int]
+
+# scores of a path for each completed depth and whether deeper is no better
+PathResult = Tuple[List[float], bool]
+
+# path results of a worker task and the search counts it added
+TaskResult = Tuple[List[PathResult], List[int]]
+
+# the searcher and shared deadline of a pool worker process
+_WORKER = None  # type: Optional[CustomPlayer]
+_DEADLINE = None  # type: Any
+
+
+def snapshot_board(game: Board, player: Any) -> Snapshot:
+    """Return the state of a board as plain values which can be pickled"""
+    player_1 = game.__player_1__
+    player_2 = game.__player_2__
+    locations = {1: game.__last_player_move__[player_1],
+                 2: game.__last_player_move__[player_2]}
+    return (game.width, game.height, bytes(game.__board_state__),
+            game.__player_symbols__[player], locations, game.move_count,
+            game.__zobrist__)
+
+
+def restore_board(snapshot: Snapshot, player: Any) -> Board:
+    """Rebuild a snapshot with player searching in place of the original"""
+    width, height, cells, symbol, locations, move_count, zobrist = snapshot
+    opponent = 'opponent'
+    if symbol == 1:
+        game = Board(player, opponent, width, height)
+    else:
+        game = Board(opponent, player, width, height)
+    game.__board_state__ = bytearray(cells)
+    game.__last_player_move__[game.__player_1__] = locations[1]
+    game.__last_player_move__[game.__player_2__] = locations[2]
+    game.move_count = move_count
+    if move_count % 2:
+        game.__active_player__, game.__inactive_player__ = \
+            game.__inactive_player__, game.__active_player__
+    game.__zobrist__ = zobrist
+    return game
+
+
+def init_worker(options: Dict[str, Any], deadline: Any) -> None:
+    """Build the searcher of a pool process once when the process starts"""
+    global _WORKER, _DEADLINE  # pylint: disable=global-statement
+    _DEADLINE = deadline
+    _WORKER = CustomPlayer(method='alphabeta', in_place=True, **options)
+    _WORKER.time_left = lambda: (_DEADLINE.value - time.monotonic()) * 1000
+
+
+def search_paths(snapshot: Snapshot,
+                 paths: List[Tuple[Move, ...]]) -> TaskResult:
+    """
+    Play the moves of each path and search the positions they reach with
+    iterative deepening, one depth at a time across all of them, until the
+    shared deadline, returning the score of each completed depth counted
+    from the end of the path and the search counts of the task
+    """
+    player = _WORKER
+    counts = player.search_counts()
+    games = []  # type: List[Board]
+    for path in paths:
+        game = restore_board(snapshot, player)
+        for move in path:
+            game.apply_move(move)
+        games.append(game)
+    results = [([], False) for _ in paths]  # type: List[PathResult]
+    variations = [[] for _ in paths]  # type: List[List[Move]]
+    if player.transposition_table is not None:
+        player.transposition_table.new_search()
+    if player.ordering:
+        player.start_ordering(games[0])
+
+    try:
+        depth = 0
+        while not all(done for _, done in results):
+            for index, game in enumerate(games):
+                scores, done = results[index]
+                if done:
+                    continue
+                player.principal_variation = variations[index]
+                player.pv_start = game.move_count
+                score, _ = player.alphabeta(
+                    game, depth,
+                    maximizing_player=game.active_player is player)
+                scores.append(score)
+                variations[index] = player.pv_table.get(game.move_count, [])
+                # a proven result or a full board cannot change deeper
+                if score in (game_agent.INF, game_agent.NEGINF) or \
+                        depth >= game.width * game.height - game.move_count:
+                    results[index] = (scores, True)
+            depth += 1
+    except game_agent.Timeout:
+        pass
+    return results, [after - before for after, before
+                     in zip(player.search_counts(), counts)]
+
+
+def path_score(results: Dict[Tuple[Move, ...], PathResult],
+               path: Tuple[Move, ...], depth: int) -> Optional[float]:
+    """Return the score of a searched path at a depth from the root"""
+    scores, done = results[path]
+    index = depth - len(path)
+    if index < 0 or not scores:
+        return None
+    if index < len(scores):
+        return scores[index]
+    return scores[-1] if done else None
+
+
+class ParallelPlayer(CustomPlayer):
+    """
+    CustomPlayer which splits iterative deepening alpha-beta at the root
+    across a pool of worker processes. Each task searches the position after
+    one root move, or after a root move and a reply when there are fewer
+    root moves than workers, until a deadline shared through memory, and
+    the deepest depth every task completed is backed up to pick the move.
+
+    The pool is started with the player and kept for every move so process
+    start up is paid once, call close() when the player is no longer needed.
+
+    Parameters
+    ----------
+    workers : int (optional)
+        Number of worker processes, defaults to one less than the number of
+        cores so the process running the game keeps a core.
+
+    score_fn : callable (optional)
+        A module level heuristic, it is pickled to each worker.
+
+    telemetry : object (optional)
+        Sink given the record of every move, with the search counts of all
+        workers and the depth backed up at the root.
+
+    Other parameters are passed to the CustomPlayer of each worker.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, workers: int=0, score_fn: Heuristic=custom_score,
+                 timeout: float=10., tt_size: int=0,
+                 ordering: bool=True, telemetry: Any=None) -> None:
+        super().__init__(score_fn=score_fn, method='alphabeta',
+                         timeout=timeout, telemetry=telemetry)
+        # search counts summed over every task of every worker
+        self.worker_counts = [0] * 6
+        self.workers = workers or max(multiprocessing.cpu_count() - 1, 1)
+        context = multiprocessing.get_context()
+        self.deadline = context.RawValue('d', 0.0)
+        options = {'score_fn': score_fn, 'timeout': timeout,
+                   'tt_size': tt_size, 'ordering': ordering}
+        self.pool = context.Pool(self.workers, init_worker,
+                                 (options, self.deadline))
+
+    def close(self) -> None:
+        """Stop the worker processes"""
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+    def search_counts(self) -> List[int]:
+        """Return the search counts of the workers so far"""
+        return list(self.worker_counts)
+
+    def split_paths(self, game: Board,
+                    legal_moves: List[Move]) -> List[Tuple[Move, ...]]:
+        """
+        Return the move paths searched as separate tasks, splitting one ply
+        deeper when there are fewer root moves than workers
+        """
+        if len(legal_moves) >= self.workers:
+            return [(move,) for move in legal_moves]
+        paths = []  # type: List[Tuple[Move, ...]]
+        for move in legal_moves:
+            replies = game.forecast_move(move).get_legal_moves()
+            if not replies:
+                paths.append((move,))
+            paths.extend((move, reply) for reply in replies)
+        return paths
+
+    def get_move(self, game: Board, legal_moves: List[Move],
+                 time_left: Timer) -> Move:
+        """
+        Search every split path in parallel until the time left drops to the
+        timer threshold and return the best move of the deepest depth
+        finished for all of them, leaving out moves whose task was late, or
+        the first legal move if none was
+        """
+        self.time_left = time_left
+        if not legal_moves:
+            logging.info('Computer Player has no more legal moves')
+            return (-1, -1)
+        started = self.start_telemetry()
+        if len(legal_moves) == 1:
+            # a forced move is recorded unsearched so every move is counted
+            self.average_depths.append(0)
+            self.record_move(game, started, 0)
+            return legal_moves[0]
+
+        # workers stop a threshold early so results are back in time
+        budget = time_left() - self.timer_threshold
+        self.deadline.value = time.monotonic() + budget / 1000
+        snapshot = snapshot_board(game, self)
+        paths = self.split_paths(game, legal_moves)
+        groups = [paths[i::self.workers]
+                  for i in range(min(self.workers, len(paths)))]
+        pending = [(group, self.pool.apply_async(search_paths,
+                                                 (snapshot, group)))
+                   for group in groups]
+        results = {}  # type: Dict[Tuple[Move, ...], PathResult]
+        for group, result in pending:
+            # workers stop within a node of the deadline, so a late task
+            # may still be collected until half the threshold is left
+            wait = (time_left() - self.timer_threshold / 2) / 1000
+            try:
+                scores, counts = result.get(max(wait, 0))
+                results.update(zip(group, scores))
+                self.worker_counts = [total + count for total, count
+                                      in zip(self.worker_counts, counts)]
+            except multiprocessing.TimeoutError:
+                logging.info('Parallel search task was late')
+        # cancel anything still running before the next move
+        self.deadline.value = 0.0
+
+        # a move is backed up when every one of its paths came back
+        move_paths = {}  # type: Dict[Move, List[Tuple[Move, ...]]]
+        for move in legal_moves:
+            move_paths[move] = [path for path in paths if path[0] == move]
+        arrived = [move for move in legal_moves
+                   if all(path in results for path in move_paths[move])]
+        best_move = arrived[0] if arrived else legal_moves[0]
+        best_depth = 0
+        max_depth = game.width * game.height - game.move_count \
+            if arrived else 0
+        for depth in range(1, max_depth + 1):
+            scores = []  # type: List[Tuple[float, Move]]
+            for move in arrived:
+                replies = [path_score(results, path, depth)
+                           for path in move_paths[move]]
+                score = None if None in replies else min(replies)
+                if score is None:
+                    break
+                scores.append((score, move))
+            else:
+                best_score = max(score for score, _ in scores)
+                best_move = next(move for score, move in scores
+                                 if score == best_score)
+                best_depth = depth
+                continue
+            break
+        self.average_depths.append(best_depth)
+        self.record_move(game, started, best_depth)
+        return best_move
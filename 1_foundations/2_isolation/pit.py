@@ -14,6 +14,7 @@ from typing import NamedTuple, Callable, Any, Tuple
 
 from tournament import *
 from chromosome import *
+from telemetry import format_summary, summarize, totals
 
 
 MAX_POPULATION = 100
@@ -24,7 +25,8 @@ def fitness(fighter) -> float:
     """
     Play one round (i.e., a single match between each pair of opponents)
     """
-    CUSTOM_ARGS = {"method": 'alphabeta', 'iterative': True}
+    CUSTOM_ARGS = {"method": 'alphabeta', 'iterative': True,
+                   'adaptive_clock': True, 'endgame': True}
     player_1 = CustomPlayer(score_fn=score_chromosome(fighter), **CUSTOM_ARGS)
     agent_1 = Agent(player_1, fighter.name)
     id_improved = CustomPlayer(score_fn=improved_score, **CUSTOM_ARGS)
@@ -64,6 +66,9 @@ def fitness(fighter) -> float:
         agent_1.name, int(counts[agent_1.player]), avg_1,
         agent_2.name, int(counts[agent_2.player]), avg_2
     ))
+    for agent in [agent_1, agent_2]:
+        print(format_summary(agent.name,
+                             summarize(totals(agent.player.move_stats))))
 
     agent_1_score = 100. * agent_1_wins / total
     return update_score(fighter, agent_1_score)
@@ -0,0 +1,489 @@
+# -*- coding: utf-8 -*-
+# Author: github.com/madhavajay
+"""This is a test for the CustomPlayer search options"""
+
+import io
+import multiprocessing
+import random
+import time
+
+import pytest
+
+import game_agent
+import parallel
+from endgame import EndgameSolver
+from mcts import MCTSPlayer
+from isolation import Board
+from move_graph import move_graph
+from game_agent import CustomPlayer
+from sample_players import improved_score
+import telemetry
+
+
+def make_game(player: CustomPlayer) -> Board:
+    """Board a few moves into a game with the player moving first"""
+    game = Board(player, 'opponent')
+    for move in [(3, 3), (0, 0), (1, 2), (2, 2)]:
+        game.apply_move(move)
+    return game
+
+
+def test_in_place_matches_copies() -> None:
+    """Searching in place finds the same result as forecast_move copies"""
+    for method in ['minimax', 'alphabeta']:
+        results = []
+        for in_place in [False, True]:
+            player = CustomPlayer(4, improved_score, False, method,
+                                  in_place=in_place)
+            player.time_left = lambda: 1e9
+            game = make_game(player)
+            before = game.to_string()
+            results.append(getattr(player, method)(game, 4))
+            assert game.to_string() == before
+        assert results[0] == results[1]
+
+
+def test_in_place_restores_on_timeout() -> None:
+    """A timeout deep in the search unwinds back to the original board"""
+    player = CustomPlayer(6, improved_score, False, 'alphabeta',
+                          in_place=True)
+    calls = []
+
+    def time_left() -> float:
+        calls.append(1)
+        return 0. if len(calls) > 50 else 1e9
+
+    player.time_left = time_left
+    game = make_game(player)
+    before = game.to_string()
+    # agent_test reloads game_agent so look Timeout up on the module
+    with pytest.raises(game_agent.Timeout):
+        player.alphabeta(game, 6)
+    assert len(calls) > 50
+    assert game.to_string() == before
+    assert game.move_count == 4
+
+
+def test_transposition_table_matches_search() -> None:
+    """The table gives the same result as a plain search in fewer nodes"""
+    results = []
+    nodes = []
+    for tt_size in [0, 1 << 12]:
+        player = CustomPlayer(5, improved_score, False, 'alphabeta',
+                              tt_size=tt_size)
+        calls = []
+
+        def time_left() -> float:
+            calls.append(1)
+            return 1e9
+
+        player.time_left = time_left
+        game = make_game(player)
+        for depth in range(1, 6):
+            result = player.alphabeta(game, depth)
+        results.append(result)
+        nodes.append(len(calls))
+    assert results[0][0] == results[1][0]
+    assert nodes[1] < nodes[0]
+
+
+def test_transposition_table_replacement() -> None:
+    """Deeper entries survive a shallower store until the next search"""
+    table = game_agent.TranspositionTable(4)
+    table.store(1, 3, game_agent.EXACT, 1., (0, 0))
+    table.store(5, 1, game_agent.LOWER, 2., (1, 1))
+    assert table.lookup(1) == (3, game_agent.EXACT, 1., (0, 0))
+    assert table.lookup(5) is None
+    table.new_search()
+    table.store(5, 1, game_agent.LOWER, 2., (1, 1))
+    assert table.lookup(5) == (1, game_agent.LOWER, 2., (1, 1))
+    assert table.lookup(1) is None
+    assert table.probes == 4 and table.hits == 2
+
+
+def test_ordering_matches_search() -> None:
+    """Ordered iterative deepening finds the same score in fewer nodes"""
+    results = []
+    nodes = []
+    for ordering in [False, True]:
+        player = CustomPlayer(5, improved_score, False, 'alphabeta',
+                              ordering=ordering)
+        calls = []
+
+        def time_left() -> float:
+            calls.append(1)
+            return 1e9
+
+        player.time_left = time_left
+        game = make_game(player)
+        player.start_ordering(game)
+        for depth in range(1, 6):
+            result = player.alphabeta(game, depth)
+            player.principal_variation = player.pv_table.get(
+                game.move_count, [])
+        if ordering:
+            assert player.principal_variation[0] == result[1]
+        results.append(result)
+        nodes.append(len(calls))
+    assert results[0][0] == results[1][0]
+    assert nodes[1] < nodes[0]
+
+
+def test_iterative_stops_on_proven_result() -> None:
+    """Iterative deepening stops once a forced win is found, whether or
+    not moves are ordered"""
+    for ordering in [True, False]:
+        player = CustomPlayer(3, improved_score, True, 'alphabeta',
+                              ordering=ordering)
+        game = Board(player, 'opponent', 5, 5)
+        for move in [(0, 0), (4, 4), (1, 2), (2, 3)]:
+            game.apply_move(move)
+        move = player.get_move(game, game.get_legal_moves(), lambda: 1e9)
+        depth = player.average_depths[-1] - 1
+        assert depth < game.width * game.height - game.move_count
+        player.time_left = lambda: 1e9
+        assert player.alphabeta(game, depth) == (float('inf'), move)
+
+
+def test_snapshot_round_trip() -> None:
+    """A restored snapshot has the same cells, players, moves and hash"""
+    player = CustomPlayer(3, improved_score, False, 'alphabeta')
+    game = make_game(player)
+    game.apply_move(game.get_legal_moves()[0])
+    restored = parallel.restore_board(parallel.snapshot_board(game, player),
+                                      player)
+    assert restored.to_string() == game.to_string()
+    assert restored.inactive_player is player
+    assert restored.get_legal_moves() == game.get_legal_moves()
+    assert restored.zobrist_hash(player) == game.zobrist_hash(player)
+
+
+def test_search_paths_matches_alphabeta() -> None:
+    """Each worker path is scored as alphabeta scores the same position"""
+    player = CustomPlayer(3, improved_score, False, 'alphabeta')
+    player.time_left = lambda: 1e9
+    game = make_game(player)
+
+    class Deadline:
+        """Stand in for the shared deadline of the pool"""
+        value = time.monotonic() + 0.2
+
+    parallel.init_worker({'score_fn': improved_score, 'timeout': 10.},
+                         Deadline)
+    move = game.get_legal_moves()[0]
+    results, counts = parallel.search_paths(
+        parallel.snapshot_board(game, player), [(move,)])
+    scores, _ = results[0]
+    assert len(scores) > 2
+    assert counts[0] > counts[1] > 0
+    assert scores[2] == player.alphabeta(game.forecast_move(move), 2,
+                                         maximizing_player=False)[0]
+
+
+def test_parallel_player_get_move() -> None:
+    """The parallel player returns a searched legal move before time is up"""
+    # a wide threshold so scheduling jitter does not fail the test
+    player = parallel.ParallelPlayer(2, improved_score, timeout=50.)
+    try:
+        game = make_game(player)
+        legal_moves = game.get_legal_moves()
+        for _ in range(2):
+            start = time.monotonic()
+
+            def time_left() -> float:
+                return 500 - (time.monotonic() - start) * 1000
+
+            move = player.get_move(game, legal_moves, time_left)
+            assert time_left() > 0
+            assert move in legal_moves
+        assert min(player.average_depths) > 1
+        records = player.move_stats
+        assert [record['depth'] for record in records] == \
+            player.average_depths
+        assert sum(record['nodes'] for record in records) == \
+            player.worker_counts[0] > 0
+        assert player.get_move(game, legal_moves[:1], time_left) == \
+            legal_moves[0]
+        assert len(player.move_stats) == len(player.average_depths) == 3
+        assert player.move_stats[-1]['nodes'] == 0
+    finally:
+        player.close()
+
+
+def test_parallel_player_late_task() -> None:
+    """A late task leaves its moves out instead of every searched move"""
+
+    class LateResult:
+        """Task result which is never ready"""
+        def get(self, timeout: float) -> None:
+            """Wait for the result and give up"""
+            time.sleep(timeout)
+            raise multiprocessing.TimeoutError()
+
+    class InlinePool:
+        """Pool which runs the first task in process and loses the rest"""
+        def __init__(self) -> None:
+            self.tasks = 0
+
+        def apply_async(self, function, args):
+            """Run or lose a task"""
+            self.tasks += 1
+            if self.tasks > 1:
+                return LateResult()
+            result = function(*args)
+
+            class Ready:
+                """Finished task result"""
+                @staticmethod
+                def get(timeout: float):
+                    """Return the result"""
+                    return result
+            return Ready()
+
+    player = parallel.ParallelPlayer(2, improved_score, timeout=20.)
+    player.close()
+    player.pool = InlinePool()
+    parallel.init_worker({'score_fn': improved_score, 'timeout': 20.},
+                         player.deadline)
+    game = make_game(player)
+    legal_moves = game.get_legal_moves()
+    paths = player.split_paths(game, legal_moves)
+    start = time.monotonic()
+
+    def time_left() -> float:
+        return 200 - (time.monotonic() - start) * 1000
+
+    move = player.get_move(game, legal_moves, time_left)
+    assert time_left() > 0
+    assert move in [path[0] for path in paths[0::2]]
+    assert player.average_depths[-1] > 1
+
+
+def test_mcts_player_reuses_tree() -> None:
+    """MCTS keeps the subtree of the opponent reply between moves"""
+    player = MCTSPlayer(timeout=30., seed=0)
+    game = make_game(player)
+    start = time.monotonic()
+
+    def time_left() -> float:
+        return 100 - (time.monotonic() - start) * 1000
+
+    move = player.get_move(game, game.get_legal_moves(), time_left)
+    assert move in game.get_legal_moves()
+    assert time_left() > 0
+    game.apply_move(move)
+    reply = game.get_legal_moves()[0]
+    game.apply_move(reply)
+
+    player.reuse_tree(game)
+    root = player.root
+    assert root > 0
+    assert player.moves[root] == reply[0] * game.width + reply[1]
+    visits = player.visits[root]
+    player.compact()
+    assert player.root == 0 and player.visits[0] == visits
+    assert len(player.moves) == 1 + sum(player.num_children)
+    assert player.num_children[0] == len(game.get_legal_moves())
+
+    player.reset()
+    start = time.monotonic()
+    assert player.get_move(game, game.get_legal_moves(), time_left) in \
+        game.get_legal_moves()
+
+
+def test_node_limit_ignores_clock() -> None:
+    """A node limited search stops on its node count with the same move"""
+    moves = []
+    for _ in range(2):
+        player = CustomPlayer(score_fn=improved_score, method='alphabeta',
+                              node_limit=500)
+        game = make_game(player)
+        moves.append(player.get_move(game, game.get_legal_moves(),
+                                     lambda: -1.))
+        assert 500 < player.nodes <= 501
+        assert player.average_depths[-1] > 2
+    assert moves[0] == moves[1]
+    moves.append(player.get_move(game, game.get_legal_moves(), lambda: -1.))
+    assert player.nodes <= 1002 and moves[2] == moves[0]
+
+
+def test_play_without_time_limit() -> None:
+    """Seeded players limited by nodes and playouts replay the same game"""
+    histories = []
+    for _ in range(2):
+        player_1 = CustomPlayer(score_fn=improved_score, method='alphabeta',
+                                node_limit=200)
+        player_2 = MCTSPlayer(seed=1, playout_limit=50)
+        game = Board(player_1, player_2)
+        _, history, termination = game.play(time_limit=None)
+        assert termination == 'illegal move'
+        histories.append(history)
+    assert histories[0] == histories[1]
+
+
+def test_telemetry_records_moves() -> None:
+    """Every searched move is recorded, emitted and totalled"""
+    stream = io.StringIO()
+    player = CustomPlayer(score_fn=improved_score, method='alphabeta',
+                          tt_size=1 << 10, node_limit=300,
+                          telemetry=telemetry.JsonLinesSink(stream))
+    game = make_game(player)
+    for _ in range(2):
+        move = player.get_move(game, game.get_legal_moves(), lambda: 150.)
+        game.apply_move(move)
+        game.apply_move(game.get_legal_moves()[0])
+    records = telemetry.read_json_lines(io.StringIO(stream.getvalue()))
+    assert records == player.move_stats and len(records) == 2
+    for record in records:
+        assert 300 < record['nodes'] <= 301
+        assert record['depth'] == player.average_depths[0] - 1
+        assert record['time_budget'] == 150.
+        assert record['cutoffs'] <= record['expanded'] < record['nodes']
+        assert record['branching_factor'] > 1
+        assert record['tt_hits'] <= record['tt_probes']
+    assert sum(record['nodes'] for record in records) == player.nodes
+
+    rows = io.StringIO()
+    sink = telemetry.CsvSink(rows)
+    for record in records:
+        sink.emit(record)
+    assert rows.getvalue().splitlines()[0].split(',') == telemetry.FIELDS
+    assert len(rows.getvalue().splitlines()) == 3
+
+    total = telemetry.totals(records)
+    summary = telemetry.summarize(telemetry.combine([total, total]))
+    assert summary['moves'] == 4
+    assert summary['nodes'] == total['nodes'] / 2
+    assert summary['budget_used'] == pytest.approx(
+        total['time_used'] / 300.)
+    assert 'Nodes/s' in telemetry.format_summary('AB', summary)
+
+
+def test_adaptive_clock_reads_less() -> None:
+    """An adaptive clock is read for a fraction of the nodes and still
+    stops the search before the timer threshold is passed"""
+    player = CustomPlayer(score_fn=improved_score, method='alphabeta',
+                          adaptive_clock=True, timeout=20.)
+    game = make_game(player)
+    reads = []
+    start = time.monotonic()
+
+    def time_left() -> float:
+        """Count the clock reads of a 100 ms move"""
+        reads.append(1)
+        return 100. - (time.monotonic() - start) * 1000
+
+    assert player.get_move(game, game.get_legal_moves(), time_left) in \
+        game.get_legal_moves()
+    assert time_left() > 0
+    assert player.nodes > 10 * len(reads)
+
+
+def partitioned_game(seed: int, player: CustomPlayer, max_cells: int) -> Board:
+    """Random game played until the players are partitioned in regions of
+    at most max_cells cells"""
+    graph = move_graph(7, 7)
+    rand = random.Random(seed)
+    while True:
+        game = Board(player, 'opponent')
+        while game.get_legal_moves():
+            if game.move_count > 4 and graph.is_partitioned(game):
+                blank = graph.blank_mask(game)
+                sizes = [bin(graph.reachable(
+                    blank, graph.location(game, owner))).count('1')
+                         for owner in [player, 'opponent']]
+                if max(sizes) <= max_cells and min(sizes) > 0:
+                    return game
+                break
+            game.apply_move(rand.choice(game.get_legal_moves()))
+
+
+def test_endgame_reads_clock_less() -> None:
+    """A timed endgame solve reads the clock for a fraction of its nodes
+    and gives up before half of the time left is used"""
+    clock = [0., 0.]
+    reads = []
+
+    def time_left() -> float:
+        """Count the clock reads of a move of clock[1] ms"""
+        reads.append(1)
+        return clock[1] - (time.monotonic() - clock[0]) * 1000
+
+    player = CustomPlayer(score_fn=improved_score, method='alphabeta',
+                          endgame=True)
+    player.time_left = time_left
+    game = partitioned_game(9, player, 30)
+    while game.active_player is not player:
+        game.apply_move(game.get_legal_moves()[0])
+    clock[:] = [time.monotonic(), 1000.]
+    assert player.solve_endgame(game) is not None
+    assert player.nodes > 4 * len(reads)
+
+    # this solve takes far longer than the 45 ms it is given
+    game = partitioned_game(5, player, 30)
+    while game.active_player is not player:
+        game.apply_move(game.get_legal_moves()[0])
+    clock[:] = [time.monotonic(), 100.]
+    assert player.solve_endgame(game) is None
+    assert time_left() > player.timer_threshold
+
+
+def longest_path(graph, blank: int, location: int) -> int:
+    """Longest knight path by trying every path"""
+    return max([1 + longest_path(graph, blank & ~(1 << cell), cell)
+                for cell in graph.cells(graph.neighbours[location] & blank)],
+               default=0)
+
+
+def test_endgame_solver_matches_every_path() -> None:
+    """The memoized solver finds the longest path of each region"""
+    graph = move_graph(7, 7)
+    solver = EndgameSolver(graph)
+    for seed in range(10):
+        game = partitioned_game(seed, 'player', 12)
+        blank = graph.blank_mask(game)
+        for owner in [game.active_player, game.inactive_player]:
+            location = graph.location(game, owner)
+            length, cell = solver.best_move(blank, location)
+            assert length == longest_path(graph, blank, location)
+            if length:
+                assert length == 1 + longest_path(
+                    graph, blank & ~(1 << cell), cell)
+
+
+def test_endgame_player_solves_partitions() -> None:
+    """A partitioned position is solved instead of searched, searched when
+    the solve runs out of nodes and solved the same in any later game"""
+    graph = move_graph(7, 7)
+    player = CustomPlayer(score_fn=improved_score, method='alphabeta',
+                          endgame=True)
+    game = partitioned_game(5, player, 16)
+    while game.active_player is not player:
+        game.apply_move(game.get_legal_moves()[0])
+    blank = graph.blank_mask(game)
+    own = longest_path(graph, blank, graph.location(game, player))
+    move = player.get_move(game, game.get_legal_moves(), lambda: 1e4)
+    cell = move[0] * 7 + move[1]
+    assert own == 1 + longest_path(graph, blank & ~(1 << cell), cell)
+    assert player.move_stats[-1]['expanded'] == 0
+
+    limited = CustomPlayer(score_fn=improved_score, method='alphabeta',
+                           endgame=True, node_limit=2)
+    game = partitioned_game(5, limited, 16)
+    while game.active_player is not limited:
+        game.apply_move(game.get_legal_moves()[0])
+    assert limited.solve_endgame(game) is None
+    assert limited.get_move(game, game.get_legal_moves(), lambda: 1e4) in \
+        game.get_legal_moves()
+
+    # paths solved in an earlier game do not change a node limited solve
+    warm = CustomPlayer(score_fn=improved_score, method='alphabeta',
+                        endgame=True, node_limit=2)
+    warm.endgame_solver = EndgameSolver(graph)
+    warm.endgame_solver.best_move(
+        graph.blank_mask(game), graph.location(game, game.active_player))
+    assert warm.solve_endgame(game) is not None
+    new_game = Board(warm, 'opponent')
+    warm.get_move(new_game, new_game.get_legal_moves(), lambda: 1e4)
+    assert not warm.endgame_solver.memo
+    assert warm.solve_endgame(game) is None
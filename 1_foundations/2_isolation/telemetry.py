@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+# Author: github.com/madhavajay
+"""
+nd889 AIND Project 2 - Per move search telemetry
+
+CustomPlayer makes a record of every move it searches and hands it to the
+emit method of its telemetry sink, the sinks here write json lines or csv
+and the totals of many records, summed from their raw counts so games of
+any length combine, can be summarized for tournament.py and pit.py
+"""
+
+import csv
+import json
+from typing import Any, Dict, IO, Iterable, List, Optional
+
+# the record of one searched move, times are in milliseconds and the time
+# budget is None without a time limit
+MoveRecord = Dict[str, Any]
+
+# raw counts summed over move records
+Totals = Dict[str, float]
+
+FIELDS = ['player', 'move_count', 'nodes', 'nodes_per_sec', 'depth',
+          'time_used', 'time_budget', 'branching_factor', 'cutoff_rate',
+          'tt_hit_rate', 'expanded', 'children', 'cutoffs', 'tt_probes',
+          'tt_hits']
+
+# counts of a record which are summed into totals
+COUNTS = ['nodes', 'depth', 'time_used', 'expanded', 'children', 'cutoffs',
+          'tt_probes', 'tt_hits']
+
+
+class JsonLinesSink:
+    """Write each move record as one line of json"""
+
+    def __init__(self, stream: IO[str]) -> None:
+        self.stream = stream
+
+    def emit(self, record: MoveRecord) -> None:
+        """Write a move record"""
+        self.stream.write(json.dumps(record, sort_keys=True) + '\n')
+
+
+class CsvSink:
+    """Write each move record as a csv row, under a header of the fields"""
+
+    def __init__(self, stream: IO[str], fields: List[str]=None) -> None:
+        self.writer = csv.DictWriter(stream, fields or FIELDS,
+                                     extrasaction='ignore')
+        self.header = False
+
+    def emit(self, record: MoveRecord) -> None:
+        """Write a move record"""
+        if not self.header:
+            self.writer.writeheader()
+            self.header = True
+        self.writer.writerow(record)
+
+
+class ListSink:
+    """Keep move records in memory"""
+
+    def __init__(self) -> None:
+        self.records = []  # type: List[MoveRecord]
+
+    def emit(self, record: MoveRecord) -> None:
+        """Append a move record"""
+        self.records.append(record)
+
+
+def read_json_lines(stream: IO[str]) -> List[MoveRecord]:
+    """Read the move records written by a JsonLinesSink"""
+    return [json.loads(line) for line in stream if line.strip()]
+
+
+def ratio(numerator: float, denominator: float) -> float:
+    """Return numerator / denominator or 0 when the denominator is 0"""
+    return numerator / denominator if denominator else 0.
+
+
+def totals(records: Iterable[MoveRecord]) -> Totals:
+    """Sum the raw counts of move records"""
+    total = dict.fromkeys(COUNTS + ['moves', 'time_budget',
+                                    'budgeted_time_used'], 0.)  # type: Totals
+    for record in records:
+        total['moves'] += 1
+        for count in COUNTS:
+            total[count] += record[count]
+        if record['time_budget'] is not None:
+            total['time_budget'] += record['time_budget']
+            total['budgeted_time_used'] += record['time_used']
+    return total
+
+
+def combine(many: Iterable[Optional[Totals]]) -> Totals:
+    """Sum totals, such as those of each game of a tournament"""
+    total = totals([])
+    for other in many:
+        for key, value in (other or {}).items():
+            total[key] = total.get(key, 0.) + value
+    return total
+
+
+def summarize(total: Totals) -> Dict[str, float]:
+    """Return the averages and rates of totals"""
+    return {
+        'moves': total['moves'],
+        'nodes': ratio(total['nodes'], total['moves']),
+        'nodes_per_sec': ratio(total['nodes'] * 1000, total['time_used']),
+        'depth': ratio(total['depth'], total['moves']),
+        'time_used': ratio(total['time_used'], total['moves']),
+        'budget_used': ratio(total['budgeted_time_used'],
+                             total['time_budget']),
+        'branching_factor': ratio(total['children'], total['expanded']),
+        'cutoff_rate': ratio(total['cutoffs'], total['expanded']),
+        'tt_hit_rate': ratio(total['tt_hits'], total['tt_probes'])
+    }
+
+
+def format_summary(name: str, summary: Dict[str, float]) -> str:
+    """Format a summary as one line of the tournament output"""
+    return ('{} Moves: {:.0f} Nodes: {:.0f} Nodes/s: {:.0f} Depth: {:.2f} '
+            'Time: {:.1f} ms ({:.0%} of budget) Branching: {:.2f} '
+            'Cutoffs: {:.0%} TT hits: {:.0%}'.format(
+                name, summary['moves'], summary['nodes'],
+                summary['nodes_per_sec'], summary['depth'],
+                summary['time_used'], summary['budget_used'],
+                summary['branching_factor'], summary['cutoff_rate'],
+                summary['tt_hit_rate']))
@@ -17,6 +17,9 @@ For example, if the random moves chosen for initialization are (5, 2) and
 agentB at (1, 3) as player 2 then play to conclusion; the agents swap
 initiative in the second match with agentB at (5, 2) as player 1 and agentA at
 (1, 3) as player 2.
+
+tournament_runner.py plays the same evaluation with every game as a task on
+a pool of worker processes and can resume an interrupted run.
 """
 
 import itertools
@@ -32,6 +35,8 @@ from sample_players import open_move_score
 from sample_players import improved_score
 from game_agent import CustomPlayer
 from game_agent import custom_score
+from mcts import MCTSPlayer
+from telemetry import format_summary, summarize, totals
 
 NUM_MATCHES = 5  # number of matches against each opponent
 TIME_LIMIT = 150  # number of milliseconds before timeout
@@ -142,7 +147,8 @@ def main():
                   ("Improved", improved_score)]
     AB_ARGS = {"search_depth": 5, "method": 'alphabeta', "iterative": False}
     MM_ARGS = {"search_depth": 3, "method": 'minimax', "iterative": False}
-    CUSTOM_ARGS = {"method": 'alphabeta', 'iterative': True}
+    CUSTOM_ARGS = {"method": 'alphabeta', 'iterative': True,
+                   'adaptive_clock': True, 'endgame': True}
 
     # Create a collection of CPU agents using fixed-depth minimax or alpha beta
     # search, or random selection.  The agent names encode the search method
@@ -161,7 +167,8 @@ def main():
     # relative to the performance of the ID_Improved agent to account for
     # faster or slower computers.
     test_agents = [Agent(CustomPlayer(score_fn=improved_score, **CUSTOM_ARGS), "ID_Improved"),
-                   Agent(CustomPlayer(score_fn=custom_score, **CUSTOM_ARGS), "Student")]
+                   Agent(CustomPlayer(score_fn=custom_score, **CUSTOM_ARGS), "Student"),
+                   Agent(MCTSPlayer(), "MCTS")]
 
     print(DESCRIPTION)
     for agentUT in test_agents:
@@ -177,12 +184,16 @@ def main():
         print("----------")
         print("{!s:<15}{:>10.2f}%".format(agentUT.name, win_ratio))
 
-        if agentUT.name == 'ID_Improved' or agentUT.name == 'Student':
+        if agentUT.name in ['ID_Improved', 'Student', 'MCTS']:
             searches = len(agentUT.player.average_depths)
             total_depth = sum(agentUT.player.average_depths)
             avg = total_depth / searches
             print('{} Avg Depth: {}'.format(agentUT.name, avg))
 
+        if agentUT.name in ['ID_Improved', 'Student']:
+            print(format_summary(agentUT.name,
+                                 summarize(totals(agentUT.player.move_stats))))
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,406 @@
+# -*- coding: utf-8 -*-
+# Author: github.com/madhavajay
+"""
+Run the tournament.py evaluation with every game as an independent task on
+a pool of worker processes pinned to their own cores, saving each result to
+a json lines file as it finishes so an interrupted run can be resumed
+
+    python tournament_runner.py --workers 8 --results results.jsonl
+
+Each result is saved with the seed, time limit and search budgets of its
+game, a rerun with other settings plays those games again instead of
+reusing them.
+
+With --nodes or --depth the clock is switched off and searching agents are
+limited by nodes or depth instead, so results are reproducible however
+loaded the machine is
+
+    python tournament_runner.py --nodes 20000 --playouts 2000
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+from typing import (Any, Callable, Dict, List, NamedTuple, Optional,
+                    Sequence, Tuple)
+
+from isolation import Board
+from sample_players import RandomPlayer
+from sample_players import null_score
+from sample_players import open_move_score
+from sample_players import improved_score
+from game_agent import CustomPlayer, Move
+from game_agent import custom_score
+from mcts import MCTSPlayer
+from telemetry import combine, format_summary, summarize, totals
+from tournament import DESCRIPTION, NUM_MATCHES, TIME_LIMIT
+
+# an agent is rebuilt in each worker by calling factory with kwargs
+AgentSpec = NamedTuple('AgentSpec', [('name', str),
+                                     ('factory', Callable[..., Any]),
+                                     ('kwargs', Dict[str, Any])])
+
+# agent under test, opponent, match number and side, side 0 moves first
+GameTask = Tuple[str, str, int, int]
+
+# the result of one game as saved in the results file
+GameResult = Dict[str, Any]
+
+# type alias for game results keyed by task_key
+Results = Dict[str, GameResult]
+
+# playouts an MCTS agent runs per move when the clock is switched off
+DEFAULT_PLAYOUTS = 1000
+
+# agent arguments which set how much an agent searches
+BUDGET_ARGS = ['iterative', 'search_depth', 'node_limit', 'playout_limit']
+
+# agents, seed and time limit of a pool worker process
+_SPECS = {}  # type: Dict[str, AgentSpec]
+_SEED = 0
+_TIME_LIMIT = TIME_LIMIT
+
+
+def default_agents() -> Tuple[List[AgentSpec], List[AgentSpec]]:
+    """Return the agents under test and the opponents of tournament.py"""
+    heuristics = [("Null", null_score),
+                  ("Open", open_move_score),
+                  ("Improved", improved_score)]
+    ab_args = {"search_depth": 5, "method": 'alphabeta', "iterative": False}
+    mm_args = {"search_depth": 3, "method": 'minimax', "iterative": False}
+    custom_args = {"method": 'alphabeta', 'iterative': True,
+                   'adaptive_clock': True, 'endgame': True}
+
+    opponents = [AgentSpec("Random", RandomPlayer, {})]
+    opponents += [AgentSpec("MM_" + name, CustomPlayer,
+                            dict(mm_args, score_fn=h))
+                  for name, h in heuristics]
+    opponents += [AgentSpec("AB_" + name, CustomPlayer,
+                            dict(ab_args, score_fn=h))
+                  for name, h in heuristics]
+    test_agents = [
+        AgentSpec("ID_Improved", CustomPlayer,
+                  dict(custom_args, score_fn=improved_score)),
+        AgentSpec("Student", CustomPlayer,
+                  dict(custom_args, score_fn=custom_score)),
+        AgentSpec("MCTS", MCTSPlayer, {})]
+    return test_agents, opponents
+
+
+def fixed_budget(specs: Sequence[AgentSpec], node_limit: int=0,
+                 depth: int=0,
+                 playouts: int=DEFAULT_PLAYOUTS) -> List[AgentSpec]:
+    """
+    Return the agents with iterative deepening limited to node_limit nodes
+    per move or replaced by a fixed depth search, and MCTS limited to a
+    number of playouts, for games played with a time limit of None
+    """
+    fixed = []  # type: List[AgentSpec]
+    for spec in specs:
+        kwargs = dict(spec.kwargs)
+        if spec.factory is CustomPlayer and kwargs.get('iterative', True):
+            if depth:
+                kwargs.update(iterative=False, search_depth=depth)
+            else:
+                kwargs['node_limit'] = node_limit
+        elif spec.factory is MCTSPlayer:
+            kwargs['playout_limit'] = playouts
+        fixed.append(spec._replace(kwargs=kwargs))
+    return fixed
+
+
+def schedule(test_agents: Sequence[AgentSpec], opponents: Sequence[AgentSpec],
+             num_matches: int=NUM_MATCHES) -> List[GameTask]:
+    """
+    Return every game of the tournament, as in tournament.play_round each
+    pair plays twice num_matches openings and each opening from both sides
+    """
+    return [(agent.name, opponent.name, match, side)
+            for agent in test_agents
+            for opponent in opponents
+            for match in range(2 * num_matches)
+            for side in range(2)]
+
+
+def task_key(task: GameTask) -> str:
+    """Return the name of a game used to seed it and to resume runs"""
+    return '{}|{}|{}|{}'.format(*task)
+
+
+def opening(seed: int, task: GameTask, width: int=7,
+            height: int=7) -> List[Move]:
+    """
+    Return the two random placements which start a game, both sides of a
+    match share them so neither player gains from the starting position
+    """
+    agent, opponent, match, _ = task
+    rand = random.Random('{}|{}|{}|{}'.format(seed, agent, opponent, match))
+    game = Board('player_1', 'player_2', width, height)
+    moves = []  # type: List[Move]
+    for _ in range(2):
+        move = rand.choice(game.get_legal_moves())
+        game.apply_move(move)
+        moves.append(move)
+    return moves
+
+
+def game_settings(task: GameTask, specs: Dict[str, AgentSpec], seed: int,
+                  time_limit: Optional[int]) -> Dict[str, Any]:
+    """
+    Return the settings a game is played with, saved with its result so a
+    resumed run only reuses games played the same way
+    """
+    agent, opponent, _, _ = task
+    return {
+        'seed': seed,
+        'time_limit': time_limit,
+        'agent': [specs[agent].kwargs.get(arg) for arg in BUDGET_ARGS],
+        'opponent': [specs[opponent].kwargs.get(arg) for arg in BUDGET_ARGS]
+    }
+
+
+def build_player(spec: AgentSpec, seed: int, task: GameTask) -> Any:
+    """
+    Build a fresh player for a game, an MCTS player without a seed of its
+    own gets one from the run seed, the game and its name
+    """
+    kwargs = dict(spec.kwargs)
+    if spec.factory is MCTSPlayer and kwargs.get('seed') is None:
+        kwargs['seed'] = random.Random('{}|{}|{}'.format(
+            seed, task_key(task), spec.name)).getrandbits(64)
+    return spec.factory(**kwargs)
+
+
+def play_game(task: GameTask, specs: Dict[str, AgentSpec], seed: int=0,
+              time_limit: Optional[int]=TIME_LIMIT) -> GameResult:
+    """Build fresh players for a game, play it and return its result"""
+    agent_name, opponent_name, match, side = task
+    agent = build_player(specs[agent_name], seed, task)
+    opponent = build_player(specs[opponent_name], seed, task)
+    players = [agent, opponent] if side == 0 else [opponent, agent]
+    game = Board(*players)
+    for move in opening(seed, task):
+        game.apply_move(move)
+    random.seed('{}|{}'.format(seed, task_key(task)))
+    try:
+        winner, _, termination = game.play(time_limit=time_limit)
+    finally:
+        for player in players:
+            if hasattr(player, 'close'):
+                player.close()
+    depths = getattr(agent, 'average_depths', [])
+    return {
+        'key': task_key(task),
+        'agent': agent_name,
+        'opponent': opponent_name,
+        'match': match,
+        'side': side,
+        'won': winner is agent,
+        'termination': termination,
+        'moves': game.move_count,
+        'searches': len(depths),
+        'depth': sum(depths),
+        'telemetry': totals(getattr(agent, 'move_stats', [])),
+        'settings': game_settings(task, specs, seed, time_limit)
+    }
+
+
+def init_worker(specs: Dict[str, AgentSpec], seed: int,
+                time_limit: Optional[int],
+                counter: Any, cores: Sequence[int]) -> None:
+    """Pin the worker to the next core and keep the tournament settings"""
+    global _SPECS, _SEED, _TIME_LIMIT  # pylint: disable=global-statement
+    _SPECS, _SEED, _TIME_LIMIT = specs, seed, time_limit
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    if cores and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, {cores[index % len(cores)]})
+
+
+def play_task(task: GameTask) -> GameResult:
+    """Play a game with the settings of the worker"""
+    return play_game(task, _SPECS, _SEED, _TIME_LIMIT)
+
+
+def load_results(path: str,
+                 settings: Dict[str, Dict[str, Any]]=None) -> Results:
+    """
+    Read the finished games of a results file keyed by game, with settings
+    only the games saved with the settings given for their key
+    """
+    results = {}  # type: Results
+    if not path or not os.path.exists(path):
+        return results
+    with open(path) as results_file:
+        for line in results_file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                result = json.loads(line)
+            except ValueError:
+                # a line cut short when the run was stopped
+                continue
+            if settings is not None and \
+                    result.get('settings') != settings.get(result['key']):
+                continue
+            results[result['key']] = result
+    return results
+
+
+def run_tournament(test_agents: Sequence[AgentSpec],
+                   opponents: Sequence[AgentSpec],
+                   num_matches: int=NUM_MATCHES, workers: int=0,
+                   results_path: str=None, seed: int=0,
+                   time_limit: Optional[int]=TIME_LIMIT) -> Results:
+    """
+    Play every game not already in the results file with the same seed,
+    time limit and agent budgets on a pool of workers, one per available
+    core unless workers is given, and return the result of every game of
+    the tournament keyed by game
+    """
+    specs = dict((spec.name, spec)
+                 for spec in list(test_agents) + list(opponents))
+    games = schedule(test_agents, opponents, num_matches)
+    settings = dict((task_key(task),
+                     game_settings(task, specs, seed, time_limit))
+                    for task in games)
+    results = load_results(results_path, settings)
+    tasks = [task for task in games if task_key(task) not in results]
+    if not tasks:
+        return results
+
+    cores = []  # type: List[int]
+    if hasattr(os, 'sched_getaffinity'):
+        cores = sorted(os.sched_getaffinity(0))
+    workers = min(workers or len(cores) or multiprocessing.cpu_count(),
+                  len(tasks))
+    context = multiprocessing.get_context()
+    counter = context.Value('i', 0)
+    results_file = None
+    if results_path:
+        results_file = open(results_path, 'a+')
+        # start on a new line after a line cut short by an interruption
+        if results_file.tell():
+            results_file.seek(results_file.tell() - 1)
+            if results_file.read(1) != '\n':
+                results_file.write('\n')
+    try:
+        with context.Pool(workers, init_worker,
+                          (specs, seed, time_limit, counter, cores)) as pool:
+            for result in pool.imap_unordered(play_task, tasks):
+                results[result['key']] = result
+                if results_file is not None:
+                    results_file.write(json.dumps(result, sort_keys=True) +
+                                       '\n')
+                    results_file.flush()
+    finally:
+        if results_file is not None:
+            results_file.close()
+    return results
+
+
+def aggregate(results: Results,
+              test_agents: Sequence[AgentSpec],
+              opponents: Sequence[AgentSpec]) -> List[Dict[str, Any]]:
+    """
+    Total the games of each agent under test in schedule order, so the
+    summary does not depend on the order games finished in
+    """
+    # agents and opponents are taken in schedule order below, the games of
+    # each pair by match and side as the keys do not sort numerically
+    ordered = sorted(results.values(),
+                     key=lambda result: (result['match'], result['side']))
+    summary = []  # type: List[Dict[str, Any]]
+    for agent in test_agents:
+        row = {'agent': agent.name, 'wins': 0, 'games': 0, 'timeouts': 0,
+               'searches': 0, 'depth': 0,
+               'opponents': []}  # type: Dict[str, Any]
+        for opponent in opponents:
+            games = [result for result in ordered
+                     if result['agent'] == agent.name and
+                     result['opponent'] == opponent.name]
+            wins = sum(1 for result in games if result['won'])
+            row['opponents'].append((opponent.name, wins, len(games) - wins))
+            row['wins'] += wins
+            row['games'] += len(games)
+            row['timeouts'] += sum(1 for result in games
+                                   if not result['won'] and
+                                   result['termination'] == 'timeout')
+            row['searches'] += sum(result['searches'] for result in games)
+            row['depth'] += sum(result['depth'] for result in games)
+        row['win_ratio'] = 100. * row['wins'] / row['games'] \
+            if row['games'] else 0.
+        row['average_depth'] = row['depth'] / row['searches'] \
+            if row['searches'] else 0.
+        # results saved before telemetry was recorded have none
+        row['telemetry'] = combine(
+            result.get('telemetry') for result in ordered
+            if result['agent'] == agent.name)
+        summary.append(row)
+    return summary
+
+
+def report(summary: List[Dict[str, Any]]) -> str:
+    """Format the summary like the output of tournament.py"""
+    lines = []  # type: List[str]
+    for row in summary:
+        lines.append('')
+        lines.append('*************************')
+        lines.append('{:^25}'.format('Evaluating: ' + row['agent']))
+        lines.append('*************************')
+        for index, (name, wins, losses) in enumerate(row['opponents']):
+            lines.append('  Match {}: {!s:^11} vs {!s:^11}\tResult: {} to {}'
+                         .format(index + 1, row['agent'], name, wins, losses))
+        lines.append('')
+        lines.append('{!s:<15}{:>10.2f}%'.format(row['agent'],
+                                                 row['win_ratio']))
+        lines.append('{} Avg Depth: {}'.format(row['agent'],
+                                               row['average_depth']))
+        if row['telemetry']['moves']:
+            lines.append(format_summary(row['agent'],
+                                        summarize(row['telemetry'])))
+        if row['timeouts']:
+            lines.append('{} lost {} games to timeout'.format(
+                row['agent'], row['timeouts']))
+    return '\n'.join(lines)
+
+
+def main(argv: Sequence[str]=None) -> int:
+    """Run the tournament and print the results of each agent under test"""
+    parser = argparse.ArgumentParser(description=DESCRIPTION)
+    parser.add_argument('--workers', type=int, default=0)
+    parser.add_argument('--matches', type=int, default=NUM_MATCHES)
+    parser.add_argument('--results', default=None,
+                        help='json lines file to save and resume games')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--time-limit', type=int, default=TIME_LIMIT)
+    parser.add_argument('--nodes', type=int, default=0,
+                        help='nodes per move instead of a time limit')
+    parser.add_argument('--depth', type=int, default=0,
+                        help='fixed search depth instead of a time limit')
+    parser.add_argument('--playouts', type=int, default=DEFAULT_PLAYOUTS,
+                        help='MCTS playouts per move without a time limit')
+    args = parser.parse_args(argv)
+
+    test_agents, opponents = default_agents()
+    time_limit = args.time_limit
+    if args.nodes or args.depth:
+        test_agents = fixed_budget(test_agents, args.nodes, args.depth,
+                                   args.playouts)
+        opponents = fixed_budget(opponents, args.nodes, args.depth,
+                                 args.playouts)
+        time_limit = None
+    results = run_tournament(test_agents, opponents, args.matches,
+                             args.workers, args.results, args.seed,
+                             time_limit)
+    print(report(aggregate(results, test_agents, opponents)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# Author: github.com/madhavajay
+"""This is a test for the parallel tournament runner"""
+
+import json
+
+from game_agent import CustomPlayer
+from sample_players import RandomPlayer, improved_score
+import tournament_runner
+from tournament_runner import AgentSpec
+
+TEST_AGENTS = [AgentSpec('AB_1', CustomPlayer,
+                         {'search_depth': 1, 'method': 'alphabeta',
+                          'iterative': False, 'score_fn': improved_score})]
+OPPONENTS = [AgentSpec('Random', RandomPlayer, {}),
+             AgentSpec('MM_1', CustomPlayer,
+                       {'search_depth': 1, 'method': 'minimax',
+                        'iterative': False, 'score_fn': improved_score})]
+
+
+def test_schedule_and_opening() -> None:
+    """Both sides of a match share one opening and every game is listed"""
+    tasks = tournament_runner.schedule(TEST_AGENTS, OPPONENTS, 2)
+    assert len(tasks) == len(set(tasks)) == 1 * 2 * 4 * 2
+    first, second = tasks[:2]
+    assert tournament_runner.opening(0, first) == \
+        tournament_runner.opening(0, second)
+    assert tournament_runner.opening(0, first) != \
+        tournament_runner.opening(1, first)
+
+
+def test_run_and_resume(tmp_path) -> None:
+    """A resumed run only plays missing games and totals the same"""
+    path = str(tmp_path / 'results.jsonl')
+    results = tournament_runner.run_tournament(
+        TEST_AGENTS, OPPONENTS, 1, workers=2, results_path=path,
+        time_limit=1000)
+    assert len(results) == 8
+    summary = tournament_runner.aggregate(results, TEST_AGENTS, OPPONENTS)
+    assert summary[0]['games'] == 8
+    assert summary[0]['telemetry']['moves'] > 0
+    assert 'AB_1 Moves:' in tournament_runner.report(summary)
+
+    with open(path) as results_file:
+        lines = results_file.readlines()
+    with open(path, 'w') as results_file:
+        results_file.writelines(lines[:5] + ['{"key": "cut'])
+    resumed = tournament_runner.run_tournament(
+        TEST_AGENTS, OPPONENTS, 1, workers=2, results_path=path,
+        time_limit=1000)
+    assert sorted(resumed) == sorted(results)
+    for key, result in results.items():
+        assert resumed[key]['won'] == result['won']
+    with open(path) as results_file:
+        keys = [json.loads(line)['key'] for line in results_file
+                if line.startswith('{"agent"')]
+    assert len(keys) == len(set(keys)) == 8
+
+
+def test_resume_with_other_settings(tmp_path) -> None:
+    """Games saved with another seed or time limit are played again"""
+    path = str(tmp_path / 'results.jsonl')
+    tournament_runner.run_tournament(TEST_AGENTS, OPPONENTS, 1, workers=2,
+                                     results_path=path, time_limit=1000)
+    reseeded = tournament_runner.run_tournament(
+        TEST_AGENTS, OPPONENTS, 1, workers=2, results_path=path, seed=1,
+        time_limit=1000)
+    assert len(reseeded) == 8
+    assert all(result['settings']['seed'] == 1
+               for result in reseeded.values())
+    with open(path) as results_file:
+        assert len(results_file.readlines()) == 16
+
+    # both runs are kept so either can be resumed without playing again
+    for seed in [0, 1]:
+        resumed = tournament_runner.run_tournament(
+            TEST_AGENTS, OPPONENTS, 1, workers=2, results_path=path,
+            seed=seed, time_limit=1000)
+        assert all(result['settings']['seed'] == seed
+                   for result in resumed.values())
+    unlimited = tournament_runner.run_tournament(
+        TEST_AGENTS, OPPONENTS, 1, workers=2, results_path=path, seed=1,
+        time_limit=None)
+    assert all(result['settings']['time_limit'] is None
+               for result in unlimited.values())
+    with open(path) as results_file:
+        assert len(results_file.readlines()) == 24
+
+
+def test_fixed_budget() -> None:
+    """Only iterative and MCTS agents get a node, depth or playout budget"""
+    test_agents, opponents = tournament_runner.default_agents()
+    fixed = tournament_runner.fixed_budget(test_agents + opponents, 1000)
+    kwargs = dict((spec.name, spec.kwargs) for spec in fixed)
+    assert kwargs['ID_Improved']['node_limit'] == 1000
+    assert 'node_limit' not in kwargs['AB_Open']
+    assert kwargs['MCTS']['playout_limit'] == \
+        tournament_runner.DEFAULT_PLAYOUTS
+    fixed = tournament_runner.fixed_budget(test_agents, depth=3)
+    assert fixed[1].kwargs['search_depth'] == 3
+    assert not fixed[1].kwargs['iterative']
+
+
+def test_fixed_budget_mcts_is_reproducible() -> None:
+    """A seeded MCTS game without a clock plays the same every time"""
+    test_agents, opponents = tournament_runner.default_agents()
+    specs = dict((spec.name, spec) for spec in tournament_runner.fixed_budget(
+        test_agents + opponents, playouts=50))
+    task = ('MCTS', 'Random', 0, 0)
+    results = [tournament_runner.play_game(task, specs, 7, None)
+               for _ in range(3)]
+    assert results[0] == results[1] == results[2]